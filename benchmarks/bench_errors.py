@@ -0,0 +1,93 @@
+"""Стоимость пути ошибки: немедленное форматирование против ленивого.
+
+Прежний путь форматировал STATUS_IS_NOT_OK_ERROR при создании
+исключения, а main() затем дважды форматировала MAIN_ERROR_MESSAGE.
+Сообщение об успешной отправке форматировалось даже при выключенном
+уровне DEBUG. Теперь исключение хранит поля и собирает текст один раз,
+а сообщения журнала форматируются только для записанных записей.
+
+Для каждого сценария печатаются время и пик выделенной памяти на одну
+итерацию (tracemalloc).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_errors
+"""
+import logging
+import timeit
+import tracemalloc
+
+import homework
+from exceptions import StatusCodeIsNot200Error
+from log_pipeline import LazyMessage
+
+NUMBER = 20000
+PARAMETERS = dict(
+    url=homework.ENDPOINT,
+    headers={'Authorization': 'OAuth benchmark-token'},
+    params={'from_date': 1581604970}
+)
+
+
+def legacy_error() -> None:
+    """Ошибка статуса и её обработка в main() до изменений."""
+    try:
+        raise Exception(homework.STATUS_IS_NOT_OK_ERROR.format(
+            status_code=500, **PARAMETERS
+        ))
+    except Exception as error:
+        message = homework.MAIN_ERROR_MESSAGE.format(error=error)
+        logging.exception(homework.MAIN_ERROR_MESSAGE.format(error=error))
+        assert message
+
+
+def lazy_error() -> None:
+    """Ошибка статуса и её обработка в main() сейчас."""
+    try:
+        raise StatusCodeIsNot200Error(
+            homework.STATUS_IS_NOT_OK_ERROR, status_code=500, **PARAMETERS
+        )
+    except Exception as error:
+        message = homework.MAIN_ERROR_MESSAGE.format(error=error)
+        logging.exception(message)
+
+
+def legacy_debug() -> None:
+    """Сообщение об отправке при выключенном DEBUG до изменений."""
+    logging.debug(homework.SEND_MESSAGE_SUCCESS.format(message='text'))
+
+
+def lazy_debug() -> None:
+    """Сообщение об отправке при выключенном DEBUG сейчас."""
+    logging.debug(LazyMessage(homework.SEND_MESSAGE_SUCCESS, message='text'))
+
+
+def peak_bytes(function, number: int = 1000) -> float:
+    """Средний пик выделенной памяти за один вызов, в байтах."""
+    total = 0
+    tracemalloc.start()
+    try:
+        for _ in range(number):
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            function()
+            total += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+    return total / number
+
+
+def best(function) -> float:
+    """Лучшее время одного вызова в микросекундах."""
+    return min(timeit.repeat(function, number=NUMBER, repeat=5)) / NUMBER * 1e6
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, handlers=[logging.NullHandler()])
+    for name, old, new in (
+        ('error path', legacy_error, lazy_error),
+        ('debug line', legacy_debug, lazy_debug),
+    ):
+        print(
+            f'{name}: legacy {best(old):6.2f} us {peak_bytes(old):8.0f} B, '
+            f'lazy {best(new):6.2f} us {peak_bytes(new):8.0f} B'
+        )
@@ -0,0 +1,62 @@
+"""Хвост задержки запросов к заглушке с медленными ответами.
+
+Сравнивает запросы без дублирования и с дублированием после p95
+наблюдаемых задержек: перцентили задержки и долю лишних запросов.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_hedging --requests 500
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.stub_api import StubPracticumServer
+from homework import request_api_answer
+from http_client import Hedger, HttpClient
+
+HEADERS = {'Authorization': 'OAuth benchmark'}
+
+
+def measure(client: HttpClient, url: str, count: int) -> list:
+    """Возвращает задержки count последовательных запросов в мс."""
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        request_api_answer(0, HEADERS, url, client.get)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name: str, latencies: list, hedged: int) -> None:
+    """Печатает перцентили задержки и долю лишних запросов."""
+    centiles = statistics.quantiles(latencies, n=100, method='inclusive')
+    extra = hedged / len(latencies)
+    print(
+        f'{name:>8}: p50={centiles[49]:.2f}ms p95={centiles[94]:.2f}ms '
+        f'p99={centiles[98]:.2f}ms extra requests={extra:.1%}'
+    )
+
+
+def run(name: str, args, hedger: Hedger = None) -> None:
+    """Замеряет запросы к новой заглушке с медленным хвостом."""
+    with StubPracticumServer(
+        latency=args.latency / 1000,
+        tail_rate=args.tail_rate,
+        tail_latency=args.tail_latency / 1000
+    ) as server, HttpClient(pool_size=4, hedger=hedger) as client:
+        measure(client, server.url, args.warmup)
+        hedged = getattr(hedger, 'hedged', 0)
+        latencies = measure(client, server.url, args.requests)
+        report(name, latencies, getattr(hedger, 'hedged', 0) - hedged)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=5, help='мс')
+    parser.add_argument('--tail-rate', type=float, default=0.03)
+    parser.add_argument('--tail-latency', type=float, default=200, help='мс')
+    args = parser.parse_args()
+    run('plain', args)
+    run('hedged', args, Hedger())
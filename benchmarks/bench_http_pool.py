@@ -0,0 +1,51 @@
+"""Задержка запроса к локальной TLS-заглушке с пулом соединений и без.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_http_pool --requests 200
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.stub_api import StubPracticumServer, make_self_signed_cert
+from homework import request_api_answer
+from http_client import HttpClient
+
+HEADERS = {'Authorization': 'OAuth benchmark'}
+
+
+def measure(client: HttpClient, url: str, cert: str, count: int) -> list:
+    """Возвращает задержки count последовательных запросов в мс."""
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        request_api_answer(
+            0,
+            HEADERS,
+            url,
+            lambda **kwargs: client.get(verify=cert, **kwargs)
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name: str, latencies: list) -> None:
+    """Печатает медиану и 95-й перцентиль задержки."""
+    p95 = statistics.quantiles(latencies, n=20)[-1]
+    print(
+        f'{name:>12}: p50={statistics.median(latencies):.2f}ms '
+        f'p95={p95:.2f}ms mean={statistics.fmean(latencies):.2f}ms'
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+    cert = make_self_signed_cert()
+    with StubPracticumServer(certfile=cert) as server:
+        report('no reuse', measure(HttpClient(), server.url, cert,
+                                   args.requests))
+        with HttpClient(pool_size=1) as client:
+            report('keep-alive', measure(client, server.url, cert,
+                                         args.requests))
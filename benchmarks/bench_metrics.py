@@ -0,0 +1,56 @@
+"""Накладные расходы метрик на одну итерацию цикла опроса.
+
+За итерацию main() метрики обновляются так: счётчик циклов, гистограмма
+времени запроса к API, гистограмма и счётчик отправки сообщения. Бенчмарк
+повторяет именно эти вызовы вместе с замерами time.perf_counter и
+сравнивает их с пустой итерацией. Измерители отставания курсора и
+глубины очередей вычисляются только при чтении /metrics и в итерацию не
+входят; время формирования страницы печатается отдельно.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_metrics
+"""
+import time
+import timeit
+
+from metrics import Registry
+
+NUMBER = 100000
+BUDGET_US = 10.0
+
+
+def make_cycle(registry: Registry):
+    """Итерация цикла, обновляющая метрики так же, как main()."""
+    cycles = registry.counter('cycles_total', 'Циклы.')
+    api = registry.histogram('api_seconds', 'Запрос к API.')
+    send = registry.histogram('send_seconds', 'Отправка сообщения.')
+    sent = registry.counter('sent_total', 'Сообщения.')
+    perf_counter = time.perf_counter
+
+    def cycle() -> None:
+        cycles.inc()
+        start = perf_counter()
+        api.observe(perf_counter() - start)
+        start = perf_counter()
+        sent.inc(result='ok')
+        send.observe(perf_counter() - start)
+
+    return cycle
+
+
+def best(function, number: int = NUMBER) -> float:
+    """Лучшее время одного вызова в микросекундах."""
+    return min(timeit.repeat(function, number=number, repeat=9)) / number * 1e6
+
+
+if __name__ == '__main__':
+    registry = Registry()
+    overhead = best(make_cycle(registry)) - best(lambda: None)
+    errors = registry.counter('errors_total', 'Ошибки.')
+    for name in ('ConnectionError', 'StatusCodeIsNot200Error'):
+        errors.inc(error=name)
+    render = best(registry.render, 1000)
+    print(f'per-cycle overhead: {overhead:.2f} us (budget {BUDGET_US} us)')
+    print(f'/metrics render:    {render:.1f} us')
+    if overhead > BUDGET_US:
+        raise SystemExit('Накладные расходы метрик превышают бюджет.')
@@ -0,0 +1,44 @@
+"""Пропускная способность MultiTenantPoller против локальной заглушки API.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_multitenant --tenants 2000 --latency 0.05
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from benchmarks.stub_api import NullBot, StubPracticumServer
+from multitenant import MultiTenantPoller, Tenant
+
+
+def run(tenants: int, concurrency: int, latency: float, rounds: int) -> None:
+    """Опрашивает заглушку rounds раз для tenants пользователей."""
+    with StubPracticumServer(latency=latency) as server:
+        poller = MultiTenantPoller(
+            [Tenant(token=f'token-{i}', chat_id=i) for i in range(tenants)],
+            NullBot(),
+            concurrency=concurrency,
+            endpoint=server.url
+        )
+        start = time.perf_counter()
+        for _ in range(rounds):
+            asyncio.run(poller.poll_round())
+        elapsed = time.perf_counter() - start
+        poller.close()
+    print(
+        f'tenants={tenants} concurrency={concurrency} latency={latency}s '
+        f'rounds={rounds}: {poller.polls} polls in {elapsed:.2f}s, '
+        f'{poller.polls / elapsed:.1f} tenants/s'
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tenants', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    run(args.tenants, args.concurrency, args.latency, args.rounds)
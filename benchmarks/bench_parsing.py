@@ -0,0 +1,85 @@
+"""Декодирование и проверка ответа API: прежний путь против нового.
+
+Прежний путь: json.loads, check_response по словарю и parse_status для
+каждой работы. Новый путь: decode_json (orjson, если установлен) и
+check_response, который за один проход создаёт записи HomeworkRecord.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_parsing
+"""
+import json
+import timeit
+
+import homework
+import records
+from benchmarks.stub_api import make_homeworks
+
+SIZES = (1, 100, 10000)
+
+
+class Body:
+    """Ответ с сырым телом, как у requests.Response."""
+
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+
+    def json(self) -> dict:
+        """Декодирует тело стандартной библиотекой."""
+        return json.loads(self.content)
+
+
+def make_body(size: int) -> bytes:
+    """Тело ответа API с size домашними работами."""
+    return json.dumps({
+        'homeworks': make_homeworks(size),
+        'current_date': 1581604970
+    }).encode()
+
+
+def legacy(body: Body) -> list:
+    """Путь обработки ответа до перехода на записи."""
+    response = body.json()
+    for key in homework.ERROR_KEYS_IN_RESPONSE:
+        if key in response:
+            raise ValueError(key)
+    if not isinstance(response, dict):
+        raise TypeError
+    if 'homeworks' not in response:
+        raise KeyError
+    if not isinstance(response['homeworks'], list):
+        raise TypeError
+    return [homework.parse_status(item) for item in response['homeworks']]
+
+
+def fused(body: Body) -> list:
+    """Текущий путь обработки ответа.
+
+    Сообщения формируются только для изменившихся работ, поэтому здесь
+    замеряются декодирование и проверка.
+    """
+    response = records.decode_json(body)
+    for key in homework.ERROR_KEYS_IN_RESPONSE:
+        if key in response:
+            raise ValueError(key)
+    return homework.check_response(response)
+
+
+def best(function, body: Body, number: int) -> float:
+    """Лучшее время одного вызова в микросекундах."""
+    return min(timeit.repeat(
+        lambda: function(body), number=number, repeat=5
+    )) / number * 1e6
+
+
+if __name__ == '__main__':
+    decoder = 'orjson' if records.orjson else 'json'
+    print(f'decoder: {decoder}')
+    for size in SIZES:
+        body = Body(make_body(size))
+        assert legacy(body) == list(map(homework.status_message, fused(body)))
+        number = max(1, 20000 // size)
+        old, new = best(legacy, body, number), best(fused, body, number)
+        print(
+            f'{size:>6} homeworks: legacy {old:10.1f} us, '
+            f'fused {new:10.1f} us, speedup x{old / new:.2f}'
+        )
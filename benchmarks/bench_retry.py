@@ -0,0 +1,116 @@
+"""Симуляция повторов запросов к заглушке API с временными сбоями.
+
+Заглушка отвечает 500 с вероятностью --error-rate, а каждую секунду
+первые --outage секунд отвечает 503 с Retry-After. Сравниваются три
+стратегии одного цикла опроса: без повторов, немедленные повторы без
+пауз и RetryPolicy (full jitter, Retry-After, бюджет времени). Для
+каждой печатаются доля успешных циклов, число запросов к API на цикл и
+суммарное ожидание.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_retry --cycles 200
+"""
+import argparse
+import logging
+import random
+import time
+from http import HTTPStatus
+
+import homework
+from benchmarks.stub_api import StubPracticumServer, make_homeworks
+from conditional import ConditionalRequests
+from http_client import HttpClient
+from retry import RetryPolicy, is_retryable
+
+
+def immediate(attempts: int):
+    """Стратегия, повторяющая запрос сразу, без пауз и Retry-After."""
+    def call(function, *args):
+        for attempt in range(attempts):
+            try:
+                return function(*args)
+            except Exception as error:
+                if attempt + 1 == attempts or not is_retryable(error):
+                    raise
+    return call
+
+
+def simulate(strategy, cycles: int, options: dict) -> dict:
+    """Прогоняет cycles циклов опроса через strategy."""
+    succeeded, waited = 0, 0.0
+    real_sleep = time.sleep
+
+    def sleep(seconds: float) -> None:
+        nonlocal waited
+        waited += seconds
+        real_sleep(seconds)
+
+    time.sleep = sleep
+    try:
+        with StubPracticumServer(
+            homeworks=make_homeworks(1), **options
+        ) as api, HttpClient() as client:
+            conditional = ConditionalRequests()
+            for timestamp in range(cycles):
+                try:
+                    strategy(
+                        homework.request_api_answer,
+                        timestamp,
+                        {'Authorization': 'OAuth benchmark'},
+                        api.url,
+                        client.get,
+                        conditional
+                    )
+                    succeeded += 1
+                except Exception:
+                    pass
+            requests = api.requests
+    finally:
+        time.sleep = real_sleep
+    return {
+        'success': succeeded / cycles,
+        'requests': requests / cycles,
+        'waited': waited
+    }
+
+
+def main() -> None:
+    """Точка входа симуляции."""
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--cycles', type=int, default=200)
+    parser.add_argument('--error-rate', type=float, default=0.2)
+    parser.add_argument('--outage', type=float, default=0.2)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    options = {
+        'error_rate': args.error_rate,
+        'outage_every': 1.0,
+        'outage_length': args.outage,
+        'burst_status': HTTPStatus.SERVICE_UNAVAILABLE,
+        'retry_after': args.outage
+    }
+    policy = RetryPolicy(
+        attempts=4,
+        base_delay=0.01,
+        max_delay=0.2,
+        deadline=0.5,
+        rng=random.Random(0)
+    )
+    for name, strategy in (
+        ('no retry', lambda function, *args: function(*args)),
+        ('immediate x4', immediate(4)),
+        ('retry policy', policy.call),
+    ):
+        result = simulate(strategy, args.cycles, options)
+        print(
+            f'{name:<14} success {result["success"]:6.1%}  '
+            f'requests/cycle {result["requests"]:5.2f}  '
+            f'waited {result["waited"]:6.2f} s'
+        )
+
+
+if __name__ == '__main__':
+    main()
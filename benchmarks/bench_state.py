@@ -0,0 +1,62 @@
+"""Стоимость записи состояния StateStore за цикл опроса.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_state --cycles 2000 --tenants 1000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from state import StateStore
+
+
+def single_tenant(path: str, cycles: int) -> None:
+    """Цикл main(): новый курсор на каждой итерации, статус — на 10-й."""
+    store = StateStore(path)
+    store.load()
+    start = time.perf_counter()
+    for cycle in range(cycles):
+        store.stage(
+            from_date=cycle,
+            last_error='',
+            statuses={cycle: 'approved'} if cycle % 10 == 0 else None
+        )
+        store.flush()
+    elapsed = time.perf_counter() - start
+    store.close()
+    print(f'single tenant: {elapsed / cycles * 1e6:.1f} us/cycle')
+
+
+def many_tenants(path: str, tenants: int, rounds: int) -> None:
+    """Раунд MultiTenantPoller: все курсоры записываются одним flush."""
+    store = StateStore(path)
+    start = time.perf_counter()
+    for tenant in range(tenants):
+        store.load(str(tenant))
+    loaded = time.perf_counter() - start
+    start = time.perf_counter()
+    for current_date in range(1, rounds + 1):
+        for tenant in range(tenants):
+            store.stage(str(tenant), from_date=current_date)
+        store.flush()
+    elapsed = time.perf_counter() - start
+    store.close()
+    print(
+        f'{tenants} tenants: load {loaded / tenants * 1e6:.1f} us/tenant, '
+        f'flush {elapsed / rounds * 1e3:.2f} ms/round '
+        f'({elapsed / rounds / tenants * 1e6:.2f} us/tenant)'
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--cycles', type=int, default=2000)
+    parser.add_argument('--tenants', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp()
+    single_tenant(os.path.join(directory, 'single.sqlite3'), args.cycles)
+    many_tenants(
+        os.path.join(directory, 'many.sqlite3'), args.tenants, args.rounds
+    )
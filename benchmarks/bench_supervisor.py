@@ -0,0 +1,116 @@
+"""Масштабирование опроса по процессам Supervisor.
+
+Каждый процесс опрашивает свою часть пользователей через
+MultiTenantPoller, но вместо сети получает готовый ответ с --homeworks
+работами, который меняется от запроса к запросу. Так измеряется
+упирающаяся в GIL часть опроса: разбор JSON и проверка работ. Для 1, 2,
+4... процессов печатаются опросы в секунду и ускорение относительно
+одного процесса; на N ядрах ожидается почти линейный рост до N.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_supervisor --tenants 400 --rounds 5
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import time
+
+from benchmarks.stub_api import NullBot, make_homeworks
+from recorder import RecordedResponse
+from supervisor import Supervisor
+
+
+class CannedClient:
+    """HTTP-клиент, отвечающий готовым телом без сети."""
+
+    def __init__(self, homeworks: int) -> None:
+        self.body = json.dumps({
+            'homeworks': make_homeworks(homeworks),
+            'current_date': 0
+        }).replace('"id": 0', '"id": {counter}', 1)
+        self.counter = 0
+
+    def open(self) -> 'CannedClient':
+        """Совместимость с HttpClient."""
+        return self
+
+    def get(self, **kwargs) -> RecordedResponse:
+        """Ответ, отличающийся от предыдущего, чтобы он разбирался заново."""
+        self.counter += 1
+        return RecordedResponse({
+            'status': 200,
+            'body': self.body.replace('{counter}', str(self.counter))
+        })
+
+    def close(self) -> None:
+        """Совместимость с HttpClient."""
+
+
+def poll_rounds(tenants: list, rounds: int, homeworks: int, results) -> None:
+    """Процесс-обработчик: rounds раз опрашивает свою часть пользователей."""
+    from multitenant import MultiTenantPoller, Tenant
+
+    logging.disable(logging.CRITICAL)
+    poller = MultiTenantPoller(
+        [Tenant(**tenant) for tenant in tenants],
+        NullBot(),
+        concurrency=4,
+        http_client=CannedClient(homeworks)
+    )
+    start = time.perf_counter()
+    for _ in range(rounds):
+        asyncio.run(poller.poll_round())
+    results.put((poller.polls, time.perf_counter() - start))
+    poller.close()
+
+
+def run(workers: int, tenants: int, rounds: int, homeworks: int) -> float:
+    """Опросы в секунду для workers процессов."""
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    supervisor = Supervisor(
+        [
+            {'token': f'token-{index}', 'chat_id': index}
+            for index in range(tenants)
+        ],
+        workers=workers,
+        target=poll_rounds,
+        args=(rounds, homeworks, results),
+        context=context
+    )
+    supervisor.resize(workers)
+    finished = [results.get() for _ in range(workers)]
+    supervisor.close()
+    return sum(polls for polls, _ in finished) / max(
+        elapsed for _, elapsed in finished
+    )
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--tenants', type=int, default=400)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--homeworks', type=int, default=200)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    workers, baseline = 1, None
+    while workers <= args.max_workers:
+        rate = run(workers, args.tenants, args.rounds, args.homeworks)
+        baseline = baseline or rate
+        print(
+            f'workers={workers:<3} {rate:8.1f} polls/s  '
+            f'speedup x{rate / baseline:4.2f}'
+        )
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+import json
+import os
+import random
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HOMEWORK_STATUSES = ('approved', 'reviewing', 'rejected')
+
+
+def make_homeworks(size: int) -> list:
+    """Список из size домашних работ в формате API Практикум Домашка."""
+    return [
+        {
+            'id': index,
+            'status': HOMEWORK_STATUSES[index % len(HOMEWORK_STATUSES)],
+            'homework_name': f'student__hw{index}.zip',
+            'reviewer_comment': 'Всё нравится',
+            'date_updated': '2020-02-13T14:40:57Z',
+            'lesson_name': 'Итоговый проект'
+        }
+        for index in range(size)
+    ]
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    """Обработчик с keep-alive, который не пишет журнал запросов."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def reply(self, status: int, data: dict, headers: dict = None) -> None:
+        """Отправляет JSON-ответ."""
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        """Не засоряет вывод бенчмарка журналом запросов."""
+
+
+class StubPracticumHandler(QuietHandler):
+    """Отвечает как эндпоинт homework_statuses API Практикум Домашка."""
+
+    def do_GET(self) -> None:
+        """Возвращает список домашних работ или ошибку по сценарию."""
+        server = self.server
+        time.sleep(server.next_latency())
+        status, headers = server.next_status()
+        if status == HTTPStatus.OK:
+            self.reply(status, {
+                'homeworks': server.homeworks,
+                'current_date': int(time.time())
+            })
+        else:
+            self.reply(
+                status,
+                {'code': 'error', 'message': 'Ошибка заглушки.'},
+                headers
+            )
+
+
+class StubPracticumServer(ThreadingHTTPServer):
+    """Локальная замена API Практикум Домашка для бенчмарков.
+
+    Отвечает с задержкой latency списком homeworks. С вероятностью
+    error_rate отвечает кодом 500, а каждые burst_every запросов отдаёт
+    burst_length ответов burst_status с заголовком Retry-After. Каждые
+    outage_every секунд первые outage_length секунд на все запросы
+    отвечает burst_status — так имитируется кратковременный сбой API.
+    С вероятностью tail_rate ответ задерживается на tail_latency вместо
+    latency — медленный хвост задержек.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        homeworks: list = (),
+        certfile: str = None,
+        error_rate: float = 0.0,
+        burst_every: int = 0,
+        burst_length: int = 0,
+        burst_status: int = HTTPStatus.TOO_MANY_REQUESTS,
+        retry_after: float = 1,
+        seed: int = 0,
+        outage_every: float = 0,
+        outage_length: float = 0,
+        tail_rate: float = 0.0,
+        tail_latency: float = 0.0
+    ) -> None:
+        super().__init__(('127.0.0.1', 0), StubPracticumHandler)
+        self.latency = latency
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.homeworks = list(homeworks)
+        self.error_rate = error_rate
+        self.burst_every = burst_every
+        self.burst_length = burst_length
+        self.burst_status = burst_status
+        self.retry_after = retry_after
+        self.outage_every = outage_every
+        self.outage_length = outage_length
+        self.started = time.monotonic()
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.scheme = 'http'
+        if certfile:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile)
+            self.socket = context.wrap_socket(self.socket, server_side=True)
+            self.scheme = 'https'
+
+    def next_latency(self) -> float:
+        """Задержка ответа на очередной запрос."""
+        if not self.tail_rate:
+            return self.latency
+        with self.lock:
+            slow = self.random.random() < self.tail_rate
+        return self.tail_latency if slow else self.latency
+
+    def next_status(self) -> tuple:
+        """Код и заголовки ответа на очередной запрос."""
+        with self.lock:
+            index = self.requests
+            self.requests += 1
+            failed = self.random.random() < self.error_rate
+        if self.burst_every and index % self.burst_every < self.burst_length:
+            return self.burst_status, {'Retry-After': str(self.retry_after)}
+        if self.outage_every and (
+            (time.monotonic() - self.started) % self.outage_every
+            < self.outage_length
+        ):
+            return self.burst_status, {'Retry-After': str(self.retry_after)}
+        if failed:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {}
+        return HTTPStatus.OK, {}
+
+    @property
+    def url(self) -> str:
+        """Адрес эндпоинта заглушки."""
+        host, port = self.server_address
+        return f'{self.scheme}://{host}:{port}/api/user_api/homework_statuses/'
+
+    def __enter__(self) -> 'StubPracticumServer':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class FakeTelegramHandler(QuietHandler):
+    """Отвечает как метод sendMessage Telegram Bot API."""
+
+    def do_POST(self) -> None:
+        """Принимает сообщение и возвращает успешный ответ."""
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.messages += 1
+            message_id = self.server.messages
+        self.reply(HTTPStatus.OK, {'ok': True, 'result': {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': 1, 'type': 'private'},
+            'text': ''
+        }})
+
+
+class FakeTelegramServer(StubPracticumServer):
+    """Локальная замена Telegram Bot API для бенчмарков.
+
+    Внутри контекста все экземпляры TeleBot отправляют запросы сюда.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        ThreadingHTTPServer.__init__(
+            self, ('127.0.0.1', 0), FakeTelegramHandler
+        )
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.messages = 0
+
+    def __enter__(self) -> 'FakeTelegramServer':
+        from telebot import apihelper
+
+        self.api_url = apihelper.API_URL
+        host, port = self.server_address
+        apihelper.API_URL = f'http://{host}:{port}/bot{{0}}/{{1}}'
+        return super().__enter__()
+
+    def __exit__(self, *exc_info) -> None:
+        from telebot import apihelper
+
+        apihelper.API_URL = self.api_url
+        super().__exit__(*exc_info)
+
+
+class NullBot:
+    """Бот-заглушка, который ничего не отправляет."""
+
+    def send_message(self, chat_id=None, text=None, **kwargs) -> None:
+        """Имитирует успешную отправку сообщения."""
+
+
+def make_self_signed_cert(directory: str = None) -> str:
+    """Создаёт самоподписанный сертификат для 127.0.0.1 через openssl.
+
+    Возвращает путь к PEM-файлу, содержащему и ключ, и сертификат.
+    """
+    directory = directory or tempfile.mkdtemp()
+    key = os.path.join(directory, 'key.pem')
+    cert = os.path.join(directory, 'cert.pem')
+    subprocess.run(
+        [
+            'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+            '-keyout', key, '-out', cert, '-days', '1',
+            '-subj', '/CN=127.0.0.1',
+            '-addext', 'subjectAltName=IP:127.0.0.1'
+        ],
+        check=True,
+        capture_output=True
+    )
+    bundle = os.path.join(directory, 'bundle.pem')
+    with open(bundle, 'w') as output:
+        for path in (key, cert):
+            with open(path) as part:
+                output.write(part.read())
+    return bundle
@@ -0,0 +1,206 @@
+"""Набор бенчмарков бота против локальных заглушек Практикума и Telegram.
+
+Замеряет get_api_answer, check_response, parse_status, send_message и
+полные итерации цикла main(), печатает p50/p95/p99 и пропускную
+способность и сравнивает их с сохранённым baseline.json. Если результат
+хуже базового больше чем на tolerance, завершается с кодом 1.
+
+Вместе с результатами замеряется эталонная нагрузка calibration. Базовые
+значения перед сравнением приводятся к скорости текущей машины по
+отношению её времени к записанному в baseline.json, поэтому baseline,
+записанный на другой машине, не даёт ложных регрессий.
+
+Запуск из корня репозитория:
+    python -m benchmarks.suite
+    python -m benchmarks.suite --update-baseline
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from typing import Callable
+
+from telebot import TeleBot
+
+import homework
+from benchmarks.stub_api import (
+    FakeTelegramServer, StubPracticumServer, make_homeworks
+)
+from clock import SystemClock
+from state import StateStore
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+LOWER_IS_BETTER = ('p50', 'p95')
+HIGHER_IS_BETTER = ('throughput',)
+CALIBRATION = 'calibration'
+
+
+class NoWaitClock(SystemClock):
+    """Настоящие часы без пауз: повторы запросов идут без ожидания."""
+
+    def sleep(self, seconds: float) -> None:
+        """Не ждёт."""
+
+
+def summarize(samples: list, errors: int) -> dict:
+    """Перцентили задержки в мс и пропускная способность в операциях/с."""
+    centiles = statistics.quantiles(samples, n=100, method='inclusive')
+    return {
+        'p50': centiles[49] * 1000,
+        'p95': centiles[94] * 1000,
+        'p99': centiles[98] * 1000,
+        'throughput': len(samples) / sum(samples),
+        'errors': errors
+    }
+
+
+def measure(function: Callable[[], object], iterations: int) -> dict:
+    """Замеряет iterations вызовов function, считая исключения."""
+    samples, errors = [], 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        try:
+            function()
+        except Exception:
+            errors += 1
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, errors)
+
+
+def calibration_workload() -> list:
+    """Эталонная нагрузка на интерпретатор для оценки скорости машины."""
+    return sorted(str(number) for number in range(1000))
+
+
+def measure_main(bot: TeleBot, iterations: int) -> dict:
+    """Замеряет итерации цикла опроса, который запускает main().
+
+    Паузы перед повторными запросами внутри итерации пропускаются,
+    поэтому в замер входят сами повторы, но не ожидание между ними.
+    Размыкатель цепи не срабатывает: иначе в замер main[flaky] попали бы
+    пропуски итераций вместо запросов.
+    """
+    loop = homework.PollingLoop(bot, StateStore(':memory:'), NoWaitClock())
+    loop.breaker.failure_threshold = sys.maxsize
+    return measure(loop.step, iterations)
+
+
+def run(iterations: int) -> dict:
+    """Запускает все сценарии и возвращает их результаты."""
+    results = {CALIBRATION: measure(calibration_workload, iterations)}
+    homeworks = make_homeworks(100)
+    response = {'homeworks': homeworks, 'current_date': 1}
+    results['check_response[100]'] = measure(
+        lambda: homework.check_response(response), iterations
+    )
+    results['parse_status'] = measure(
+        lambda: homework.parse_status(homeworks[0]), iterations
+    )
+    with FakeTelegramServer() as telegram:
+        bot = TeleBot(token='1:benchmark')
+        results['send_message'] = measure(
+            lambda: homework.send_message(bot, 'Benchmark'), iterations
+        )
+        for name, options in (
+            ('healthy', {}),
+            ('flaky', {
+                'error_rate': 0.05, 'burst_every': 50, 'burst_length': 5
+            }),
+        ):
+            with StubPracticumServer(
+                homeworks=make_homeworks(10), **options
+            ) as api, homework.HTTP_CLIENT:
+                homework.ENDPOINT = api.url
+                homework.CONDITIONAL_REQUESTS.entries.clear()
+                results[f'get_api_answer[{name}]'] = measure(
+                    lambda: homework.get_api_answer(0), iterations
+                )
+                results[f'main[{name}]'] = measure_main(bot, iterations)
+        assert telegram.messages, 'Сообщения не дошли до заглушки Telegram.'
+    return results
+
+
+def speed_ratio(results: dict, baseline: dict) -> float:
+    """Во сколько раз эта машина медленнее той, где записан baseline."""
+    if CALIBRATION not in results or CALIBRATION not in baseline:
+        return 1.0
+    return results[CALIBRATION]['p50'] / baseline[CALIBRATION]['p50']
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Возвращает описания метрик, ухудшившихся сильнее tolerance.
+
+    Базовые значения масштабируются по speed_ratio.
+    """
+    ratio = speed_ratio(results, baseline)
+    regressions = []
+    for case, metrics in results.items():
+        base = baseline.get(case)
+        if base is None or case == CALIBRATION:
+            continue
+        for metric in LOWER_IS_BETTER:
+            expected = base[metric] * ratio
+            if metrics[metric] > expected * (1 + tolerance):
+                regressions.append(
+                    f'{case} {metric}: {metrics[metric]:.3f} '
+                    f'> {expected:.3f}'
+                )
+        for metric in HIGHER_IS_BETTER:
+            expected = base[metric] / ratio
+            if metrics[metric] < expected / (1 + tolerance):
+                regressions.append(
+                    f'{case} {metric}: {metrics[metric]:.1f} '
+                    f'< {expected:.1f}'
+                )
+    return regressions
+
+
+def report(results: dict) -> None:
+    """Печатает таблицу результатов."""
+    print(
+        f'{"case":<26}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}'
+        f'{"ops/s":>12}{"errors":>8}'
+    )
+    for case, metrics in results.items():
+        print(
+            f'{case:<26}{metrics["p50"]:>10.3f}{metrics["p95"]:>10.3f}'
+            f'{metrics["p99"]:>10.3f}{metrics["throughput"]:>12.1f}'
+            f'{metrics["errors"]:>8}'
+        )
+
+
+def main() -> int:
+    """Точка входа набора бенчмарков."""
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--iterations', type=int, default=300)
+    parser.add_argument('--tolerance', type=float, default=1.0)
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    for token in homework.TOKENS:
+        setattr(homework, token, getattr(homework, token) or '1:benchmark')
+    homework.STATE_DB_PATH = ':memory:'
+    results = run(args.iterations)
+    report(results)
+    if args.update_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+        return 0
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline) as file:
+        regressions = compare(results, json.load(file), args.tolerance)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import threading
+import time
+from typing import Callable, Tuple, Type
+
+from exceptions import CircuitOpenError, StatusCodeIsNot200Error
+
+
+FAILURE_THRESHOLD = 3
+RESET_TIMEOUT = 600
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+STATES = (CLOSED, OPEN, HALF_OPEN)
+
+CIRCUIT_OPEN_ERROR = (
+    'Запросы к API приостановлены после {failures} ошибок подряд. '
+    'Пробный запрос через {retry_in:.0f} с.'
+)
+
+
+class CircuitBreaker:
+    """Размыкатель цепи вокруг запросов к API.
+
+    После failure_threshold ошибок trip_on подряд размыкается: вызовы не
+    выполняются, а сразу завершаются CircuitOpenError. Через reset_timeout
+    секунд пропускается один пробный вызов. Если он успешен, цепь
+    замыкается, иначе снова размыкается на reset_timeout. Остальные
+    ошибки (например, неверный формат ответа) размыкателем не считаются:
+    API при этом доступно.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT,
+        trip_on: Tuple[Type[Exception], ...] = (
+            ConnectionError, StatusCodeIsNot200Error
+        ),
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.trip_on = trip_on
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.avoided = 0
+        self.past_open_seconds = 0.0
+
+    def before_call(self) -> None:
+        """Пропускает вызов или завершает его CircuitOpenError."""
+        with self.lock:
+            if self.state == CLOSED:
+                return
+            now = self.clock()
+            retry_in = self.opened_at + self.reset_timeout - now
+            if self.state == OPEN and retry_in <= 0:
+                self.state = HALF_OPEN
+                return
+            self.avoided += 1
+        raise CircuitOpenError(
+            CIRCUIT_OPEN_ERROR,
+            failures=self.failures,
+            retry_in=max(retry_in, 0)
+        )
+
+    def on_success(self) -> None:
+        """Замыкает цепь после успешного вызова."""
+        with self.lock:
+            if self.opened_at is not None:
+                self.past_open_seconds += self.clock() - self.opened_at
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+
+    def on_failure(self) -> None:
+        """Учитывает ошибку и при необходимости размыкает цепь."""
+        with self.lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or (
+                self.failures >= self.failure_threshold
+            ):
+                now = self.clock()
+                if self.opened_at is not None:
+                    self.past_open_seconds += now - self.opened_at
+                self.state = OPEN
+                self.opened_at = now
+
+    def call(self, function: Callable, *args, **kwargs):
+        """Вызывает function через размыкатель."""
+        self.before_call()
+        try:
+            result = function(*args, **kwargs)
+        except self.trip_on:
+            self.on_failure()
+            raise
+        except Exception:
+            self.on_success()
+            raise
+        self.on_success()
+        return result
+
+    @property
+    def open_seconds(self) -> float:
+        """Сколько секунд цепь была разомкнута."""
+        with self.lock:
+            if self.opened_at is None:
+                return self.past_open_seconds
+            return self.past_open_seconds + self.clock() - self.opened_at
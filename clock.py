@@ -0,0 +1,47 @@
+import time
+
+
+class SystemClock:
+    """Настоящие часы процесса."""
+
+    def time(self) -> float:
+        """Текущее время Unix, с."""
+        return time.time()
+
+    def monotonic(self) -> float:
+        """Монотонное время для измерения интервалов, с."""
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        """Приостанавливает поток на seconds секунд."""
+        time.sleep(seconds)
+
+
+class SimulatedClock:
+    """Часы, время которых идёт только при вызове sleep или advance.
+
+    Позволяют прогнать недели опроса за доли секунды: пауза между
+    запросами лишь передвигает стрелки.
+    """
+
+    def __init__(self, start: float = 0.0) -> None:
+        self.now = float(start)
+
+    def time(self) -> float:
+        """Текущее моделируемое время, с."""
+        return self.now
+
+    def monotonic(self) -> float:
+        """Моделируемое время для измерения интервалов, с."""
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Передвигает время на seconds секунд без ожидания."""
+        self.advance(seconds)
+
+    def advance(self, seconds: float) -> None:
+        """Передвигает время вперёд на seconds секунд."""
+        self.now += max(seconds, 0.0)
+
+
+SYSTEM_CLOCK = SystemClock()
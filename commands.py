@@ -0,0 +1,207 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Callable, Iterable, Optional, Union
+
+from telebot import TeleBot
+
+from log_pipeline import LazyMessage
+from records import HomeworkRecord
+
+
+COMMAND_CACHE_TTL = 60.0
+HISTORY_SIZE = 20
+COMMANDS = ('status', 'history', 'ping')
+
+NO_HOMEWORKS_REPLY = 'Работ пока нет.'
+NO_HISTORY_REPLY = 'Изменений статусов пока не было.'
+STATUS_LINE = '{name}: {verdict}'
+HISTORY_LINE = '{moment:%d.%m %H:%M} {name}: {verdict}'
+PING_REPLY = 'Бот работает. {age}'
+AGE_SECONDS = 'Данные о работах обновлены {seconds:.0f} с назад.'
+AGE_UNKNOWN = 'Данные о работах ещё не загружались.'
+REFRESH_ERROR = 'Не удалось обновить статусы работ для команды: {error}'
+COMMAND_ERROR = 'Ошибка обработки команды /{command}: {error}'
+POLLING_ERROR = 'Приём команд Telegram остановлен: {error}'
+
+
+class HomeworkCache:
+    """Последние известные статусы работ для ответов на команды.
+
+    Цикл опроса обновляет кеш каждым ответом API. Если данные старше ttl
+    секунд, refresh запрашивает полный список работ через fetch.
+    Одновременные запросы объединяет сам fetch: PollingLoop.fetch_all
+    идёт через cached_api_answer.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Iterable[HomeworkRecord]],
+        ttl: float = COMMAND_CACHE_TTL,
+        history_size: int = HISTORY_SIZE,
+        clock: Callable[[], float] = time.time
+    ) -> None:
+        self.fetch = fetch
+        self.ttl = ttl
+        self.clock = clock
+        self.homeworks = OrderedDict()
+        self.history = deque(maxlen=history_size)
+        self.updated = None
+        self.complete = False
+        self.lock = threading.Lock()
+
+    def update(
+        self, homeworks: Iterable[HomeworkRecord], complete: bool = False
+    ) -> None:
+        """Запоминает статусы работ и изменения статусов.
+
+        complete означает полный список работ; до первого полного списка
+        кеш считается устаревшим, а новые работы не попадают в историю.
+        """
+        now = self.clock()
+        with self.lock:
+            for homework in homeworks:
+                known = self.homeworks.get(homework.key)
+                if known is None and self.complete or (
+                    known is not None and known.status != homework.status
+                ):
+                    self.history.append((now, homework))
+                self.homeworks[homework.key] = homework
+            self.complete = self.complete or complete
+            self.updated = now
+
+    def age(self) -> Optional[float]:
+        """Сколько секунд назад обновлялся кеш, или None."""
+        if self.updated is None:
+            return None
+        return self.clock() - self.updated
+
+    def fresh(self) -> bool:
+        """Обновлялся ли кеш не раньше чем ttl секунд назад."""
+        age = self.age()
+        return self.complete and age is not None and age < self.ttl
+
+    def refresh(self) -> None:
+        """Обновляет устаревший кеш.
+
+        При ошибке запроса кеш остаётся прежним.
+        """
+        if self.fresh():
+            return
+        try:
+            self.update(self.fetch(), complete=True)
+        except Exception as error:
+            logging.warning(LazyMessage(REFRESH_ERROR, error=error))
+
+    def snapshot(self) -> list:
+        """Статусы работ после обновления устаревшего кеша."""
+        self.refresh()
+        with self.lock:
+            return list(self.homeworks.values())
+
+    def changes(self) -> list:
+        """Пары (время, работа) для последних изменений статусов."""
+        with self.lock:
+            return list(self.history)
+
+
+class CommandHandlers:
+    """Команды /status, /history и /ping бота.
+
+    Отвечают только в чат chat_id и только из кеша, поэтому приём команд
+    в отдельном потоке не мешает циклу опроса, а поток команд не делает
+    больше одного запроса к API за ttl кеша.
+    """
+
+    def __init__(
+        self,
+        sender: TeleBot,
+        cache: HomeworkCache,
+        chat_id: Union[int, str],
+        verdicts: dict
+    ) -> None:
+        self.sender = sender
+        self.cache = cache
+        self.chat_id = str(chat_id)
+        self.verdicts = verdicts
+
+    def allowed(self, message) -> bool:
+        """Пришла ли команда из чата владельца."""
+        return str(message.chat.id) == self.chat_id
+
+    def register(self, bot: TeleBot) -> None:
+        """Регистрирует обработчики команд в bot."""
+        for command in COMMANDS:
+            bot.register_message_handler(
+                self.handler(command),
+                commands=[command],
+                func=self.allowed
+            )
+
+    def handler(self, command: str) -> Callable:
+        """Обработчик команды: ответ или запись об ошибке в журнал."""
+        reply = getattr(self, command)
+
+        def handle(message) -> None:
+            try:
+                self.sender.send_message(message.chat.id, reply())
+            except Exception as error:
+                logging.exception(LazyMessage(
+                    COMMAND_ERROR, command=command, error=error
+                ))
+        return handle
+
+    def verdict(self, homework: HomeworkRecord) -> str:
+        """Вердикт для статуса работы."""
+        return self.verdicts.get(homework.status, homework.status)
+
+    def status(self) -> str:
+        """Ответ на /status: текущие статусы всех работ."""
+        homeworks = self.cache.snapshot()
+        if not homeworks:
+            return NO_HOMEWORKS_REPLY
+        return '\n'.join(
+            STATUS_LINE.format(
+                name=homework.name, verdict=self.verdict(homework)
+            )
+            for homework in homeworks
+        )
+
+    def history(self) -> str:
+        """Ответ на /history: последние изменения статусов."""
+        changes = self.cache.changes()
+        if not changes:
+            return NO_HISTORY_REPLY
+        return '\n'.join(
+            HISTORY_LINE.format(
+                moment=datetime.fromtimestamp(moment),
+                name=homework.name,
+                verdict=self.verdict(homework)
+            )
+            for moment, homework in changes
+        )
+
+    def ping(self) -> str:
+        """Ответ на /ping: бот жив и насколько свежи данные."""
+        age = self.cache.age()
+        return PING_REPLY.format(
+            age=AGE_UNKNOWN if age is None else AGE_SECONDS.format(
+                seconds=age
+            )
+        )
+
+
+def start_polling(bot: TeleBot) -> threading.Thread:
+    """Принимает команды Telegram в фоновом потоке."""
+    def poll() -> None:
+        try:
+            bot.infinity_polling(skip_pending=True)
+        except Exception as error:
+            logging.error(POLLING_ERROR.format(error=error))
+    thread = threading.Thread(
+        target=poll, name='telegram-commands', daemon=True
+    )
+    thread.start()
+    return thread
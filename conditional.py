@@ -0,0 +1,133 @@
+import hashlib
+import re
+import threading
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Optional
+
+import requests
+
+
+CURRENT_DATE_PATTERN = re.compile(rb'"current_date"\s*:\s*(\d+)')
+
+
+@dataclass
+class CachedResponse:
+    """Последний разобранный ответ API и его валидаторы."""
+
+    digest: bytes
+    data: dict
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    homeworks: Optional[list] = None
+    hit: bool = False
+
+
+class ConditionalRequests:
+    """Условные запросы и короткое замыкание для неизменных ответов API.
+
+    Если сервер присылает ETag или Last-Modified, следующий запрос
+    отправляется с If-None-Match/If-Modified-Since, и ответ 304 не
+    требует ни тела, ни разбора. Иначе сравнивается хеш тела без
+    меняющегося на каждом запросе поля current_date: при совпадении
+    тело не декодируется, а возвращается уже проверенный ранее ответ.
+    Короткое замыкание срабатывает только для ответа, успешно прошедшего
+    проверку (см. validated), чтобы ошибка в ответе не терялась.
+    """
+
+    def __init__(self) -> None:
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.hits = 0
+
+    @staticmethod
+    def key(headers: dict) -> str:
+        """Ключ кеша — заголовок авторизации пользователя."""
+        return headers.get('Authorization', '')
+
+    def headers(self, headers: dict) -> dict:
+        """Добавляет к заголовкам запроса валидаторы прошлого ответа."""
+        entry = self.entries.get(self.key(headers))
+        if entry is None:
+            return headers
+        conditional = dict(headers)
+        if entry.etag:
+            conditional['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            conditional['If-Modified-Since'] = entry.last_modified
+        return conditional
+
+    @staticmethod
+    def digest(body: bytes) -> bytes:
+        """Хеш тела ответа без поля current_date."""
+        return hashlib.blake2b(
+            CURRENT_DATE_PATTERN.sub(b'', body), digest_size=16
+        ).digest()
+
+    def lookup(
+        self, headers: dict, response: requests.Response
+    ) -> Optional[dict]:
+        """Возвращает сохранённый ответ, если новый ответ не изменился."""
+        key = self.key(headers)
+        entry = self.entries.get(key)
+        with self.lock:
+            self.requests += 1
+        if entry is None:
+            return None
+        entry.hit = False
+        if entry.homeworks is None:
+            return None
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            data = entry.data
+        elif response.status_code == HTTPStatus.OK:
+            body = getattr(response, 'content', None)
+            if not isinstance(body, bytes):
+                return None
+            if self.digest(body) != entry.digest:
+                return None
+            match = CURRENT_DATE_PATTERN.search(body)
+            data = entry.data
+            if match:
+                data = dict(data, current_date=int(match.group(1)))
+        else:
+            return None
+        entry.hit = True
+        with self.lock:
+            self.hits += 1
+        return data
+
+    def remember(
+        self, headers: dict, response: requests.Response, data: dict
+    ) -> None:
+        """Запоминает разобранный ответ и его валидаторы."""
+        body = getattr(response, 'content', None)
+        if not isinstance(body, bytes) or not isinstance(data, dict):
+            return
+        if not isinstance(data.get('homeworks'), list):
+            return
+        response_headers = getattr(response, 'headers', None) or {}
+        self.entries[self.key(headers)] = CachedResponse(
+            digest=self.digest(body),
+            data=data,
+            etag=response_headers.get('ETag'),
+            last_modified=response_headers.get('Last-Modified')
+        )
+
+    def validated(self, headers: dict, data: dict, homeworks: list) -> None:
+        """Запоминает записи работ, полученные проверкой ответа data."""
+        entry = self.entries.get(self.key(headers))
+        if entry is not None and entry.data is data:
+            entry.homeworks = homeworks
+
+    def records(self, headers: dict) -> Optional[list]:
+        """Проверенные записи работ, если последний ответ взят из кеша."""
+        entry = self.entries.get(self.key(headers))
+        if entry is None or not entry.hit:
+            return None
+        return entry.homeworks
+
+    @property
+    def ratio(self) -> float:
+        """Доля запросов, для которых разбор ответа был пропущен."""
+        return self.hits / self.requests if self.requests else 0.0
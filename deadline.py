@@ -0,0 +1,56 @@
+import contextlib
+import contextvars
+import time
+from typing import Callable, Iterator, Optional
+
+
+CYCLE_BUDGET = 60.0
+
+CURRENT = contextvars.ContextVar('deadline', default=None)
+
+
+class Deadline:
+    """Момент, к которому должна закончиться текущая работа.
+
+    Время отсчитывается по clock, поэтому с SimulatedClock бюджет
+    расходуется вместе с моделируемым временем.
+    """
+
+    def __init__(
+        self, budget: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.clock = clock
+        self.expires = clock() + budget
+
+    def remaining(self) -> float:
+        """Сколько секунд осталось; не меньше нуля."""
+        return max(self.expires - self.clock(), 0.0)
+
+    def expired(self) -> bool:
+        """Истёк ли бюджет."""
+        return self.remaining() <= 0
+
+
+def current() -> Optional[Deadline]:
+    """Дедлайн, установленный budget в текущем контексте, или None."""
+    return CURRENT.get()
+
+
+@contextlib.contextmanager
+def budget(
+    seconds: float, clock: Callable[[], float] = time.monotonic
+) -> Iterator[Deadline]:
+    """Ограничивает вложенный блок seconds секундами.
+
+    Вложенный бюджет не выходит за внешний. HTTP-запросы и повторы
+    внутри блока сокращают свои таймауты и паузы до оставшегося времени.
+    """
+    deadline = Deadline(seconds, clock)
+    outer = current()
+    if outer is not None and outer.expires < deadline.expires:
+        deadline = outer
+    token = CURRENT.set(deadline)
+    try:
+        yield deadline
+    finally:
+        CURRENT.reset(token)
@@ -0,0 +1,150 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+
+ERROR_WINDOW = 3600
+MAX_FINGERPRINTS = 100
+IGNORED_FIELDS = ('headers', 'params', 'retry_after')
+
+STILL_FAILING_MESSAGE = (
+    'Сбой продолжается: ошибка повторилась {count} раз за '
+    '{minutes:.0f} мин., всего {total} раз.\n'
+    'Последняя ошибка: {error}'
+)
+RECOVERED_MESSAGE = (
+    'Работа восстановлена. Сбой длился {minutes:.0f} мин., '
+    'ошибок за это время: {total}.'
+)
+
+
+def fingerprint(error: Exception) -> str:
+    """Отпечаток ошибки: класс исключения и значимые поля.
+
+    У исключений с полями (LazyMessageError) учитываются все поля, кроме
+    меняющихся от запроса к запросу заголовков, параметров и Retry-After,
+    а вложенные исключения представлены своим классом. У остальных
+    исключений учитывается текст.
+    """
+    fields = getattr(error, 'fields', None)
+    if not isinstance(fields, dict):
+        return f'{type(error).__name__}: {error}'
+    parts = [type(error).__name__]
+    for name in sorted(fields):
+        if name in IGNORED_FIELDS:
+            continue
+        value = fields[name]
+        if isinstance(value, BaseException):
+            value = type(value).__name__
+        parts.append(f'{name}={value}')
+    return ' '.join(parts)
+
+
+class ErrorAggregator:
+    """Решает, о каких ошибках и когда сообщать в Telegram.
+
+    О новой ошибке сообщается сразу, а её повторы с тем же отпечатком
+    копятся window секунд, после чего отправляется сводка «сбой
+    продолжается». Сообщение о новой ошибке строится по шаблону
+    new_error_message с полем error. После первого успешного цикла
+    отправляется сообщение о восстановлении. Хранится не больше
+    max_fingerprints отпечатков: самые давние вытесняются.
+    """
+
+    def __init__(
+        self,
+        window: float = ERROR_WINDOW,
+        max_fingerprints: int = MAX_FINGERPRINTS,
+        clock: Callable[[], float] = time.time,
+        new_error_message: str = '{error}'
+    ) -> None:
+        self.window = window
+        self.new_error_message = new_error_message
+        self.max_fingerprints = max_fingerprints
+        self.clock = clock
+        self.active = OrderedDict()
+        self.started = None
+        self.total = 0
+
+    def record(self, error: Exception) -> Optional[str]:
+        """Учитывает ошибку и возвращает сообщение, если о ней пора сообщить.
+
+        Текст ошибки формируется только для отправляемого сообщения.
+        """
+        now = self.clock()
+        key = fingerprint(error)
+        if self.started is None:
+            self.started = now
+        self.total += 1
+        entry = self.active.pop(key, None)
+        if entry is None:
+            self.active[key] = [now, 0, 1]
+            self.evict()
+            return self.new_error_message.format(error=error)
+        announced, count, total = entry
+        count += 1
+        total += 1
+        if now - announced < self.window:
+            self.active[key] = [announced, count, total]
+            return None
+        self.active[key] = [now, 0, total]
+        return STILL_FAILING_MESSAGE.format(
+            count=count,
+            minutes=(now - announced) / 60,
+            total=total,
+            error=error
+        )
+
+    def recover(self) -> Optional[str]:
+        """Сбрасывает ошибки после успешного цикла.
+
+        Возвращает сообщение о восстановлении, если до этого был сбой.
+        """
+        if self.started is None:
+            return None
+        message = RECOVERED_MESSAGE.format(
+            minutes=(self.clock() - self.started) / 60,
+            total=self.total
+        )
+        self.active.clear()
+        self.started = None
+        self.total = 0
+        return message
+
+    def evict(self) -> None:
+        """Вытесняет самые давние отпечатки сверх max_fingerprints."""
+        while len(self.active) > self.max_fingerprints:
+            self.active.popitem(last=False)
+
+    def dump(self) -> str:
+        """Состояние в виде строки для StateStore."""
+        if self.started is None:
+            return ''
+        return json.dumps({
+            'started': self.started,
+            'total': self.total,
+            'active': list(self.active.items())
+        }, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, data: str, **kwargs) -> 'ErrorAggregator':
+        """Восстанавливает состояние, сохранённое методом dump.
+
+        Строка в другом формате (например, текст последней ошибки из
+        прежних версий) игнорируется.
+        """
+        aggregator = cls(**kwargs)
+        try:
+            state = json.loads(data)
+            active = OrderedDict(
+                (key, list(entry)) for key, entry in state['active']
+            )
+            started, total = state['started'], state['total']
+        except (ValueError, TypeError, KeyError):
+            return aggregator
+        aggregator.active = active
+        aggregator.started = started
+        aggregator.total = total
+        aggregator.evict()
+        return aggregator
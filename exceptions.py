@@ -1,10 +1,63 @@
+REDACTED = '***'
+SECRET_HEADERS = ('authorization',)
+
+
+def redact_headers(headers: dict) -> dict:
+    """Копия заголовков, в которой скрыты значения токенов."""
+    return {
+        name: (
+            f'{str(value).split(" ", 1)[0]} {REDACTED}'
+            if name.lower() in SECRET_HEADERS else value
+        )
+        for name, value in headers.items()
+    }
+
+
+class LazyMessageError(Exception):
+    """Исключение, текст которого формируется только при выводе.
+
+    Хранит шаблон сообщения и его поля, а строку собирает при первом
+    вызове __str__, скрывая токен в заголовке Authorization.
+    """
+
+    def __init__(self, template: str, **fields) -> None:
+        super().__init__(template)
+        self.template = template
+        self.fields = fields
+        self.message = None
+
+    def __str__(self) -> str:
+        if self.message is None:
+            fields = self.fields
+            if isinstance(fields.get('headers'), dict):
+                fields = dict(
+                    fields, headers=redact_headers(fields['headers'])
+                )
+            self.message = (
+                self.template.format(**fields) if fields else self.template
+            )
+        return self.message
+
+
 class NoTokensError(Exception):
     """Класс исключения для обработки ошибок проверки переменных окружения."""
 
 
-class StatusCodeIsNot200Error(Exception):
+class RequestFailedError(LazyMessageError, ConnectionError):
+    """Класс исключения для обработки сбоя соединения с API."""
+
+
+class StatusCodeIsNot200Error(LazyMessageError):
     """Класс исключения для обработки ошибок во время запроса к API."""
 
 
-class ErrorKeyInResponseError(Exception):
+class ErrorKeyInResponseError(LazyMessageError):
     """Класс исключения для обработки наличия ключа ошибки в ответе API."""
+
+
+class CircuitOpenError(LazyMessageError):
+    """Класс исключения для пропущенного из-за размыкателя запроса к API."""
+
+
+class ShutdownRequested(BaseException):
+    """Прерывает ожидание main() по сигналу остановки процесса."""
@@ -1,16 +1,44 @@
 from http import HTTPStatus
 import logging
 import os
+import random
 import sys
+import threading
 import time
+from concurrent.futures import Future
+from typing import Callable, Optional, Union
 
 import requests
 from dotenv import load_dotenv
 from telebot import TeleBot
 
+from circuit_breaker import CLOSED, STATES, CircuitBreaker
+from clock import SYSTEM_CLOCK, SystemClock
+from commands import CommandHandlers, HomeworkCache, start_polling
+from conditional import ConditionalRequests
+from deadline import budget
+from error_aggregator import ErrorAggregator
 from exceptions import (
-    ErrorKeyInResponseError, NoTokensError, StatusCodeIsNot200Error
+    CircuitOpenError, ErrorKeyInResponseError, NoTokensError,
+    RequestFailedError, ShutdownRequested, StatusCodeIsNot200Error
 )
+from http_client import Hedger, HttpClient
+from leases import LeaseStore
+from log_pipeline import (
+    LazyMessage, make_file_handler, make_formatter, start_listener
+)
+from metrics import REGISTRY, MetricsServer
+from outbox import Outbox
+from profiler import Profiler
+from recorder import TrafficRecorder
+from records import HomeworkRecord, decode_json
+from response_cache import ResponseCache
+from retry import RetryPolicy
+from scheduler import make_scheduler
+from send_queue import SendQueue
+from shutdown import GracefulShutdown
+from state import DEFAULT_TENANT, StateStore
+from tracker import StatusTracker
 
 
 load_dotenv()
@@ -20,8 +48,126 @@ TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 
 RETRY_PERIOD = 600
+POLLING_SCHEDULER = os.getenv('POLLING_SCHEDULER', 'fixed')
+REVIEWING_RETRY_PERIOD = int(os.getenv('REVIEWING_RETRY_PERIOD', 60))
+MIN_RETRY_PERIOD = int(os.getenv('MIN_RETRY_PERIOD', 30))
+MAX_RETRY_PERIOD = int(os.getenv('MAX_RETRY_PERIOD', 3600))
+STATE_DB_PATH = os.getenv('STATE_DB_PATH', 'homework_state.sqlite3')
+TELEGRAM_SEND_QUEUE = os.getenv('TELEGRAM_SEND_QUEUE') == '1'
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+HTTP_CLIENT = HttpClient(
+    pool_size=int(os.getenv('HTTP_POOL_SIZE', 10)),
+    connect_timeout=float(os.getenv('HTTP_CONNECT_TIMEOUT', 3.05)),
+    read_timeout=float(os.getenv('HTTP_READ_TIMEOUT', 10)),
+    hedger=Hedger() if os.getenv('API_HEDGING') == '1' else None
+)
+CONDITIONAL_REQUESTS = ConditionalRequests()
+RESPONSE_CACHE = ResponseCache(
+    ttl=float(os.getenv('RESPONSE_CACHE_TTL', 30)),
+    max_entries=int(os.getenv('RESPONSE_CACHE_SIZE', 1024))
+)
+API_RECORD_PATH = os.getenv('API_RECORD_PATH')
+API_RECORDER = TrafficRecorder(API_RECORD_PATH) if API_RECORD_PATH else None
+SHUTDOWN = GracefulShutdown()
+PROFILER = Profiler(
+    directory=os.getenv('PROFILE_DIR', 'profiles'),
+    cycles=int(os.getenv('PROFILE_CYCLES', 10))
+)
+PROFILE_ON_START = os.getenv('PROFILE_ON_START') == '1'
+TELEGRAM_COMMANDS = os.getenv('TELEGRAM_COMMANDS') == '1'
+COMMAND_CACHE_TTL = float(os.getenv('COMMAND_CACHE_TTL', 60))
+LEASE_DB_PATH = os.getenv('LEASE_DB_PATH')
+LEASE_TTL = float(os.getenv('LEASE_TTL', 30))
+SHUTDOWN_TIMEOUT = float(os.getenv('SHUTDOWN_TIMEOUT', 10))
+API_RETRY_ATTEMPTS = int(os.getenv('API_RETRY_ATTEMPTS', 3))
+API_RETRY_BASE_DELAY = float(os.getenv('API_RETRY_BASE_DELAY', 1))
+API_RETRY_MAX_DELAY = float(os.getenv('API_RETRY_MAX_DELAY', 30))
+API_RETRY_DEADLINE = float(os.getenv('API_RETRY_DEADLINE', 60))
+POLL_BUDGET = float(os.getenv('POLL_BUDGET', 60))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 3))
+CIRCUIT_RESET_TIMEOUT = int(os.getenv('CIRCUIT_RESET_TIMEOUT', 600))
+ERROR_WINDOW = int(os.getenv('ERROR_WINDOW', 3600))
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024))
+LOG_ROTATE_WHEN = os.getenv('LOG_ROTATE_WHEN')
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 5))
+
+API_REQUEST_SECONDS = REGISTRY.histogram(
+    'homework_api_request_seconds',
+    'Время запроса к API Практикум Домашка, с.'
+)
+SEND_MESSAGE_SECONDS = REGISTRY.histogram(
+    'homework_send_message_seconds',
+    'Время отправки сообщения в Telegram, с.'
+)
+SENT_MESSAGES = REGISTRY.counter(
+    'homework_sent_messages_total',
+    'Сообщения, отправленные в Telegram, по результату.'
+)
+POLL_CYCLES = REGISTRY.counter(
+    'homework_poll_cycles_total',
+    'Итерации цикла опроса.'
+)
+POLL_ERRORS = REGISTRY.counter(
+    'homework_poll_errors_total',
+    'Ошибки цикла опроса по типу исключения.'
+)
+CURSOR_LAG = REGISTRY.gauge(
+    'homework_cursor_lag_seconds',
+    'Отставание from_date следующего запроса от текущего времени, с.'
+)
+API_RETRIES = REGISTRY.counter(
+    'homework_api_retries_total',
+    'Повторные запросы к API после временных ошибок.'
+)
+CIRCUIT_STATE = REGISTRY.gauge(
+    'homework_circuit_state',
+    'Состояние размыкателя запросов к API: 0 — замкнут, 1 — разомкнут, '
+    '2 — пробный запрос.'
+)
+CIRCUIT_CALLS_AVOIDED = REGISTRY.counter(
+    'homework_circuit_calls_avoided_total',
+    'Запросы к API, пропущенные разомкнутым размыкателем.'
+)
+CIRCUIT_OPEN_SECONDS = REGISTRY.counter(
+    'homework_circuit_open_seconds_total',
+    'Время, которое размыкатель запросов к API был разомкнут, с.'
+)
+API_HEDGED_REQUESTS = REGISTRY.counter(
+    'homework_api_hedged_requests_total',
+    'Дублирующие запросы к API, отправленные из-за медленного ответа.',
+    function=lambda: getattr(HTTP_CLIENT.hedger, 'hedged', 0)
+)
+API_HEDGE_WINS = REGISTRY.counter(
+    'homework_api_hedge_wins_total',
+    'Дублирующие запросы к API, ответ на которые пришёл первым.',
+    function=lambda: getattr(HTTP_CLIENT.hedger, 'hedge_wins', 0)
+)
+RESPONSE_CACHE_HITS = REGISTRY.counter(
+    'homework_response_cache_hits_total',
+    'Ответы API, взятые из кеша.',
+    function=lambda: RESPONSE_CACHE.hits
+)
+RESPONSE_CACHE_MISSES = REGISTRY.counter(
+    'homework_response_cache_misses_total',
+    'Запросы к API, выполненные из-за отсутствия ответа в кеше.',
+    function=lambda: RESPONSE_CACHE.misses
+)
+RESPONSE_CACHE_COALESCED = REGISTRY.counter(
+    'homework_response_cache_coalesced_total',
+    'Запросы, дождавшиеся уже выполняющегося запроса с тем же ключом.',
+    function=lambda: RESPONSE_CACHE.coalesced
+)
+OUTBOX_DEPTH = REGISTRY.gauge(
+    'homework_outbox_depth',
+    'Сообщения в outbox, ожидающие отправки.'
+)
+SEND_QUEUE_DEPTH = REGISTRY.gauge(
+    'homework_send_queue_depth',
+    'Сообщения в очереди отправки Telegram.'
+)
 
 HOMEWORK_VERDICTS = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
@@ -89,8 +235,25 @@ NEW_STATUS = (
     '{verdict}'
 )
 NO_NEW_STATUS = 'Статус домашней работы не изменился.'
+RESPONSE_NOT_CHANGED = (
+    'Ответ API не изменился, разбор пропущен. '
+    'Доля таких циклов: {ratio:.0%}.'
+)
+LEASE_ACQUIRED_MESSAGE = 'Экземпляр стал ведущим и начинает опрос API.'
+LEASE_LOST_MESSAGE = (
+    'Аренда опроса перешла к другому экземпляру, опрос приостановлен.'
+)
+SHUTDOWN_MESSAGE = 'Получен сигнал остановки, сохраняю состояние.'
+SHUTDOWN_TIMEOUT_MESSAGE = (
+    'Отправка сообщений не завершилась за {timeout} с, '
+    'они будут отправлены после перезапуска.'
+)
 MAIN_ERROR_MESSAGE = 'Сбой в работе программы: {error}'
 NO_NEW_ERROR_MESSAGE = 'При новом запросе ошибка не изменилась'
+NEXT_REQUEST_MESSAGE = (
+    'Следующий запрос через {delay:.0f} с. '
+    'Сэкономлено запросов по сравнению с RETRY_PERIOD: {saved}.'
+)
 
 
 def check_tokens() -> None:
@@ -101,52 +264,130 @@ def check_tokens() -> None:
         raise NoTokensError(NO_TOKENS_ERROR.format(tokens=missing_tokens))
 
 
-def send_message(bot: TeleBot, message: str) -> bool:
-    """Отправляет сообщение в Telegram-чат."""
+def send_message(bot: TeleBot, message: str) -> Union[bool, Future]:
+    """Отправляет сообщение в Telegram-чат.
+
+    Если bot — SendQueue, возвращает Future отправки из очереди.
+    """
+    return send_to_chat(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_to_chat(
+    bot: TeleBot, chat_id: Union[int, str], message: str
+) -> Union[bool, Future]:
+    """Отправляет сообщение в чат chat_id, как send_message."""
+    start = time.perf_counter()
     try:
-        bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
-        logging.debug(SEND_MESSAGE_SUCCESS.format(message=message))
+        result = bot.send_message(chat_id=chat_id, text=message)
+        if isinstance(result, Future):
+            return result
+        logging.debug(LazyMessage(SEND_MESSAGE_SUCCESS, message=message))
+        SENT_MESSAGES.inc(result='ok')
         return True
     except Exception as error:
-        logging.exception(SEND_MESSAGE_ERROR.format(
+        logging.exception(LazyMessage(
+            SEND_MESSAGE_ERROR,
             message=message,
             error=error
         ))
+        SENT_MESSAGES.inc(result='error')
         return False
+    finally:
+        SEND_MESSAGE_SECONDS.observe(time.perf_counter() - start)
 
 
 def get_api_answer(timestamp: int) -> dict:
-    """Делает запрос к эндпоинту API-сервиса Практикум Домашка."""
+    """Делает запрос к эндпоинту API-сервиса Практикум Домашка.
+
+    Если задан API_RECORD_PATH, запрос и ответ дописываются в этот файл.
+    """
+    if API_RECORDER is None:
+        return request_api_answer(timestamp, HEADERS)
+    return request_api_answer(
+        timestamp, HEADERS, http_get=API_RECORDER.wrap(HTTP_CLIENT.get)
+    )
+
+
+def cached_api_answer(
+    timestamp: int, headers: Optional[dict] = None, **kwargs
+) -> dict:
+    """Ответ API из RESPONSE_CACHE по ключу (токен, from_date).
+
+    Для потребителей, которым не нужен новый запрос на каждый вызов:
+    одинаковые запросы в пределах RESPONSE_CACHE_TTL и одновременные
+    одинаковые запросы выполняются один раз.
+    """
+    headers = headers or HEADERS
+    return RESPONSE_CACHE.call(
+        (headers.get('Authorization'), timestamp),
+        request_api_answer,
+        timestamp,
+        headers,
+        **kwargs
+    )
+
+
+def request_api_answer(
+    timestamp: int,
+    headers: dict,
+    url: Optional[str] = None,
+    http_get: Optional[Callable[..., requests.Response]] = None,
+    conditional: Optional[ConditionalRequests] = None
+) -> dict:
+    """Делает запрос к API-сервису с заголовками конкретного пользователя."""
+    conditional = conditional or CONDITIONAL_REQUESTS
     request_parameters = dict(
-        url=ENDPOINT,
-        headers=HEADERS,
+        url=url or ENDPOINT,
+        headers=conditional.headers(headers),
         params={'from_date': timestamp}
     )
+    start = time.perf_counter()
     try:
-        response = requests.get(**request_parameters)
+        response = (http_get or HTTP_CLIENT.get)(
+            **request_parameters
+        )
     except requests.RequestException as error:
-        raise ConnectionError(REQUEST_ERROR.format(
+        raise RequestFailedError(
+            REQUEST_ERROR,
             error=error,
             **request_parameters
+        ) from error
+    finally:
+        API_REQUEST_SECONDS.observe(time.perf_counter() - start)
+    cached = conditional.lookup(headers, response)
+    if cached is not None:
+        logging.debug(LazyMessage(
+            RESPONSE_NOT_CHANGED, ratio=conditional.ratio
         ))
+        return cached
     if response.status_code != HTTPStatus.OK:
-        raise StatusCodeIsNot200Error(STATUS_IS_NOT_OK_ERROR.format(
+        raise StatusCodeIsNot200Error(
+            STATUS_IS_NOT_OK_ERROR,
             status_code=response.status_code,
+            retry_after=(getattr(response, 'headers', None) or {}).get(
+                'Retry-After'
+            ),
             **request_parameters
-        ))
-    response = response.json()
+        )
+    data = decode_json(response)
     for key in ERROR_KEYS_IN_RESPONSE:
-        if key in response:
-            raise ErrorKeyInResponseError(RESPONSE_HAS_ERROR_KEY_ERROR.format(
+        if key in data:
+            raise ErrorKeyInResponseError(
+                RESPONSE_HAS_ERROR_KEY_ERROR,
                 key=key,
-                data=response[key],
+                data=data[key],
                 **request_parameters
-            ))
-    return response
+            )
+    conditional.remember(headers, response, data)
+    return data
+
 
+def check_response(response: dict) -> list:
+    """Проверяет ответ API на соответствие документации.
 
-def check_response(response: dict) -> None:
-    """Проверяет ответ API на соответствие документации."""
+    Заодно проверяет каждую домашнюю работу и возвращает их в виде
+    записей HomeworkRecord, чтобы ответ не приходилось обходить снова.
+    """
     if not isinstance(response, dict):
         raise TypeError(RESPONSE_IS_NOT_DICT_ERROR.format(
             data_type=type(response)
@@ -158,10 +399,11 @@ def check_response(response: dict) -> None:
         raise TypeError(HOMEWORKS_IS_NOT_LIST_ERROR.format(
             data_type=type(homeworks)
         ))
+    return [parse_homework(homework) for homework in homeworks]
 
 
-def parse_status(homework: dict) -> str:
-    """Извлекает статус домашней работы."""
+def parse_homework(homework: dict) -> HomeworkRecord:
+    """Проверяет домашнюю работу и возвращает её запись."""
     missing_keys = [
         key for key in REQUIRED_KEYS_IN_HOMEWORK if key not in homework
     ]
@@ -170,54 +412,350 @@ def parse_status(homework: dict) -> str:
     status = homework['status']
     if status not in HOMEWORK_VERDICTS:
         raise ValueError(UNKNOWN_STATUS_ERROR.format(status=status))
+    return HomeworkRecord(
+        homework.get('id'), homework['homework_name'], status
+    )
+
+
+def status_message(homework: HomeworkRecord) -> str:
+    """Формирует сообщение о статусе проверенной домашней работы."""
     return NEW_STATUS.format(
-        name=homework['homework_name'],
-        verdict=HOMEWORK_VERDICTS[status]
+        name=homework.name,
+        verdict=HOMEWORK_VERDICTS[homework.status]
     )
 
 
+def parse_status(homework: dict) -> str:
+    """Извлекает статус домашней работы."""
+    return status_message(parse_homework(homework))
+
+
+def validate_response(response: dict, headers: dict) -> list:
+    """Проверяет ответ API, если он изменился с прошлого запроса.
+
+    Для неизменного ответа возвращает записи, проверенные ранее.
+    """
+    homeworks = CONDITIONAL_REQUESTS.records(headers)
+    if homeworks is None:
+        homeworks = check_response(response)
+        CONDITIONAL_REQUESTS.validated(headers, response, homeworks)
+    return homeworks
+
+
+def queue_status_changes(
+    outbox: Outbox, tracker: StatusTracker, homeworks: list
+) -> None:
+    """Ставит в outbox сообщения об изменившихся статусах всех работ."""
+    for homework in homeworks:
+        outbox.put(TELEGRAM_CHAT_ID, status_message(homework))
+        tracker.commit(homework)
+
+
+def error_report(
+    errors: ErrorAggregator, error: Optional[Exception] = None
+) -> Optional[str]:
+    """Возвращает сообщение об ошибке цикла или о восстановлении.
+
+    Без error цикл считается успешным. None — сообщать пока не о чем.
+    """
+    message = errors.recover() if error is None else errors.record(error)
+    if message is None and error is not None:
+        logging.debug(NO_NEW_ERROR_MESSAGE)
+    return message
+
+
+def queue_error_report(
+    outbox: Outbox,
+    errors: ErrorAggregator,
+    error: Optional[Exception] = None
+) -> None:
+    """Ставит в outbox сообщение об ошибке цикла или о восстановлении.
+
+    Без error цикл считается успешным, и после сбоя в outbox попадает
+    сообщение о восстановлении.
+    """
+    message = error_report(errors, error)
+    if message is not None:
+        outbox.put(TELEGRAM_CHAT_ID, message)
+
+
+def deliver_messages(
+    bot: TeleBot, outbox: Outbox, now: Optional[float] = None
+) -> int:
+    """Отправляет в Telegram сообщения из outbox, срок которых подошёл.
+
+    Через SendQueue сообщение удаляется из outbox только после отправки.
+    """
+    return outbox.deliver(
+        lambda chat_id, text: send_message(bot, text), now=now
+    )
+
+
+def shutdown_gracefully(
+    bot: TeleBot,
+    store: StateStore,
+    outbox: Outbox,
+    timeout: float = SHUTDOWN_TIMEOUT,
+    leases: Optional[LeaseStore] = None
+) -> None:
+    """Сохраняет состояние и дожидается отправки сообщений не дольше timeout.
+
+    Неотправленные сообщения остаются в outbox и будут отправлены после
+    перезапуска. Резервный экземпляр сообщения не отправляет, а ведущий
+    освобождает аренду, чтобы опрос сразу подхватил другой экземпляр.
+    """
+    logging.info(SHUTDOWN_MESSAGE)
+    deadline = time.monotonic() + timeout
+    store.flush()
+    if leases is None or DEFAULT_TENANT in leases.held():
+        sender = threading.Thread(
+            target=deliver_messages, args=(bot, outbox), daemon=True
+        )
+        sender.start()
+        sender.join(timeout)
+        if isinstance(bot, SendQueue):
+            bot.close(timeout=max(deadline - time.monotonic(), 0))
+        if sender.is_alive():
+            logging.warning(SHUTDOWN_TIMEOUT_MESSAGE.format(timeout=timeout))
+            return
+    store.close()
+    if leases is not None:
+        leases.close()
+
+
+def start_commands(bot: TeleBot, cache: HomeworkCache) -> None:
+    """Принимает команды /status, /history и /ping в фоновом потоке."""
+    telebot = bot.bot if isinstance(bot, SendQueue) else bot
+    CommandHandlers(
+        bot, cache, TELEGRAM_CHAT_ID, HOMEWORK_VERDICTS
+    ).register(telebot)
+    start_polling(telebot)
+
+
+def start_leases() -> Optional[LeaseStore]:
+    """Аренды опроса в базе LEASE_DB_PATH, если она задана."""
+    if not LEASE_DB_PATH:
+        return None
+    return LeaseStore(LEASE_DB_PATH, ttl=LEASE_TTL).start()
+
+
+class PollingLoop:
+    """Цикл опроса API: одна итерация на вызов step.
+
+    Время берётся из clock, поэтому с SimulatedClock недели опроса
+    прогоняются за доли секунды. api заменяет get_api_answer, а rng
+    делает случайные паузы воспроизводимыми.
+    """
+
+    def __init__(
+        self,
+        bot: TeleBot,
+        store: StateStore,
+        clock: SystemClock = SYSTEM_CLOCK,
+        api: Optional[Callable[[int], dict]] = None,
+        rng: Optional[random.Random] = None,
+        leases: Optional[LeaseStore] = None
+    ) -> None:
+        """Восстанавливает курсор, статусы и ошибки из store."""
+        self.bot = bot
+        self.store = store
+        self.clock = clock
+        self.api = api
+        self.leases = leases
+        self.leading = leases is None
+        self.outbox = Outbox(store)
+        self.cache = HomeworkCache(
+            self.fetch_all, ttl=COMMAND_CACHE_TTL, clock=clock.time
+        )
+        self.scheduler = make_scheduler(
+            POLLING_SCHEDULER,
+            RETRY_PERIOD,
+            REVIEWING_RETRY_PERIOD,
+            MIN_RETRY_PERIOD,
+            MAX_RETRY_PERIOD,
+            rng=(rng or random).random
+        )
+        self.restore()
+        self.retry = RetryPolicy(
+            API_RETRY_ATTEMPTS,
+            API_RETRY_BASE_DELAY,
+            API_RETRY_MAX_DELAY,
+            API_RETRY_DEADLINE,
+            rng=rng,
+            clock=clock.monotonic,
+            sleep=lambda seconds: SHUTDOWN.sleep(seconds, clock.sleep),
+            allowed=lambda: self.breaker.state == CLOSED
+        )
+        self.breaker = CircuitBreaker(
+            CIRCUIT_FAILURE_THRESHOLD,
+            CIRCUIT_RESET_TIMEOUT,
+            clock=clock.monotonic
+        )
+
+    def restore(self) -> None:
+        """Читает курсор, статусы и ошибки из store.
+
+        Работы на ревью передаются планировщику опроса.
+        """
+        state = self.store.load()
+        self.tracker = StatusTracker(state.statuses)
+        self.scheduler.restore(self.tracker.statuses)
+        self.timestamp = state.from_date or int(self.clock.time())
+        self.errors = ErrorAggregator.load(
+            state.last_error,
+            window=ERROR_WINDOW,
+            clock=self.clock.time,
+            new_error_message=MAIN_ERROR_MESSAGE
+        )
+
+    def lead(self) -> bool:
+        """Продлевает аренду опроса; True, если опрашивает этот экземпляр.
+
+        Без leases экземпляр всегда ведущий. Получив аренду, экземпляр
+        перечитывает состояние, сохранённое прежним ведущим.
+        """
+        if self.leases is None:
+            return True
+        leading = self.leases.acquire(DEFAULT_TENANT)
+        if leading and not self.leading:
+            logging.info(LEASE_ACQUIRED_MESSAGE)
+            self.restore()
+        elif self.leading and not leading:
+            logging.warning(LEASE_LOST_MESSAGE)
+        self.leading = leading
+        return leading
+
+    def register_metrics(self) -> None:
+        """Подключает состояние цикла к метрикам."""
+        CURSOR_LAG.set_function(lambda: self.clock.time() - self.timestamp)
+        OUTBOX_DEPTH.set_function(self.outbox.__len__)
+        if isinstance(self.bot, SendQueue):
+            SEND_QUEUE_DEPTH.set_function(lambda: self.bot.depth)
+        API_RETRIES.set_function(lambda: self.retry.retries)
+        CIRCUIT_STATE.set_function(lambda: STATES.index(self.breaker.state))
+        CIRCUIT_CALLS_AVOIDED.set_function(lambda: self.breaker.avoided)
+        CIRCUIT_OPEN_SECONDS.set_function(lambda: self.breaker.open_seconds)
+
+    def fetch_all(self) -> list:
+        """Полный список работ для ответов на команды.
+
+        Запрос идёт мимо CONDITIONAL_REQUESTS, чтобы не подменить
+        сохранённый ответ цикла опроса.
+        """
+        if self.api is not None:
+            return check_response(self.api(0))
+        return check_response(cached_api_answer(
+            0, conditional=ConditionalRequests()
+        ))
+
+    def poll(self) -> list:
+        """Запрашивает API и ставит в outbox сообщения об изменениях.
+
+        Размыкатель считает итерации, а не отдельные запросы, поэтому
+        короткий сбой внутри одной итерации не размыкает цепь. Пока цепь
+        не замкнута, запрос не повторяется: пробный запрос всегда один.
+        """
+        response = self.breaker.call(
+            self.retry.call, self.api or get_api_answer, self.timestamp
+        )
+        homeworks = validate_response(response, HEADERS)
+        self.cache.update(homeworks)
+        homeworks = self.tracker.changes(homeworks)
+        if not homeworks:
+            logging.debug(NO_NEW_STATUS)
+        queue_status_changes(self.outbox, self.tracker, homeworks)
+        self.timestamp = response.get('current_date', self.timestamp)
+        queue_error_report(self.outbox, self.errors)
+        return homeworks
+
+    def step(self) -> float:
+        """Выполняет одну итерацию опроса и возвращает паузу до следующей.
+
+        Пока опрашивает другой экземпляр, итерация пропускается, а
+        аренда запрашивается снова через LEASE_TTL секунд. Запросы и
+        повторы итерации укладываются в POLL_BUDGET секунд.
+        """
+        if not self.lead():
+            return LEASE_TTL
+        homeworks = []
+        failed = False
+        POLL_CYCLES.inc()
+        try:
+            with budget(POLL_BUDGET, self.clock.monotonic):
+                homeworks = self.poll()
+        except CircuitOpenError as error:
+            failed = True
+            logging.warning(error)
+        except Exception as error:
+            failed = True
+            POLL_ERRORS.inc(error=type(error).__name__)
+            logging.exception(LazyMessage(MAIN_ERROR_MESSAGE, error=error))
+            queue_error_report(self.outbox, self.errors, error)
+        self.store.stage(
+            from_date=self.timestamp,
+            last_error=self.errors.dump(),
+            statuses=self.tracker.pop_committed()
+        )
+        self.store.flush()
+        deliver_messages(self.bot, self.outbox, now=self.clock.time())
+        delay = self.scheduler.next_delay(homeworks, failed)
+        logging.debug(LazyMessage(
+            NEXT_REQUEST_MESSAGE,
+            delay=delay,
+            saved=self.scheduler.saved_calls
+        ))
+        return delay
+
+
 def main() -> None:
     """Основная логика работы бота."""
     check_tokens()
     bot = TeleBot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
-    last_error = ''
+    if TELEGRAM_SEND_QUEUE:
+        bot = SendQueue(bot).start()
+    store = StateStore(STATE_DB_PATH)
+    loop = PollingLoop(bot, store, leases=start_leases())
+    loop.register_metrics()
+    if TELEGRAM_COMMANDS:
+        start_commands(bot, loop.cache)
+    SHUTDOWN.on_shutdown(
+        shutdown_gracefully,
+        bot,
+        store,
+        loop.outbox,
+        SHUTDOWN_TIMEOUT,
+        loop.leases
+    )
     while True:
-        try:
-            response = get_api_answer(timestamp)
-            check_response(response)
-            homeworks = response['homeworks']
-            if not homeworks:
-                logging.debug(NO_NEW_STATUS)
-                continue
-            if send_message(bot, parse_status(homeworks[0])):
-                timestamp = response.get('current_date', timestamp)
-        except Exception as error:
-            message = MAIN_ERROR_MESSAGE.format(error=error)
-            logging.exception(MAIN_ERROR_MESSAGE.format(error=error))
-            if message == last_error:
-                logging.debug(NO_NEW_ERROR_MESSAGE)
-                continue
-            if send_message(bot, message):
-                last_error = message
-        finally:
-            time.sleep(RETRY_PERIOD)
+        delay = PROFILER.run(loop.step)
+        with SHUTDOWN.interruptible():
+            time.sleep(delay)
 
 
 if __name__ == '__main__':
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format=(
-            '%(asctime)s %(levelname)s: %(funcName)s, '
-            'строка %(lineno)d - %(message)s'
-        ),
+    queue_handler, listener = start_listener(
         handlers=[
             logging.StreamHandler(stream=sys.stdout),
-            logging.FileHandler(
-                filename=__file__ + '.log',
-                mode='w',
-                encoding='utf-8'
+            make_file_handler(
+                __file__ + '.log',
+                max_bytes=LOG_MAX_BYTES,
+                when=LOG_ROTATE_WHEN,
+                backup_count=LOG_BACKUP_COUNT
             )
-        ]
+        ],
+        formatter=make_formatter(LOG_FORMAT)
     )
-    main()
+    logging.basicConfig(level=logging.DEBUG, handlers=[queue_handler])
+    if METRICS_PORT:
+        MetricsServer(METRICS_PORT).start()
+    SHUTDOWN.install()
+    PROFILER.install()
+    if PROFILE_ON_START:
+        PROFILER.request()
+    try:
+        with HTTP_CLIENT:
+            main()
+    except ShutdownRequested:
+        SHUTDOWN.finish()
+    finally:
+        listener.stop()
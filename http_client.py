@@ -0,0 +1,216 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+)
+from typing import Callable, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import deadline
+
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10.0
+HEDGE_QUANTILE = 0.95
+HEDGE_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+
+BUDGET_EXHAUSTED = 'Бюджет времени цикла опроса исчерпан.'
+HEDGE_TIMEOUT = 'Ответ не получен за {limit:.2f} с.'
+
+
+class Hedger:
+    """Дублирующий запрос для медленного хвоста задержек.
+
+    Запоминает задержки последних window запросов. Если запрос
+    выполняется дольше их квантиля quantile, отправляется второй такой же
+    запрос, и используется ответ, пришедший первым. Пока задержек меньше
+    min_samples, запросы не дублируются. Ответ опоздавшего запроса
+    отбрасывается.
+    """
+
+    def __init__(
+        self,
+        quantile: float = HEDGE_QUANTILE,
+        window: int = HEDGE_WINDOW,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.clock = clock
+        self.latencies = deque(maxlen=window)
+        self.lock = threading.Lock()
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def threshold(self) -> Optional[float]:
+        """Задержка, после которой отправляется второй запрос, или None."""
+        with self.lock:
+            if len(self.latencies) < self.min_samples:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(
+            int(len(ordered) * self.quantile), len(ordered) - 1
+        )]
+
+    def submit(self, function: Callable, **kwargs):
+        """Запускает запрос и по завершении запоминает его задержку."""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(thread_name_prefix='hedge')
+        start = self.clock()
+        future = self.executor.submit(function, **kwargs)
+
+        def record(_) -> None:
+            with self.lock:
+                self.latencies.append(self.clock() - start)
+        future.add_done_callback(record)
+        return future
+
+    def call(
+        self, function: Callable, limit: Optional[float] = None, **kwargs
+    ):
+        """Ответ function(**kwargs), при задержке дублируя запрос.
+
+        limit ограничивает общее ожидание ответа в секундах.
+        """
+        with self.lock:
+            self.requests += 1
+        started = self.clock()
+        first = self.submit(function, **kwargs)
+        threshold = self.threshold()
+        if threshold is None or (limit is not None and threshold >= limit):
+            done, _ = wait([first], timeout=limit)
+            if not done:
+                raise requests.Timeout(HEDGE_TIMEOUT.format(limit=limit))
+            return first.result()
+        done, _ = wait([first], timeout=threshold)
+        if done:
+            return first.result()
+        with self.lock:
+            self.hedged += 1
+        return self.race(
+            first, self.submit(function, **kwargs), started, limit
+        )
+
+    def race(
+        self,
+        first: Future,
+        second: Future,
+        started: float,
+        limit: Optional[float]
+    ):
+        """Первый успешный ответ из двух запросов, начатых в started."""
+        pending = {first, second}
+        error = None
+        while pending:
+            left = None if limit is None else max(
+                limit - (self.clock() - started), 0.0
+            )
+            done, pending = wait(pending, left, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        with self.lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+        if error is not None:
+            raise error
+        raise requests.Timeout(HEDGE_TIMEOUT.format(limit=limit))
+
+    def close(self) -> None:
+        """Останавливает потоки запросов, не дожидаясь опоздавших."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+
+class HttpClient:
+    """Общий HTTP-клиент с пулом keep-alive соединений и таймаутами.
+
+    Пока пул не открыт методом open, запросы выполняются через
+    requests.get, но тоже с таймаутами. После open все запросы идут
+    через одну requests.Session и переиспользуют TCP/TLS-соединения.
+    Внутри deadline.budget таймауты сокращаются до оставшегося бюджета.
+    С hedger медленные запросы дублируются.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        hedger: Optional[Hedger] = None
+    ) -> None:
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.hedger = hedger
+        self.session: Optional[requests.Session] = None
+
+    def open(self) -> 'HttpClient':
+        """Создаёт сессию с пулом соединений размера pool_size."""
+        if self.session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=self.pool_size,
+                pool_maxsize=self.pool_size
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            self.session = session
+        return self
+
+    def timeouts(self) -> Tuple[float, float]:
+        """Таймауты соединения и чтения с учётом бюджета цикла.
+
+        Если бюджет исчерпан, бросает requests.Timeout, не делая запрос.
+        """
+        budget = deadline.current()
+        if budget is None:
+            return self.timeout
+        remaining = budget.remaining()
+        if remaining <= 0:
+            raise requests.Timeout(BUDGET_EXHAUSTED)
+        return tuple(min(timeout, remaining) for timeout in self.timeout)
+
+    def send(self, url: str, **kwargs) -> requests.Response:
+        """Выполняет один GET-запрос через пул или requests.get."""
+        if self.session is None:
+            return requests.get(url=url, **kwargs)
+        return self.session.get(url=url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Выполняет GET-запрос, по умолчанию с таймаутами клиента."""
+        if 'timeout' not in kwargs:
+            kwargs['timeout'] = self.timeouts()
+        if self.hedger is None:
+            return self.send(url, **kwargs)
+        timeout = kwargs['timeout']
+        limit = sum(timeout) if isinstance(timeout, tuple) else timeout
+        budget = deadline.current()
+        if budget is not None:
+            limit = min(limit, budget.remaining())
+        return self.hedger.call(self.send, limit=limit, url=url, **kwargs)
+
+    def close(self) -> None:
+        """Закрывает соединения пула."""
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+        if self.hedger is not None:
+            self.hedger.close()
+
+    def __enter__(self) -> 'HttpClient':
+        return self.open()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
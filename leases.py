@@ -0,0 +1,118 @@
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Optional, Set
+
+
+LEASE_TTL = 30.0
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS leases ('
+    'name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)'
+)
+LEASE_RENEW_ERROR = 'Не удалось продлить аренду: {error}'
+
+
+def make_owner() -> str:
+    """Уникальное имя экземпляра: хост, pid и случайный суффикс."""
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+class LeaseStore:
+    """Аренды в SQLite, по которым экземпляры бота делят пользователей.
+
+    Аренду name держит не больше одного владельца. Владелец продлевает
+    свои аренды фоновым потоком каждые ttl / 3 секунд, поэтому аренды
+    упавшего экземпляра истекают не позже чем через ttl секунд, и их
+    забирает другой экземпляр. При штатной остановке аренды
+    освобождаются сразу.
+    """
+
+    def __init__(
+        self,
+        path: str = ':memory:',
+        owner: Optional[str] = None,
+        ttl: float = LEASE_TTL,
+        clock: Callable[[], float] = time.time
+    ) -> None:
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        with self.connection:
+            self.connection.execute(SCHEMA)
+        self.lock = threading.Lock()
+        self.owner = owner or make_owner()
+        self.ttl = ttl
+        self.clock = clock
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(
+            target=self.run, name='lease-renewal', daemon=True
+        )
+
+    def acquire(self, name: str) -> bool:
+        """Берёт или продлевает аренду name; False, если она чужая."""
+        now = self.clock()
+        with self.lock, self.connection:
+            cursor = self.connection.execute(
+                'INSERT INTO leases VALUES (?, ?, ?) '
+                'ON CONFLICT (name) DO UPDATE SET '
+                'owner = excluded.owner, expires = excluded.expires '
+                'WHERE leases.owner = excluded.owner OR leases.expires <= ?',
+                (name, self.owner, now + self.ttl, now)
+            )
+        return cursor.rowcount == 1
+
+    def renew(self) -> int:
+        """Продлевает все действующие аренды владельца."""
+        now = self.clock()
+        with self.lock, self.connection:
+            return self.connection.execute(
+                'UPDATE leases SET expires = ? '
+                'WHERE owner = ? AND expires > ?',
+                (now + self.ttl, self.owner, now)
+            ).rowcount
+
+    def held(self) -> Set[str]:
+        """Имена действующих аренд владельца."""
+        with self.lock:
+            return {name for name, in self.connection.execute(
+                'SELECT name FROM leases WHERE owner = ? AND expires > ?',
+                (self.owner, self.clock())
+            )}
+
+    def release(self, name: Optional[str] = None) -> None:
+        """Освобождает аренду name или, без name, все аренды владельца."""
+        with self.lock, self.connection:
+            if name is None:
+                self.connection.execute(
+                    'DELETE FROM leases WHERE owner = ?', (self.owner,)
+                )
+            else:
+                self.connection.execute(
+                    'DELETE FROM leases WHERE name = ? AND owner = ?',
+                    (name, self.owner)
+                )
+
+    def start(self) -> 'LeaseStore':
+        """Запускает поток продления аренд."""
+        self.thread.start()
+        return self
+
+    def run(self) -> None:
+        """Продлевает аренды каждые ttl / 3 секунд до вызова close."""
+        while not self.stopped.wait(self.ttl / 3):
+            try:
+                self.renew()
+            except sqlite3.Error as error:
+                logging.error(LEASE_RENEW_ERROR.format(error=error))
+
+    def close(self) -> None:
+        """Останавливает продление, освобождает аренды и закрывает базу."""
+        self.stopped.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        self.release()
+        self.connection.close()
@@ -0,0 +1,156 @@
+import copy
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+from logging.handlers import (
+    QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+)
+from typing import Iterable, Optional
+
+
+LOG_FORMAT = (
+    '%(asctime)s %(levelname)s: %(funcName)s, '
+    'строка %(lineno)d - %(message)s'
+)
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+TEXT_FORMAT = 'text'
+JSON_FORMAT = 'json'
+UNKNOWN_FORMAT_ERROR = (
+    'Неизвестный формат журнала: {format}. '
+    'Допустимые значения: text, json.'
+)
+
+
+class LazyMessage:
+    """Сообщение журнала, которое форматируется только при записи.
+
+    logging вызывает str() у сообщения лишь для записей, прошедших
+    проверку уровня, поэтому отключённые DEBUG-сообщения ничего не стоят.
+    """
+
+    __slots__ = ('template', 'fields')
+
+    def __init__(self, template: str, **fields) -> None:
+        self.template = template
+        self.fields = fields
+
+    def __str__(self) -> str:
+        return self.template.format(**self.fields)
+
+
+class JsonFormatter(logging.Formatter):
+    """Записывает каждую запись журнала одной строкой JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Запись журнала в виде строки JSON."""
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'function': record.funcName,
+            'line': record.lineno,
+            'message': record.getMessage()
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+
+def make_formatter(format: str = TEXT_FORMAT) -> logging.Formatter:
+    """Форматтер для текстового журнала или журнала JSON-строк."""
+    if format == TEXT_FORMAT:
+        return logging.Formatter(LOG_FORMAT)
+    if format == JSON_FORMAT:
+        return JsonFormatter()
+    raise ValueError(UNKNOWN_FORMAT_ERROR.format(format=format))
+
+
+def gzip_namer(name: str) -> str:
+    """Имя сжатого архива журнала."""
+    return name + '.gz'
+
+
+def gzip_rotator(source: str, destination: str) -> None:
+    """Сжимает закрытый файл журнала и удаляет исходный."""
+    with open(source, 'rb') as raw, gzip.open(destination, 'wb') as packed:
+        shutil.copyfileobj(raw, packed)
+    os.remove(source)
+
+
+def make_file_handler(
+    path: str,
+    max_bytes: int = MAX_BYTES,
+    when: Optional[str] = None,
+    backup_count: int = BACKUP_COUNT,
+    compress: bool = True
+) -> logging.Handler:
+    """Файловый обработчик с ротацией по размеру или по времени.
+
+    Файл открывается на дозапись, поэтому история переживает перезапуск.
+    Если задан when (например, 'midnight'), файл ротируется по времени,
+    иначе — при достижении max_bytes. Старые файлы сжимаются gzip.
+    """
+    if when:
+        handler = TimedRotatingFileHandler(
+            path, when=when, backupCount=backup_count, encoding='utf-8'
+        )
+    else:
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding='utf-8'
+        )
+    if compress:
+        handler.namer = gzip_namer
+        handler.rotator = gzip_rotator
+    return handler
+
+
+class LogQueueHandler(QueueHandler):
+    """Кладёт записи журнала в очередь, не выполняя ввода-вывода.
+
+    В отличие от QueueHandler не склеивает трассировку с текстом
+    сообщения, а сохраняет её в exc_text, чтобы форматтер слушателя мог
+    записать её отдельным полем.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Копия записи, которую можно передать в другой поток."""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(
+                    record.exc_info
+                )
+            record.exc_info = None
+        return record
+
+
+def start_listener(
+    handlers: Iterable[logging.Handler],
+    formatter: logging.Formatter
+) -> tuple:
+    """Запускает поток, который пишет журнал в handlers.
+
+    Возвращает обработчик для корневого логгера и запущенный слушатель,
+    который нужно остановить при завершении программы, чтобы записать
+    оставшиеся в очереди записи.
+    """
+    log_queue = queue.SimpleQueue()
+    handlers = list(handlers)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    listener = QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    return LogQueueHandler(log_queue), listener
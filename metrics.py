@@ -0,0 +1,307 @@
+import bisect
+import math
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+NOT_CALLABLE_ERROR = (
+    'Значение метрики {name} должно вычисляться функцией, '
+    'передано {function!r}.'
+)
+DUPLICATE_METRIC_ERROR = (
+    'Метрика {name} уже зарегистрирована с типом {type}.'
+)
+
+
+def format_value(value: float) -> str:
+    """Значение метрики в текстовом формате Prometheus."""
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def escape(value: object) -> str:
+    """Экранирует значение метки для текстового формата Prometheus."""
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+def format_labels(labels: tuple) -> str:
+    """Метки метрики в виде {name="value",...}."""
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{escape(value)}"' for name, value in labels
+    ) + '}'
+
+
+class Metric:
+    """Общая часть метрик: имя, описание и значения по наборам меток.
+
+    Обновление значения — одна операция со словарём под блокировкой,
+    поэтому метрики можно обновлять из нескольких потоков, а затраты на
+    один вызов остаются порядка долей микросекунды.
+    """
+
+    type = 'untyped'
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.values = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(labels: dict) -> tuple:
+        """Ключ значения метрики по её меткам."""
+        if not labels:
+            return ()
+        if len(labels) == 1:
+            return tuple(labels.items())
+        return tuple(sorted(labels.items()))
+
+    def samples(self) -> list:
+        """Строки (суффикс, метки, значение) для вывода."""
+        with self.lock:
+            return [('', key, value) for key, value in self.values.items()]
+
+    def render(self) -> list:
+        """Строки метрики в текстовом формате Prometheus."""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type}'
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(
+                f'{self.name}{suffix}{format_labels(labels)} '
+                f'{format_value(value)}'
+            )
+        return lines
+
+
+class Value(Metric):
+    """Метрика с одним числом на набор меток: счётчик или измеритель.
+
+    Вместо обновлений можно передать функцию, которая вызывается только
+    при чтении метрик, — так глубина очереди или отставание курсора ничего
+    не стоят циклу опроса.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        function: Optional[Callable[[], float]] = None
+    ) -> None:
+        super().__init__(name, documentation)
+        self.function = function
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Вычислять значение функцией function при каждом чтении."""
+        if not callable(function):
+            raise TypeError(NOT_CALLABLE_ERROR.format(
+                name=self.name, function=function
+            ))
+        self.function = function
+
+    def value(self, **labels) -> float:
+        """Текущее значение с метками labels."""
+        if self.function is not None and not labels:
+            return self.function()
+        return self.values.get(self.key(labels), 0)
+
+    def samples(self) -> list:
+        """Значения метрики, при наличии функции — её результат."""
+        if self.function is None:
+            return super().samples()
+        return [('', (), self.function())]
+
+
+class Counter(Value):
+    """Монотонно растущий счётчик."""
+
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Увеличивает счётчик с метками labels на amount."""
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Value):
+    """Значение, которое может расти и уменьшаться."""
+
+    type = 'gauge'
+
+    def set(self, value: float, **labels) -> None:
+        """Устанавливает значение с метками labels."""
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = value
+
+
+class Histogram(Metric):
+    """Распределение значений по корзинам с суммой и количеством."""
+
+    type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: tuple = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        """Добавляет наблюдение value в распределение с метками labels."""
+        key = self.key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.values.get(key)
+            if counts is None:
+                counts = self.values[key] = [0] * (len(self.buckets) + 3)
+            counts[index] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def count(self, **labels) -> int:
+        """Количество наблюдений с метками labels."""
+        counts = self.values.get(self.key(labels))
+        return counts[-1] if counts else 0
+
+    def samples(self) -> list:
+        """Накопительные корзины, сумма и количество для каждых меток."""
+        with self.lock:
+            values = {key: list(counts) for key, counts in self.values.items()}
+        samples = []
+        for key, counts in values.items():
+            total = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                total += count
+                samples.append(
+                    ('_bucket', key + (('le', format_value(bound)),), total)
+                )
+            samples.append(('_sum', key, counts[-2]))
+            samples.append(('_count', key, counts[-1]))
+        return samples
+
+
+class Registry:
+    """Набор метрик, которые отдаются одной страницей /metrics."""
+
+    def __init__(self) -> None:
+        self.metrics = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Добавляет метрику в набор.
+
+        Повторная регистрация метрики того же типа возвращает уже
+        созданную, чтобы перезагрузка модуля не теряла накопленные значения.
+        """
+        existing = self.metrics.get(metric.name)
+        if existing is None:
+            self.metrics[metric.name] = metric
+            return metric
+        if existing.type != metric.type:
+            raise ValueError(DUPLICATE_METRIC_ERROR.format(
+                name=metric.name, type=existing.type
+            ))
+        return existing
+
+    def counter(
+        self,
+        name: str,
+        documentation: str,
+        function: Optional[Callable[[], float]] = None
+    ) -> Counter:
+        """Создаёт и регистрирует счётчик."""
+        return self.register(Counter(name, documentation, function))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        function: Optional[Callable[[], float]] = None
+    ) -> Gauge:
+        """Создаёт и регистрирует измеритель."""
+        return self.register(Gauge(name, documentation, function))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        buckets: tuple = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Создаёт и регистрирует гистограмму."""
+        return self.register(Histogram(name, documentation, buckets))
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Отдаёт метрики по адресу /metrics."""
+
+    def do_GET(self) -> None:
+        """Отвечает страницей метрик или кодом 404."""
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        body = self.server.registry.render().encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        """Не пишет каждое чтение метрик в журнал бота."""
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """HTTP-сервер метрик, работающий в фоновом потоке."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int,
+        host: str = '127.0.0.1',
+        registry: Registry = REGISTRY
+    ) -> None:
+        super().__init__((host, port), MetricsHandler)
+        self.registry = registry
+
+    def start(self) -> 'MetricsServer':
+        """Запускает обработку запросов в фоновом потоке."""
+        threading.Thread(
+            target=self.serve_forever, name='metrics', daemon=True
+        ).start()
+        return self
+
+    def close(self) -> None:
+        """Останавливает сервер."""
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,324 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, Optional, Union
+
+from telebot import TeleBot
+
+from homework import (
+    ENDPOINT, MAIN_ERROR_MESSAGE, RETRY_PERIOD, STATE_DB_PATH, TELEGRAM_TOKEN,
+    error_report, request_api_answer, send_to_chat, start_leases,
+    status_message, validate_response
+)
+from error_aggregator import ErrorAggregator
+from http_client import HttpClient
+from leases import LeaseStore
+from log_pipeline import LazyMessage, make_formatter, start_listener
+from outbox import Outbox
+from send_queue import SendQueue
+from state import StateStore
+from tracker import StatusTracker
+
+
+TENANTS_FILE = os.getenv('TENANTS_FILE', 'tenants.json')
+POLL_CONCURRENCY = int(os.getenv('POLL_CONCURRENCY', 100))
+STATE_FLUSH_INTERVAL = 1.0
+
+TENANT_POLL_ERROR = 'Ошибка опроса для чата {chat_id}: {error}'
+TENANTS_LOADED = 'Загружено пользователей для опроса: {count}.'
+THROUGHPUT_MESSAGE = (
+    'Опрошено пользователей: {polls}, '
+    'пропускная способность: {throughput:.1f} опросов/с.'
+)
+
+
+@dataclass
+class Tenant:
+    """Пользователь бота: токен Практикума, чат и курсор from_date."""
+
+    token: str
+    chat_id: Union[int, str]
+    from_date: int = 0
+    errors: ErrorAggregator = field(
+        default_factory=lambda: ErrorAggregator(
+            new_error_message=MAIN_ERROR_MESSAGE
+        )
+    )
+    tracker: StatusTracker = field(default_factory=StatusTracker)
+
+    @property
+    def key(self) -> str:
+        """Ключ состояния, аренды и сообщений пользователя.
+
+        Вычисляется по токену: у нескольких пользователей может быть
+        общий чат, но состояние у каждого своё.
+        """
+        return hashlib.blake2b(
+            self.token.encode(), digest_size=8
+        ).hexdigest()
+
+    @property
+    def headers(self) -> dict:
+        """Заголовки авторизации для запросов от имени пользователя."""
+        return {'Authorization': f'OAuth {self.token}'}
+
+
+def load_tenants(path: str) -> list:
+    """Загружает список пользователей из JSON-файла."""
+    with open(path, encoding='utf-8') as file:
+        now = int(time.time())
+        return [
+            Tenant(
+                token=item['token'],
+                chat_id=item['chat_id'],
+                from_date=item.get('from_date', now)
+            )
+            for item in json.load(file)
+        ]
+
+
+class MultiTenantPoller:
+    """Опрашивает API Практикум Домашка для множества пользователей.
+
+    Расписание опросов ведёт asyncio, а блокирующие HTTP-запросы и
+    отправка сообщений выполняются в пуле потоков, размер которого
+    ограничивает число одновременных запросов.
+    """
+
+    def __init__(
+        self,
+        tenants: Iterable[Tenant],
+        bot: TeleBot,
+        concurrency: int = POLL_CONCURRENCY,
+        period: float = RETRY_PERIOD,
+        endpoint: str = ENDPOINT,
+        http_client: Optional[HttpClient] = None,
+        store: Optional[StateStore] = None,
+        leases: Optional[LeaseStore] = None
+    ) -> None:
+        self.tenants = list(tenants)
+        self.store = store
+        self.leases = leases
+        self.owned = set()
+        self.outbox = None if store is None else Outbox(
+            store, tenants=[tenant.key for tenant in self.tenants]
+        )
+        if store is not None:
+            for tenant in self.tenants:
+                self.restore(tenant)
+        self.bot = bot
+        self.period = period
+        self.endpoint = endpoint
+        self.http_client = (
+            http_client or HttpClient(pool_size=concurrency)
+        ).open()
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.polls = 0
+        self.started = time.monotonic()
+
+    def restore(self, tenant: Tenant) -> None:
+        """Восстанавливает курсор, статусы и ошибку пользователя."""
+        state = self.store.load(tenant.key)
+        tenant.from_date = state.from_date or tenant.from_date
+        tenant.errors = ErrorAggregator.load(
+            state.last_error, new_error_message=MAIN_ERROR_MESSAGE
+        )
+        tenant.tracker = StatusTracker(state.statuses)
+
+    def owns(self, tenant: Tenant) -> bool:
+        """Берёт или продлевает аренду пользователя.
+
+        Без leases пользователь всегда принадлежит этому экземпляру.
+        Получив аренду, экземпляр перечитывает состояние пользователя,
+        сохранённое прежним владельцем.
+        """
+        if self.leases is None:
+            return True
+        if not self.leases.acquire(tenant.key):
+            self.owned.discard(tenant.key)
+            return False
+        if tenant.key not in self.owned:
+            self.owned.add(tenant.key)
+            if self.store is not None:
+                self.restore(tenant)
+        return True
+
+    def save(self, tenant: Tenant) -> None:
+        """Передаёт изменения состояния пользователя в StateStore."""
+        if self.store is not None:
+            self.store.stage(
+                tenant.key,
+                from_date=tenant.from_date,
+                last_error=tenant.errors.dump(),
+                statuses=tenant.tracker.pop_committed()
+            )
+
+    def flush(self) -> None:
+        """Сохраняет состояние и отправляет сообщения из outbox."""
+        if self.store is not None:
+            self.store.flush()
+            if self.leases is not None:
+                self.outbox.restrict(
+                    tenant.key for tenant in self.tenants
+                    if tenant.key in self.owned
+                )
+            self.outbox.deliver(self.send)
+
+    def notify(self, tenant: Tenant, message: str) -> bool:
+        """Отправляет сообщение пользователю или ставит его в outbox."""
+        if self.outbox is None:
+            return self.send(tenant.chat_id, message)
+        self.outbox.put(tenant.chat_id, message, tenant.key)
+        return True
+
+    def send(
+        self, chat_id: Union[int, str], message: str
+    ) -> Union[bool, Future]:
+        """Отправляет сообщение в чат пользователя.
+
+        Через SendQueue возвращает Future отправки из очереди.
+        """
+        return send_to_chat(self.bot, chat_id, message)
+
+    def report(
+        self, tenant: Tenant, error: Optional[Exception] = None
+    ) -> None:
+        """Сообщает пользователю об ошибке опроса или о восстановлении."""
+        message = error_report(tenant.errors, error)
+        if message is not None:
+            self.notify(tenant, message)
+
+    def poll_tenant(self, tenant: Tenant) -> None:
+        """Выполняет один цикл опроса API для пользователя.
+
+        Пользователей, аренду которых держит другой экземпляр, пропускает.
+        """
+        if not self.owns(tenant):
+            return
+        try:
+            response = request_api_answer(
+                tenant.from_date,
+                tenant.headers,
+                self.endpoint,
+                self.http_client.get
+            )
+            homeworks = validate_response(response, tenant.headers)
+            sent_all = True
+            for homework in tenant.tracker.changes(homeworks):
+                if self.notify(tenant, status_message(homework)):
+                    tenant.tracker.commit(homework)
+                else:
+                    sent_all = False
+            if sent_all:
+                tenant.from_date = response.get(
+                    'current_date', tenant.from_date
+                )
+            self.report(tenant)
+        except Exception as error:
+            logging.error(LazyMessage(
+                TENANT_POLL_ERROR,
+                chat_id=tenant.chat_id,
+                error=error
+            ))
+            self.report(tenant, error)
+        finally:
+            self.save(tenant)
+
+    async def poll(self, tenant: Tenant) -> None:
+        """Опрашивает API для пользователя, не блокируя цикл событий."""
+        await asyncio.get_running_loop().run_in_executor(
+            self.executor, self.poll_tenant, tenant
+        )
+        self.polls += 1
+
+    async def poll_round(self) -> None:
+        """Один раз опрашивает API для всех пользователей."""
+        await asyncio.gather(*(self.poll(tenant) for tenant in self.tenants))
+        self.flush()
+
+    async def run_tenant(self, tenant: Tenant, delay: float) -> None:
+        """Бесконечно опрашивает API для пользователя с периодом period."""
+        await asyncio.sleep(delay)
+        while True:
+            await self.poll(tenant)
+            await asyncio.sleep(self.period)
+
+    async def run(self) -> None:
+        """Опрашивает API для всех пользователей по расписанию.
+
+        Первые запросы равномерно распределяются внутри периода опроса,
+        чтобы не создавать пик нагрузки при запуске.
+        """
+        step = self.period / max(len(self.tenants), 1)
+        await asyncio.gather(self.flush_periodically(), *(
+            self.run_tenant(tenant, index * step)
+            for index, tenant in enumerate(self.tenants)
+        ))
+
+    async def flush_periodically(self) -> None:
+        """Раз в STATE_FLUSH_INTERVAL секунд сохраняет состояние."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(STATE_FLUSH_INTERVAL)
+            await loop.run_in_executor(self.executor, self.flush)
+
+    def throughput(self) -> float:
+        """Возвращает число опросов в секунду с момента запуска."""
+        return self.polls / max(time.monotonic() - self.started, 1e-9)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Завершает работу, не теряя состояние и сообщения.
+
+        Дожидается начатых опросов, сохраняет состояние, отправляет
+        сообщения из outbox и ждёт очередь отправки не дольше timeout
+        секунд. Сообщения, которые не успели уйти, остаются в outbox.
+        Затем освобождает пул потоков, HTTP-соединения и аренды.
+        """
+        self.executor.shutdown(wait=True)
+        self.flush()
+        if isinstance(self.bot, SendQueue):
+            self.bot.close(timeout)
+        self.http_client.close()
+        if self.store is not None:
+            self.store.close()
+        if self.leases is not None:
+            self.leases.close()
+
+
+def main() -> None:
+    """Запускает опрос API для всех пользователей из TENANTS_FILE."""
+    tenants = load_tenants(TENANTS_FILE)
+    logging.info(TENANTS_LOADED.format(count=len(tenants)))
+    send_queue = SendQueue(TeleBot(token=TELEGRAM_TOKEN)).start()
+    poller = MultiTenantPoller(
+        tenants,
+        send_queue,
+        store=StateStore(STATE_DB_PATH),
+        leases=start_leases()
+    )
+    try:
+        asyncio.run(poller.run())
+    finally:
+        logging.info(THROUGHPUT_MESSAGE.format(
+            polls=poller.polls,
+            throughput=poller.throughput()
+        ))
+        poller.close(timeout=STATE_FLUSH_INTERVAL)
+
+
+if __name__ == '__main__':
+    queue_handler, listener = start_listener(
+        handlers=[logging.StreamHandler(stream=sys.stdout)],
+        formatter=make_formatter(os.getenv('LOG_FORMAT', 'text'))
+    )
+    logging.basicConfig(level=logging.DEBUG, handlers=[queue_handler])
+    try:
+        main()
+    finally:
+        listener.stop()
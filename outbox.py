@@ -0,0 +1,226 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Iterable, Optional, Tuple, Union
+
+from state import DEFAULT_TENANT, StateStore
+
+
+RETRY_BASE_DELAY = 30.0
+RETRY_MAX_DELAY = 3600.0
+DELIVERY_BATCH_SIZE = 100
+MAX_ATTEMPTS = 20
+PERMANENT_ERROR_CODES = (400, 403)
+
+MESSAGE_DROPPED = (
+    'Сообщение для чата {chat_id} удалено из outbox после попыток: '
+    '{attempts}. Ошибка: {error}'
+)
+
+DUE_MESSAGES = (
+    'WITH own AS ('
+    'SELECT id, chat_id, text, attempts, next_attempt, '
+    'ROW_NUMBER() OVER (PARTITION BY chat_id ORDER BY id) AS position '
+    'FROM outbox WHERE :tenants IS NULL '
+    'OR tenant IN (SELECT value FROM json_each(:tenants))) '
+    'SELECT id, chat_id, text, attempts, next_attempt FROM own '
+    'WHERE chat_id IN ('
+    'SELECT chat_id FROM own WHERE position = 1 AND next_attempt <= :now) '
+    'AND chat_id NOT IN (SELECT value FROM json_each(:inflight)) '
+    'ORDER BY position, id LIMIT :limit'
+)
+
+
+def permanent(error: Optional[Exception]) -> bool:
+    """Ответил ли Telegram ошибкой, которую повтор не исправит."""
+    return getattr(error, 'error_code', None) in PERMANENT_ERROR_CODES
+
+
+class Outbox:
+    """Очередь неотправленных сообщений в таблице outbox StateStore.
+
+    Сообщения попадают в outbox через StateStore.stage вместе с курсором
+    опроса. deliver отправляет сообщения, срок которых подошёл, удаляет
+    отправленные, а для неотправленных откладывает следующую попытку с
+    экспоненциально растущей паузой. Сообщения одного чата уходят строго
+    по порядку: после неудачи остальные сообщения чата ждут повтора.
+    Выбираются только чаты, первое сообщение которых пора отправлять, и
+    сначала первые сообщения каждого чата, поэтому недоступный чат с
+    длинной очередью не задерживает остальные. После max_attempts
+    неудачных попыток или ответа 400 и 403 сообщение удаляется из outbox
+    с записью в журнал.
+    Если задан tenants, отправляются только сообщения этих пользователей —
+    так несколько процессов делят одну базу, не отправляя чужие
+    сообщения, даже если у пользователей общий чат.
+
+    send может вернуть Future вместо результата, как SendQueue. Тогда
+    сообщение удаляется из outbox только после успешной отправки, а до
+    тех пор остальные сообщения чата не отправляются повторно.
+    """
+
+    def __init__(
+        self,
+        store: StateStore,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+        tenants: Optional[Iterable[str]] = None,
+        max_attempts: int = MAX_ATTEMPTS
+    ) -> None:
+        self.store = store
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.dropped = 0
+        self.inflight = {}
+        self.inflight_lock = threading.Lock()
+        self.restrict(tenants)
+
+    def restrict(self, tenants: Optional[Iterable[str]] = None) -> None:
+        """Ограничивает отправку сообщениями пользователей tenants.
+
+        None снимает ограничение.
+        """
+        self.tenants = None if tenants is None else json.dumps(list(tenants))
+
+    def put(
+        self,
+        chat_id: Union[int, str],
+        text: str,
+        tenant: str = DEFAULT_TENANT
+    ) -> None:
+        """Добавляет сообщение пользователя tenant в outbox при flush."""
+        self.store.stage(tenant, messages=[(chat_id, text)])
+
+    def backoff(self, attempts: int) -> float:
+        """Пауза перед повтором после attempts неудачных попыток."""
+        return min(self.base_delay * 2 ** min(attempts, 32), self.max_delay)
+
+    def __len__(self) -> int:
+        with self.store.lock:
+            return self.store.connection.execute(
+                'SELECT COUNT(*) FROM outbox'
+            ).fetchone()[0]
+
+    def deliver(
+        self,
+        send: Callable[[Union[int, str], str], bool],
+        now: float = None,
+        limit: int = DELIVERY_BATCH_SIZE
+    ) -> int:
+        """Отправляет сообщения через send и возвращает число отправленных.
+
+        Сообщения, переданные в очередь отправки, не считаются.
+        """
+        now = time.time() if now is None else now
+        with self.inflight_lock:
+            blocked = set(self.inflight.values())
+        with self.store.lock:
+            rows = self.store.connection.execute(DUE_MESSAGES, {
+                'tenants': self.tenants,
+                'now': now,
+                'inflight': json.dumps(list(blocked)),
+                'limit': limit
+            }).fetchall()
+        sent, dropped, failed = [], [], []
+        for message_id, chat_id, text, attempts, next_attempt in rows:
+            if chat_id in blocked:
+                continue
+            if next_attempt > now:
+                blocked.add(chat_id)
+                continue
+            result = send(chat_id, text)
+            if isinstance(result, Future):
+                self.track(message_id, chat_id, attempts, result)
+            elif result:
+                sent.append((message_id,))
+            else:
+                blocked.add(chat_id)
+                deleted, postponed = self.fail(
+                    message_id, chat_id, attempts, now
+                )
+                dropped.extend(deleted)
+                failed.extend(postponed)
+        self.record(sent + dropped, failed)
+        return len(sent)
+
+    def fail(
+        self,
+        message_id: int,
+        chat_id: Union[int, str],
+        attempts: int,
+        now: float,
+        error: Optional[Exception] = None
+    ) -> Tuple[list, list]:
+        """Откладывает неотправленное сообщение или удаляет его.
+
+        Возвращает списки для record: удаляемые и отложенные сообщения.
+        """
+        if attempts + 1 < self.max_attempts and not permanent(error):
+            return [], [(now + self.backoff(attempts), message_id)]
+        self.dropped += 1
+        logging.error(MESSAGE_DROPPED.format(
+            chat_id=chat_id, attempts=attempts + 1, error=error
+        ))
+        return [(message_id,)], []
+
+    def record(self, sent: list, failed: list) -> None:
+        """Удаляет отправленные сообщения и откладывает неотправленные."""
+        with self.store.lock, self.store.connection:
+            self.store.connection.executemany(
+                'DELETE FROM outbox WHERE id = ?', sent
+            )
+            self.store.connection.executemany(
+                'UPDATE outbox SET attempts = attempts + 1, '
+                'next_attempt = ? WHERE id = ?',
+                failed
+            )
+
+    def track(
+        self,
+        message_id: int,
+        chat_id: Union[int, str],
+        attempts: int,
+        future: Future
+    ) -> None:
+        """Ждёт результата отправки, чтобы удалить или отложить сообщение."""
+        with self.inflight_lock:
+            self.inflight[message_id] = chat_id
+        future.add_done_callback(
+            lambda future: self.acknowledge(
+                message_id, chat_id, attempts, future
+            )
+        )
+
+    def acknowledge(
+        self,
+        message_id: int,
+        chat_id: Union[int, str],
+        attempts: int,
+        future: Future
+    ) -> None:
+        """Учитывает результат отправки сообщения message_id.
+
+        Отменённое сообщение остаётся в outbox без новой попытки, а если
+        база уже закрыта, сообщение будет отправлено после перезапуска.
+        """
+        try:
+            if future.cancelled():
+                return
+            if future.exception() is None:
+                self.record([(message_id,)], [])
+            else:
+                self.record(*self.fail(
+                    message_id,
+                    chat_id,
+                    attempts,
+                    time.time(),
+                    future.exception()
+                ))
+        except sqlite3.ProgrammingError:
+            pass
+        finally:
+            with self.inflight_lock:
+                self.inflight.pop(message_id, None)
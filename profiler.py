@@ -0,0 +1,130 @@
+import cProfile
+import logging
+import os
+import signal
+import time
+import tracemalloc
+from typing import Callable
+
+from log_pipeline import LazyMessage
+
+
+PROFILE_CYCLES = 10
+PROFILE_DIR = 'profiles'
+TRACEBACK_FRAMES = 10
+TOP_DIFFERENCES = 25
+IGNORED_FILES = (tracemalloc.__file__, '<frozen importlib._bootstrap>')
+
+PROFILE_REQUESTED_MESSAGE = (
+    'Профилирование {cycles} итераций начнётся со следующей итерации.'
+)
+PROFILE_DONE_MESSAGE = (
+    'Профилирование завершено, результаты в {directory}: {files}.'
+)
+
+
+class Profiler:
+    """Профилирование итераций цикла опроса по запросу.
+
+    После request (например, по SIGUSR1) следующие cycles итераций
+    выполняются под cProfile, а после каждой снимается снимок tracemalloc.
+    В directory сохраняются профиль в формате pstats, снимки tracemalloc
+    и текстовые разницы соседних снимков. Пока профилирование не
+    запрошено, run только вызывает функцию.
+    """
+
+    def __init__(
+        self,
+        directory: str = PROFILE_DIR,
+        cycles: int = PROFILE_CYCLES,
+        frames: int = TRACEBACK_FRAMES
+    ) -> None:
+        self.directory = directory
+        self.cycles = cycles
+        self.frames = frames
+        self.requested = False
+        self.profile = None
+        self.snapshot = None
+        self.prefix = None
+        self.done = 0
+        self.files = []
+        self.tracing = False
+
+    def install(self, signum: int = signal.SIGUSR1) -> 'Profiler':
+        """Запускает профилирование по сигналу signum."""
+        signal.signal(signum, self.handle)
+        return self
+
+    def handle(self, signum: int, frame: object) -> None:
+        """Обработчик сигнала."""
+        self.request()
+
+    def request(self) -> None:
+        """Запрашивает профилирование следующих итераций."""
+        self.requested = True
+        logging.info(PROFILE_REQUESTED_MESSAGE.format(cycles=self.cycles))
+
+    def run(self, function: Callable, *args):
+        """Вызывает function, профилируя вызов, если это запрошено."""
+        if not self.requested:
+            return function(*args)
+        if self.profile is None:
+            self.start()
+        self.profile.enable()
+        try:
+            return function(*args)
+        finally:
+            self.profile.disable()
+            self.after_cycle()
+
+    def path(self, suffix: str) -> str:
+        """Путь к файлу результатов текущего профилирования."""
+        path = os.path.join(self.directory, f'{self.prefix}{suffix}')
+        self.files.append(os.path.basename(path))
+        return path
+
+    def start(self) -> None:
+        """Начинает профилирование."""
+        os.makedirs(self.directory, exist_ok=True)
+        self.prefix = time.strftime('%Y%m%d-%H%M%S')
+        self.files = []
+        self.done = 0
+        self.profile = cProfile.Profile()
+        self.tracing = tracemalloc.is_tracing()
+        if not self.tracing:
+            tracemalloc.start(self.frames)
+        self.snapshot = self.take_snapshot()
+
+    def take_snapshot(self) -> tracemalloc.Snapshot:
+        """Снимок выделенной памяти без служебных файлов."""
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, name) for name in IGNORED_FILES
+        ])
+
+    def after_cycle(self) -> None:
+        """Снимает снимок памяти и записывает разницу с предыдущим."""
+        self.done += 1
+        snapshot = self.take_snapshot()
+        with open(self.path(f'-memory-{self.done}.txt'), 'w') as file:
+            for difference in snapshot.compare_to(
+                self.snapshot, 'lineno'
+            )[:TOP_DIFFERENCES]:
+                file.write(f'{difference}\n')
+        self.snapshot = snapshot
+        if self.done >= self.cycles:
+            self.stop()
+
+    def stop(self) -> None:
+        """Завершает профилирование и сохраняет результаты."""
+        self.profile.dump_stats(self.path('.pstats'))
+        self.snapshot.dump(self.path('.tracemalloc'))
+        if not self.tracing:
+            tracemalloc.stop()
+        logging.info(LazyMessage(
+            PROFILE_DONE_MESSAGE,
+            directory=self.directory,
+            files=', '.join(self.files)
+        ))
+        self.requested = False
+        self.profile = None
+        self.snapshot = None
@@ -0,0 +1,159 @@
+import gzip
+import json
+import logging
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Optional
+
+import requests
+
+from clock import SimulatedClock
+
+
+RECORDED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Retry-After')
+
+REPLAY_FINISHED_ERROR = 'Записанные ответы API закончились.'
+RECORD_ERROR = 'Не удалось записать ответ API в {path}: {error}'
+
+
+def open_traffic(path: str, mode: str):
+    """Открывает файл записи; файлы .gz сжимаются gzip."""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def load_traffic(path: str) -> Iterator[dict]:
+    """Читает записи запросов из файла JSONL."""
+    with open_traffic(path, 'r') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+class RecordedResponse:
+    """Ответ API, восстановленный из записи."""
+
+    def __init__(self, record: dict) -> None:
+        self.status_code = record['status']
+        self.headers = record.get('headers') or {}
+        self.content = record.get('body', '').encode()
+
+    @property
+    def text(self) -> str:
+        """Тело ответа строкой."""
+        return self.content.decode()
+
+    def json(self):
+        """Тело ответа, разобранное как JSON."""
+        return json.loads(self.content)
+
+
+class TrafficRecorder:
+    """Дописывает каждый запрос к API в файл JSONL.
+
+    В записи попадают время и параметры запроса, код, задержка, тело
+    ответа и заголовки из RECORDED_HEADERS. Заголовки запроса с токеном
+    не записываются. Сбой соединения записывается без кода, с классом
+    исключения. Ошибка записи только попадает в журнал.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+
+    def write(self, record: dict) -> None:
+        """Дописывает запись в файл."""
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        try:
+            with self.lock, open_traffic(self.path, 'a') as file:
+                file.write(line + '\n')
+        except OSError as error:
+            logging.error(RECORD_ERROR.format(path=self.path, error=error))
+
+    def wrap(self, http_get: Callable) -> Callable:
+        """Возвращает http_get, записывающий запросы и ответы."""
+        def get(**kwargs) -> requests.Response:
+            record = {'time': time.time(), 'params': kwargs.get('params')}
+            start = time.perf_counter()
+            try:
+                response = http_get(**kwargs)
+            except requests.RequestException as error:
+                record.update(
+                    latency=time.perf_counter() - start,
+                    status=None,
+                    error=type(error).__name__
+                )
+                self.write(record)
+                raise
+            headers = getattr(response, 'headers', None) or {}
+            body = getattr(response, 'content', None)
+            record.update(
+                latency=time.perf_counter() - start,
+                status=response.status_code,
+                headers={
+                    name: headers[name]
+                    for name in RECORDED_HEADERS if name in headers
+                },
+                body=body.decode('utf-8', 'replace')
+                if isinstance(body, bytes) else ''
+            )
+            self.write(record)
+            return response
+        return get
+
+
+class ReplayFinished(Exception):
+    """Записанные ответы закончились."""
+
+
+class TrafficReplayer:
+    """Замена http_get, отдающая записанные ответы по порядку.
+
+    При speed больше нуля ответы выдаются с записанными интервалами и
+    задержкой, ускоренными в speed раз; при speed, равном нулю, — без
+    ожидания. Если передан clock, моделируемое время передвигается ко
+    времени записи, чтобы паузы и окна ошибок цикла опроса совпадали с
+    записанными.
+    """
+
+    def __init__(
+        self,
+        records: Iterable[dict],
+        speed: float = 1.0,
+        clock: Optional[SimulatedClock] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ) -> None:
+        self.records = list(records)
+        self.position = 0
+        self.speed = speed
+        self.clock = clock
+        self.sleep = sleep
+        self.started = None
+
+    @property
+    def remaining(self) -> int:
+        """Сколько записанных ответов ещё не выдано."""
+        return len(self.records) - self.position
+
+    def pace(self, record: dict) -> None:
+        """Ждёт момента, когда ответ был получен при записи."""
+        if not self.speed:
+            return
+        now = time.monotonic()
+        if self.started is None:
+            self.started = now - record['time'] / self.speed
+        moment = record['time'] + record.get('latency', 0)
+        self.sleep(max(self.started + moment / self.speed - now, 0))
+
+    def __call__(self, **kwargs) -> RecordedResponse:
+        if not self.remaining:
+            raise ReplayFinished(REPLAY_FINISHED_ERROR)
+        record = self.records[self.position]
+        self.position += 1
+        if self.clock is not None:
+            self.clock.advance(record['time'] - self.clock.time())
+        self.pace(record)
+        if record['status'] is None:
+            raise requests.ConnectionError(record.get('error'))
+        return RecordedResponse(record)
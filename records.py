@@ -0,0 +1,47 @@
+from typing import Any, Optional, Union
+
+import requests
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def decode_json(response: requests.Response) -> Any:
+    """Декодирует тело ответа, используя orjson, если он установлен."""
+    body = getattr(response, 'content', None)
+    if orjson is None or not isinstance(body, bytes):
+        return response.json()
+    return orjson.loads(body)
+
+
+class HomeworkRecord:
+    """Проверенная домашняя работа из ответа API."""
+
+    __slots__ = ('id', 'name', 'status')
+
+    def __init__(
+        self, id: Optional[int], name: str, status: str
+    ) -> None:
+        self.id = id
+        self.name = name
+        self.status = status
+
+    @property
+    def key(self) -> Union[int, str]:
+        """Ключ, по которому различаются работы: id, а без него — имя."""
+        return self.id or self.name
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, HomeworkRecord):
+            return NotImplemented
+        return (self.id, self.name, self.status) == (
+            other.id, other.name, other.status
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f'HomeworkRecord(id={self.id!r}, name={self.name!r}, '
+            f'status={self.status!r})'
+        )
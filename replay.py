@@ -0,0 +1,112 @@
+import argparse
+import logging
+import time
+
+import homework
+from clock import SimulatedClock
+from recorder import RecordedResponse, TrafficReplayer, load_traffic
+from state import StateStore
+
+
+PARSE_SUMMARY = (
+    'Разобрано ответов: {responses}, работ: {homeworks} за {seconds:.3f} с '
+    '({rate:.0f} ответов/с).'
+)
+LOOP_SUMMARY = (
+    'Воспроизведено запросов: {requests}, итераций: {cycles}, '
+    'сообщений: {messages} за {seconds:.3f} с.'
+)
+
+
+class NullBot:
+    """Бот, который считает сообщения вместо отправки."""
+
+    def __init__(self) -> None:
+        self.sent = 0
+
+    def send_message(self, chat_id=None, text=None) -> None:
+        """Учитывает сообщение."""
+        self.sent += 1
+
+
+def replay_parse(records: list) -> dict:
+    """Прогоняет записанные ответы 200 через check_response и parse_status."""
+    responses, homeworks = 0, 0
+    start = time.perf_counter()
+    for record in records:
+        if record['status'] != 200:
+            continue
+        response = homework.check_response(RecordedResponse(record).json())
+        for item in response:
+            homework.status_message(item)
+        responses += 1
+        homeworks += len(response)
+    return {
+        'responses': responses,
+        'homeworks': homeworks,
+        'seconds': time.perf_counter() - start
+    }
+
+
+def replay_loop(records: list, speed: float = 0) -> dict:
+    """Прогоняет записанные ответы через цикл опроса бота.
+
+    Используется тот же PollingLoop, что и в main(); паузы между
+    итерациями задаёт запись, а не планировщик.
+    """
+    records = list(records)
+    clock = SimulatedClock(records[0]['time'] if records else 0)
+    replayer = TrafficReplayer(records, speed=speed, clock=clock)
+    bot = NullBot()
+    loop = homework.PollingLoop(
+        bot,
+        StateStore(),
+        clock=clock,
+        api=lambda timestamp: homework.request_api_answer(
+            timestamp, homework.HEADERS, http_get=replayer
+        )
+    )
+    if records:
+        loop.timestamp = (records[0]['params'] or {}).get(
+            'from_date', loop.timestamp
+        )
+    cycles = 0
+    start = time.perf_counter()
+    while replayer.remaining:
+        loop.step()
+        cycles += 1
+    return {
+        'requests': len(records),
+        'cycles': cycles,
+        'messages': bot.sent,
+        'seconds': time.perf_counter() - start
+    }
+
+
+def main() -> None:
+    """Воспроизводит файл записи."""
+    parser = argparse.ArgumentParser(
+        description='Воспроизведение записанных запросов к API.'
+    )
+    parser.add_argument('path')
+    parser.add_argument('--mode', choices=('parse', 'loop'), default='parse')
+    parser.add_argument(
+        '--speed', type=float, default=0,
+        help='Ускорение относительно записи; 0 — без пауз.'
+    )
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    records = list(load_traffic(args.path))
+    if args.mode == 'parse':
+        result = replay_parse(records)
+        print(PARSE_SUMMARY.format(
+            rate=result['responses'] / max(result['seconds'], 1e-9),
+            **result
+        ))
+        return
+    homework.TELEGRAM_CHAT_ID = homework.TELEGRAM_CHAT_ID or 'replay'
+    print(LOOP_SUMMARY.format(**replay_loop(records, args.speed)))
+
+
+if __name__ == '__main__':
+    main()
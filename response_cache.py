@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+RESPONSE_CACHE_TTL = 30.0
+MAX_ENTRIES = 1024
+
+
+class Flight:
+    """Выполняющийся запрос, результата которого ждут другие вызовы."""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ResponseCache:
+    """Кеш ответов с временем жизни ttl и вытеснением по LRU.
+
+    Хранит не больше max_entries ответов; при переполнении вытесняется
+    ответ, который дольше всех не запрашивали. Одновременные вызовы с
+    одним ключом объединяются: функция выполняется один раз, а остальные
+    вызовы получают её результат или исключение. Исключения не кешируются.
+    """
+
+    def __init__(
+        self,
+        ttl: float = RESPONSE_CACHE_TTL,
+        max_entries: int = MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.flights = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def lookup(self, key: Hashable):
+        """Возвращает (True, ответ) для свежего ответа, иначе (False, None).
+
+        Вызывается под self.lock.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return False, None
+        expires, value = entry
+        if expires <= self.clock():
+            del self.entries[key]
+            return False, None
+        self.entries.move_to_end(key)
+        return True, value
+
+    def put(self, key: Hashable, value) -> None:
+        """Сохраняет ответ под ключом key."""
+        with self.lock:
+            self.entries[key] = (self.clock() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def call(self, key: Hashable, function: Callable, *args, **kwargs):
+        """Ответ из кеша или результат function(*args, **kwargs)."""
+        with self.lock:
+            found, value = self.lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                self.misses += 1
+                flight = self.flights[key] = Flight()
+            else:
+                self.coalesced += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = function(*args, **kwargs)
+            self.put(key, flight.result)
+            return flight.result
+        except Exception as error:
+            flight.error = error
+            raise
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.done.set()
+
+    def clear(self) -> None:
+        """Удаляет все сохранённые ответы."""
+        with self.lock:
+            self.entries.clear()
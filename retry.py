@@ -0,0 +1,128 @@
+import itertools
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from typing import Callable, Optional
+
+import deadline
+from exceptions import StatusCodeIsNot200Error
+from log_pipeline import LazyMessage
+
+
+ATTEMPTS = 3
+BASE_DELAY = 1.0
+MAX_DELAY = 30.0
+DEADLINE = 60.0
+RETRYABLE_STATUSES = (
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT
+)
+
+RETRY_MESSAGE = (
+    'Повтор запроса к API через {delay:.2f} с, попытка {attempt}. '
+    'Ошибка: {error}'
+)
+
+
+def parse_retry_after(value: Optional[str], now: float = None) -> float:
+    """Пауза в секундах из заголовка Retry-After.
+
+    Заголовок содержит либо число секунд, либо HTTP-дату. Отсутствующий
+    или нечитаемый заголовок даёт 0.
+    """
+    if not value:
+        return 0.0
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+    return max(moment - (time.time() if now is None else now), 0.0)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Можно ли повторить запрос, завершившийся ошибкой error.
+
+    Повторяются сбои соединения и временные коды ответа. Ошибка в теле
+    ответа (ErrorKeyInResponseError) и неверный формат ответа повтором
+    не исправляются.
+    """
+    if isinstance(error, StatusCodeIsNot200Error):
+        return error.fields.get('status_code') in RETRYABLE_STATUSES
+    return isinstance(error, ConnectionError)
+
+
+class RetryPolicy:
+    """Повторы запроса внутри одного цикла опроса.
+
+    Пауза перед повтором выбирается равномерно от нуля до
+    base_delay * 2 ** попытка, но не больше max_delay (full jitter), и не
+    меньше Retry-After из ответа 429/503. Все попытки укладываются в
+    deadline секунд и в бюджет deadline.budget, если он задан: если
+    следующая пауза выходит за бюджет, ошибка передаётся дальше без
+    повтора. Если allowed возвращает False (например, размыкатель цепи
+    разомкнут), повтора тоже нет.
+    """
+
+    def __init__(
+        self,
+        attempts: int = ATTEMPTS,
+        base_delay: float = BASE_DELAY,
+        max_delay: float = MAX_DELAY,
+        deadline: float = DEADLINE,
+        rng: Optional[random.Random] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Optional[Callable[[float], None]] = None,
+        allowed: Optional[Callable[[], bool]] = None
+    ) -> None:
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.rng = rng or random.Random()
+        self.clock = clock
+        self.sleep = sleep
+        self.allowed = allowed
+        self.retries = 0
+
+    def delay(self, attempt: int, error: Exception) -> float:
+        """Пауза перед повтором номер attempt (с нуля)."""
+        jitter = self.rng.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** attempt)
+        )
+        fields = getattr(error, 'fields', None) or {}
+        return max(jitter, parse_retry_after(fields.get('retry_after')))
+
+    def call(self, function: Callable, *args, **kwargs):
+        """Вызывает function, повторяя временные ошибки."""
+        limit = self.clock() + self.deadline
+        for attempt in itertools.count():
+            try:
+                return function(*args, **kwargs)
+            except Exception as error:
+                if attempt + 1 >= self.attempts or not is_retryable(error):
+                    raise
+                if self.allowed is not None and not self.allowed():
+                    raise
+                delay = self.delay(attempt, error)
+                budget = deadline.current()
+                if self.clock() + delay > limit or (
+                    budget is not None and delay >= budget.remaining()
+                ):
+                    raise
+                self.retries += 1
+                logging.warning(LazyMessage(
+                    RETRY_MESSAGE,
+                    delay=delay,
+                    attempt=attempt + 2,
+                    error=error
+                ))
+                (self.sleep or time.sleep)(delay)
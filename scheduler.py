@@ -0,0 +1,137 @@
+import random
+from typing import Callable, Iterable
+
+from records import HomeworkRecord
+
+
+REVIEWING_STATUS = 'reviewing'
+FINAL_STATUSES = ('approved', 'rejected')
+UNKNOWN_SCHEDULER_ERROR = 'Неизвестный планировщик опроса: {name}.'
+
+
+class FixedScheduler:
+    """Планировщик с постоянным периодом опроса.
+
+    Ведёт учёт сделанных запросов и суммарного времени ожидания, чтобы
+    сравнивать любой планировщик с опросом раз в fixed_period секунд.
+    """
+
+    def __init__(self, period: float, fixed_period: float = None) -> None:
+        self.period = period
+        self.fixed_period = fixed_period or period
+        self.calls = 0
+        self.elapsed = 0.0
+
+    def restore(self, statuses: dict) -> None:
+        """Учитывает статусы работ, восстановленные из состояния."""
+
+    def delay(
+        self, homeworks: Iterable[HomeworkRecord], failed: bool
+    ) -> float:
+        """Возвращает паузу до следующего запроса."""
+        return self.period
+
+    def next_delay(
+        self, homeworks: Iterable[HomeworkRecord] = (), failed: bool = False
+    ) -> float:
+        """Учитывает результат запроса и возвращает паузу до следующего."""
+        delay = self.delay(homeworks, failed)
+        self.calls += 1
+        self.elapsed += delay
+        return delay
+
+    @property
+    def saved_calls(self) -> int:
+        """Сколько запросов сэкономлено по сравнению с fixed_period.
+
+        Отрицательное значение означает, что запросов сделано больше.
+        """
+        return int(self.elapsed // self.fixed_period) - self.calls
+
+
+class AdaptiveScheduler(FixedScheduler):
+    """Планировщик, подстраивающий период опроса под активность.
+
+    Пока хотя бы одна работа на ревью, API опрашивается раз в
+    reviewing_period. В периоды простоя пауза растёт экспоненциально от
+    period до max_period. К паузе добавляется случайный разброс jitter,
+    а итог не бывает меньше min_period.
+    """
+
+    def __init__(
+        self,
+        period: float,
+        reviewing_period: float,
+        min_period: float,
+        max_period: float,
+        backoff: float = 2.0,
+        jitter: float = 0.1,
+        rng: Callable[[], float] = random.random
+    ) -> None:
+        super().__init__(period)
+        self.reviewing_period = reviewing_period
+        self.min_period = min_period
+        self.max_period = max_period
+        self.backoff = backoff
+        self.jitter = jitter
+        self.rng = rng
+        self.reviewing = set()
+        self.idle_cycles = 0
+
+    def restore(self, statuses: dict) -> None:
+        """Берёт работы на ревью из восстановленных статусов {ключ: статус}.
+
+        Без этого после перезапуска пауза росла бы до max_period, хотя
+        работа всё ещё на ревью.
+        """
+        self.reviewing = {
+            key for key, status in statuses.items()
+            if status == REVIEWING_STATUS
+        }
+
+    def observe(self, homeworks: Iterable[HomeworkRecord]) -> bool:
+        """Запоминает работы на ревью; возвращает True, если были изменения."""
+        changed = False
+        for homework in homeworks:
+            changed = True
+            if homework.status == REVIEWING_STATUS:
+                self.reviewing.add(homework.key)
+            elif homework.status in FINAL_STATUSES:
+                self.reviewing.discard(homework.key)
+        return changed
+
+    def delay(
+        self, homeworks: Iterable[HomeworkRecord], failed: bool
+    ) -> float:
+        """Возвращает паузу с учётом ревью, простоя и разброса."""
+        if self.observe(homeworks) or failed:
+            self.idle_cycles = 0
+        elif self.period * self.backoff ** self.idle_cycles < self.max_period:
+            self.idle_cycles += 1
+        if self.reviewing:
+            delay = self.reviewing_period
+        else:
+            delay = min(
+                self.period * self.backoff ** self.idle_cycles,
+                self.max_period
+            )
+        delay *= 1 + self.jitter * (2 * self.rng() - 1)
+        return max(delay, self.min_period)
+
+
+def make_scheduler(
+    name: str,
+    period: float,
+    reviewing_period: float,
+    min_period: float,
+    max_period: float,
+    rng: Callable[[], float] = random.random
+) -> FixedScheduler:
+    """Создаёт планировщик опроса по имени: fixed или adaptive."""
+    if name == 'fixed':
+        return FixedScheduler(period)
+    if name == 'adaptive':
+        return AdaptiveScheduler(
+            period, reviewing_period, min_period, max_period, rng=rng
+        )
+    raise ValueError(UNKNOWN_SCHEDULER_ERROR.format(name=name))
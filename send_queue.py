@@ -0,0 +1,252 @@
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future
+from typing import Callable, Optional, Union
+
+from telebot import TeleBot
+
+
+GLOBAL_RATE = 30.0
+CHAT_RATE = 1.0
+CHAT_BURST = 3
+TOO_MANY_REQUESTS = 429
+DEFAULT_RETRY_AFTER = 1.0
+
+QUEUED_MESSAGE = 'Сообщение для чата {chat_id} поставлено в очередь.'
+FLOOD_LIMIT_MESSAGE = (
+    'Telegram ограничил отправку в чат {chat_id}, '
+    'повтор через {retry_after} с.'
+)
+QUEUE_SEND_ERROR = (
+    'Сообщение из очереди отправить в Telegram не удалось.\n'
+    'Чат: {chat_id}\n'
+    'Текст сообщения: {message}\n'
+    'Ошибка: {error}'
+)
+QUEUE_NOT_EMPTY_ON_CLOSE = (
+    'Очередь остановлена, не отправлено сообщений: {count}.'
+)
+
+
+class TokenBucket:
+    """Ограничитель частоты: rate токенов в секунду, не больше capacity."""
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        """Начисляет токены за время, прошедшее с прошлого обновления."""
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Сколько секунд ждать до появления свободного токена."""
+        self.refill(now)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def take(self, now: float) -> None:
+        """Расходует один токен."""
+        self.refill(now)
+        self.tokens -= 1
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Возвращает паузу из ответа 429 Telegram или None для других ошибок."""
+    if getattr(error, 'error_code', None) != TOO_MANY_REQUESTS:
+        return None
+    parameters = (getattr(error, 'result_json', None) or {}).get(
+        'parameters', {}
+    )
+    return float(parameters.get('retry_after', DEFAULT_RETRY_AFTER))
+
+
+class SendQueue:
+    """Очередь исходящих сообщений Telegram с ограничением частоты.
+
+    Повторяет интерфейс TeleBot.send_message, но только ставит сообщение
+    в очередь и возвращает Future. Отдельный поток отправляет сообщения,
+    соблюдая лимиты Telegram для каждого чата и для бота в целом, а на
+    ответ 429 ждёт retry_after секунд и повторяет отправку. Пока один чат
+    ждёт своей очереди, сообщения в другие чаты продолжают уходить.
+
+    Future получает ответ Telegram после отправки или исключение при
+    ошибке. После ошибки остальные сообщения того же чата тоже
+    завершаются этой ошибкой, чтобы их повтор сохранил порядок. Если
+    close не дождался отправки, Future оставшихся сообщений отменяются.
+    """
+
+    def __init__(
+        self,
+        bot: TeleBot,
+        global_rate: float = GLOBAL_RATE,
+        chat_rate: float = CHAT_RATE,
+        chat_burst: float = CHAT_BURST,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.bot = bot
+        self.clock = clock
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.global_bucket = TokenBucket(global_rate, global_rate, clock())
+        self.chat_buckets = {}
+        self.inbox = queue.Queue()
+        self.pending = defaultdict(deque)
+        self.backlog = 0
+        self.ready = []
+        self.order = itertools.count()
+        self.sent = 0
+        self.failed = 0
+        self.closed = False
+        self.abandoned = False
+        self.thread = threading.Thread(
+            target=self.run, name='telegram-send-queue', daemon=True
+        )
+
+    def start(self) -> 'SendQueue':
+        """Запускает поток отправки."""
+        self.thread.start()
+        return self
+
+    def send_message(
+        self, chat_id: Union[int, str] = None, text: str = None, **kwargs
+    ) -> Future:
+        """Ставит сообщение в очередь, не обращаясь к сети."""
+        future = Future()
+        self.inbox.put((chat_id, text, future))
+        logging.debug(QUEUED_MESSAGE.format(chat_id=chat_id))
+        return future
+
+    @property
+    def depth(self) -> int:
+        """Число сообщений, ожидающих отправки."""
+        return self.inbox.qsize() + self.backlog
+
+    def schedule(self, chat_id: Union[int, str], at: float) -> None:
+        """Назначает время, когда чат сможет отправить следующее сообщение."""
+        heapq.heappush(self.ready, (at, next(self.order), chat_id))
+
+    def accept(
+        self, chat_id: Union[int, str], text: str, future: Future
+    ) -> None:
+        """Переносит сообщение из входящей очереди в очередь чата."""
+        if not self.pending[chat_id]:
+            self.schedule(chat_id, self.clock())
+        self.pending[chat_id].append((text, future))
+        self.backlog += 1
+
+    def receive(self, timeout: Optional[float]) -> None:
+        """Ждёт новых сообщений не дольше timeout секунд."""
+        try:
+            self.accept(*self.inbox.get(timeout=timeout))
+            while True:
+                self.accept(*self.inbox.get_nowait())
+        except queue.Empty:
+            pass
+
+    def bucket(self, chat_id: Union[int, str], now: float) -> TokenBucket:
+        """Возвращает ограничитель частоты для чата."""
+        if chat_id not in self.chat_buckets:
+            self.chat_buckets[chat_id] = TokenBucket(
+                self.chat_rate, self.chat_burst, now
+            )
+        return self.chat_buckets[chat_id]
+
+    def deliver(self, chat_id: Union[int, str], now: float) -> None:
+        """Отправляет первое сообщение чата и планирует следующее."""
+        chat_bucket = self.bucket(chat_id, now)
+        wait = max(
+            chat_bucket.wait_time(now), self.global_bucket.wait_time(now)
+        )
+        if wait:
+            self.schedule(chat_id, now + wait)
+            return
+        chat_bucket.take(now)
+        self.global_bucket.take(now)
+        messages = self.pending[chat_id]
+        text, future = messages.popleft()
+        try:
+            result = self.bot.send_message(chat_id=chat_id, text=text)
+        except Exception as error:
+            pause = retry_after(error)
+            if pause is not None:
+                logging.warning(FLOOD_LIMIT_MESSAGE.format(
+                    chat_id=chat_id,
+                    retry_after=pause
+                ))
+                messages.appendleft((text, future))
+                self.schedule(chat_id, now + pause)
+                return
+            logging.exception(QUEUE_SEND_ERROR.format(
+                chat_id=chat_id,
+                message=text,
+                error=error
+            ))
+            self.fail(chat_id, future, error)
+            return
+        self.sent += 1
+        self.backlog -= 1
+        future.set_result(result)
+        if messages:
+            self.schedule(chat_id, now)
+        else:
+            del self.pending[chat_id]
+
+    def fail(
+        self, chat_id: Union[int, str], future: Future, error: Exception
+    ) -> None:
+        """Завершает ошибкой сообщение и все ждущие сообщения чата."""
+        futures = [future] + [
+            waiting for _, waiting in self.pending.pop(chat_id)
+        ]
+        self.failed += len(futures)
+        self.backlog -= len(futures)
+        self.ready = [entry for entry in self.ready if entry[2] != chat_id]
+        heapq.heapify(self.ready)
+        for future in futures:
+            future.set_exception(error)
+
+    def run(self) -> None:
+        """Цикл потока отправки."""
+        while not (self.closed and not self.ready and self.inbox.empty()):
+            if self.abandoned:
+                self.cancel()
+                return
+            now = self.clock()
+            if self.ready and self.ready[0][0] <= now:
+                self.deliver(heapq.heappop(self.ready)[2], now)
+                continue
+            self.receive(
+                self.ready[0][0] - now if self.ready else 0.1
+            )
+
+    def cancel(self) -> None:
+        """Отменяет Future всех неотправленных сообщений."""
+        self.receive(timeout=0)
+        for messages in self.pending.values():
+            for _, future in messages:
+                future.cancel()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Дожидается отправки очереди не дольше timeout секунд.
+
+        Не дождавшись, останавливает поток отправки после текущего
+        сообщения и отменяет Future остальных.
+        """
+        self.closed = True
+        if self.thread.is_alive():
+            self.thread.join(timeout)
+        if self.depth:
+            logging.warning(QUEUE_NOT_EMPTY_ON_CLOSE.format(count=self.depth))
+        self.abandoned = True
+        if not self.thread.is_alive():
+            self.cancel()
@@ -0,0 +1,80 @@
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, Optional
+
+from exceptions import ShutdownRequested
+
+
+SHUTDOWN_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+
+class GracefulShutdown:
+    """Останавливает цикл опроса по SIGTERM/SIGINT.
+
+    Обработчик сигнала только поднимает флаг, поэтому начатые запрос к API
+    и отправка сообщений не обрываются. Если сигнал пришёл во время
+    паузы между итерациями или паузы внутри итерации (sleep, например
+    перед повтором запроса), пауза прерывается сразу исключением
+    ShutdownRequested, а если во время остальной работы итерации —
+    итерация завершается, и пауза не начинается.
+    """
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.sleeping = False
+        self.callback = None
+
+    def install(
+        self, signals: Iterable[int] = SHUTDOWN_SIGNALS
+    ) -> 'GracefulShutdown':
+        """Устанавливает обработчики сигналов в главном потоке."""
+        for signum in signals:
+            signal.signal(signum, self.handle)
+        return self
+
+    def handle(self, signum: int, frame: object) -> None:
+        """Обработчик сигнала остановки."""
+        self.event.set()
+        if self.sleeping:
+            raise ShutdownRequested
+
+    @property
+    def requested(self) -> bool:
+        """Получен ли сигнал остановки."""
+        return self.event.is_set()
+
+    @contextmanager
+    def interruptible(self) -> Iterator[None]:
+        """Участок кода, который сигнал остановки прерывает сразу.
+
+        Если сигнал уже получен, ShutdownRequested поднимается до входа в
+        участок.
+        """
+        self.sleeping = True
+        try:
+            if self.requested:
+                raise ShutdownRequested
+            yield
+        finally:
+            self.sleeping = False
+
+    def sleep(
+        self, seconds: float, sleep: Callable[[float], None] = time.sleep
+    ) -> None:
+        """Пауза внутри итерации, которую сигнал остановки прерывает сразу."""
+        with self.interruptible():
+            sleep(seconds)
+
+    def on_shutdown(self, callback: Callable, *args) -> None:
+        """Задаёт функцию, которая завершит работу после остановки цикла."""
+        self.callback = (callback, args)
+
+    def finish(self) -> Optional[object]:
+        """Вызывает функцию, заданную on_shutdown."""
+        if self.callback is None:
+            return None
+        callback, args = self.callback
+        self.callback = None
+        return callback(*args)
@@ -0,0 +1,163 @@
+import argparse
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Optional
+
+import homework
+from clock import SimulatedClock
+from exceptions import StatusCodeIsNot200Error
+from state import StateStore
+
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+START = 1_700_000_000
+
+SCRIPTED_STATUS_ERROR = 'Код ответа по сценарию: {status_code}'
+SUMMARY_MESSAGE = (
+    'Смоделировано {days:.1f} сут. за {wall:.3f} с: итераций {cycles}, '
+    'запросов к API {calls}, сообщений {messages}.'
+)
+
+
+def make_homework(id: int, status: str) -> dict:
+    """Домашняя работа в формате API Практикум Домашка."""
+    return {
+        'id': id,
+        'homework_name': f'student__hw{id}.zip',
+        'status': status
+    }
+
+
+DEFAULT_TIMELINE = (
+    (HOUR, make_homework(1, 'reviewing')),
+    (5 * HOUR, make_homework(1, 'approved')),
+    (2 * DAY, HTTPStatus.SERVICE_UNAVAILABLE),
+    (2 * DAY + 2 * HOUR, HTTPStatus.OK),
+    (4 * DAY, make_homework(2, 'reviewing')),
+    (5 * DAY, make_homework(2, 'rejected')),
+)
+
+
+class ScriptedApi:
+    """Замена get_api_answer, отвечающая по сценарию в моделируемом времени.
+
+    timeline — пары (секунда от начала, событие). Событие-словарь —
+    домашняя работа, которая с этого момента попадает в ответы с новым
+    статусом. Событие-код — код ответа API с этого момента и до
+    следующего события-кода.
+    """
+
+    def __init__(self, clock: SimulatedClock, timeline=DEFAULT_TIMELINE):
+        self.clock = clock
+        self.start = clock.time()
+        self.timeline = sorted(timeline, key=lambda event: event[0])
+        self.position = 0
+        self.status = HTTPStatus.OK
+        self.updates = []
+        self.calls = 0
+
+    def advance(self) -> None:
+        """Применяет события сценария, время которых наступило."""
+        now = self.clock.time() - self.start
+        while (
+            self.position < len(self.timeline)
+            and self.timeline[self.position][0] <= now
+        ):
+            at, event = self.timeline[self.position]
+            if isinstance(event, dict):
+                self.updates.append((self.start + at, event))
+            else:
+                self.status = event
+            self.position += 1
+
+    def __call__(self, timestamp: int) -> dict:
+        self.calls += 1
+        self.advance()
+        if self.status != HTTPStatus.OK:
+            raise StatusCodeIsNot200Error(
+                SCRIPTED_STATUS_ERROR, status_code=self.status
+            )
+        return {
+            'homeworks': [
+                homework for updated, homework in reversed(self.updates)
+                if updated >= timestamp
+            ],
+            'current_date': int(self.clock.time())
+        }
+
+
+class RecordingBot:
+    """Бот, запоминающий отправленные сообщения с моделируемым временем."""
+
+    def __init__(self, clock: SimulatedClock) -> None:
+        self.clock = clock
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None) -> None:
+        """Запоминает сообщение."""
+        self.sent.append((self.clock.time(), text))
+
+
+@dataclass
+class Simulation:
+    """Итог прогона: часы, API, бот и цикл опроса после завершения."""
+
+    clock: SimulatedClock
+    api: ScriptedApi
+    bot: RecordingBot
+    loop: 'homework.PollingLoop'
+    cycles: int = 0
+    delays: list = field(default_factory=list)
+
+
+def simulate(
+    timeline=DEFAULT_TIMELINE,
+    duration: float = WEEK,
+    start: float = START,
+    seed: Optional[int] = 0
+) -> Simulation:
+    """Прогоняет цикл опроса duration секунд моделируемого времени."""
+    clock = SimulatedClock(start)
+    api = ScriptedApi(clock, timeline)
+    bot = RecordingBot(clock)
+    loop = homework.PollingLoop(
+        bot, StateStore(), clock=clock, api=api, rng=random.Random(seed)
+    )
+    result = Simulation(clock, api, bot, loop)
+    while clock.time() < start + duration:
+        delay = loop.step()
+        result.cycles += 1
+        result.delays.append(delay)
+        clock.sleep(delay)
+    return result
+
+
+def main() -> None:
+    """Прогоняет сценарий по умолчанию и печатает сводку."""
+    parser = argparse.ArgumentParser(
+        description='Моделирование цикла опроса в ускоренном времени.'
+    )
+    parser.add_argument('--days', type=float, default=7)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    homework.TELEGRAM_CHAT_ID = homework.TELEGRAM_CHAT_ID or 'simulation'
+    wall = time.perf_counter()
+    result = simulate(duration=args.days * DAY)
+    print(SUMMARY_MESSAGE.format(
+        days=args.days,
+        wall=time.perf_counter() - wall,
+        cycles=result.cycles,
+        calls=result.api.calls,
+        messages=len(result.bot.sent)
+    ))
+    for moment, text in result.bot.sent:
+        print(f'{(moment - START) / HOUR:8.2f} ч  {text.splitlines()[0]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+
+DEFAULT_TENANT = 'default'
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cursors ('
+    'tenant TEXT PRIMARY KEY, from_date INTEGER NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS errors ('
+    'tenant TEXT PRIMARY KEY, fingerprint TEXT NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS statuses ('
+    'tenant TEXT NOT NULL, homework NOT NULL, status TEXT, '
+    'PRIMARY KEY (tenant, homework)) WITHOUT ROWID',
+    'CREATE TABLE IF NOT EXISTS outbox ('
+    'id INTEGER PRIMARY KEY AUTOINCREMENT, chat_id NOT NULL, '
+    'text TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, '
+    'next_attempt REAL NOT NULL DEFAULT 0, '
+    "tenant TEXT NOT NULL DEFAULT 'default')",
+)
+OUTBOX_TENANT_COLUMN = (
+    "ALTER TABLE outbox ADD COLUMN tenant TEXT NOT NULL DEFAULT 'default'"
+)
+
+
+@dataclass
+class TenantState:
+    """Сохранённое состояние опроса одного пользователя."""
+
+    from_date: Optional[int] = None
+    last_error: str = ''
+    statuses: dict = field(default_factory=dict)
+
+
+class StateStore:
+    """Хранит курсоры, статусы работ и последние ошибки в SQLite.
+
+    База открывается в режиме WAL. Изменения сначала накапливаются в
+    памяти методом stage, а затем записываются одной транзакцией в
+    flush, поэтому цикл опроса платит не больше одного fsync.
+    """
+
+    def __init__(self, path: str = ':memory:') -> None:
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+            columns = {
+                row[1] for row in self.connection.execute(
+                    'PRAGMA table_info(outbox)'
+                )
+            }
+            if 'tenant' not in columns:
+                self.connection.execute(OUTBOX_TENANT_COLUMN)
+        self.lock = threading.Lock()
+        self.saved_cursors = {}
+        self.saved_errors = {}
+        self.cursors = {}
+        self.errors = {}
+        self.statuses = {}
+        self.messages = []
+
+    def load(self, tenant: str = DEFAULT_TENANT) -> TenantState:
+        """Читает состояние пользователя по первичным ключам."""
+        with self.lock:
+            cursor = self.connection.execute(
+                'SELECT from_date FROM cursors WHERE tenant = ?', (tenant,)
+            ).fetchone()
+            error = self.connection.execute(
+                'SELECT fingerprint FROM errors WHERE tenant = ?', (tenant,)
+            ).fetchone()
+            statuses = dict(self.connection.execute(
+                'SELECT homework, status FROM statuses WHERE tenant = ?',
+                (tenant,)
+            ))
+        state = TenantState(
+            from_date=cursor[0] if cursor else None,
+            last_error=error[0] if error else '',
+            statuses=statuses
+        )
+        self.saved_cursors[tenant] = state.from_date
+        self.saved_errors[tenant] = state.last_error
+        return state
+
+    def stage(
+        self,
+        tenant: str = DEFAULT_TENANT,
+        from_date: Optional[int] = None,
+        last_error: Optional[str] = None,
+        statuses: Optional[dict] = None,
+        messages: Iterable[tuple] = ()
+    ) -> None:
+        """Запоминает изменения состояния до следующего flush.
+
+        Значения, совпадающие с уже записанными, пропускаются.
+        messages — пары (chat_id, text) для таблицы outbox пользователя
+        tenant: они попадают в ту же транзакцию, что и курсор, поэтому
+        сдвиг курсора и сообщения о найденных изменениях сохраняются
+        атомарно.
+        """
+        with self.lock:
+            if from_date not in (None, self.saved_cursors.get(tenant)):
+                self.cursors[tenant] = from_date
+            if last_error not in (None, self.saved_errors.get(tenant)):
+                self.errors[tenant] = last_error
+            for homework, status in (statuses or {}).items():
+                self.statuses[tenant, homework] = status
+            self.messages.extend(
+                (tenant, chat_id, text) for chat_id, text in messages
+            )
+
+    def flush(self) -> int:
+        """Записывает накопленные изменения одной транзакцией.
+
+        Возвращает число записанных строк.
+        """
+        with self.lock:
+            if not (
+                self.cursors or self.errors or self.statuses or self.messages
+            ):
+                return 0
+            cursors, self.cursors = self.cursors, {}
+            errors, self.errors = self.errors, {}
+            statuses, self.statuses = self.statuses, {}
+            messages, self.messages = self.messages, []
+            with self.connection:
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO cursors VALUES (?, ?)',
+                    cursors.items()
+                )
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO errors VALUES (?, ?)',
+                    errors.items()
+                )
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO statuses VALUES (?, ?, ?)',
+                    [key + (status,) for key, status in statuses.items()]
+                )
+                self.connection.executemany(
+                    'INSERT INTO outbox (tenant, chat_id, text) '
+                    'VALUES (?, ?, ?)',
+                    messages
+                )
+            self.saved_cursors.update(cursors)
+            self.saved_errors.update(errors)
+        return len(cursors) + len(errors) + len(statuses) + len(messages)
+
+    def close(self) -> None:
+        """Записывает накопленные изменения и закрывает базу."""
+        self.flush()
+        self.connection.close()
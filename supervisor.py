@@ -0,0 +1,325 @@
+import asyncio
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from log_pipeline import LazyMessage, make_formatter, start_listener
+
+
+SUPERVISOR_WORKERS = int(os.getenv('SUPERVISOR_WORKERS', os.cpu_count()))
+CHECK_INTERVAL = 1.0
+STOP_TIMEOUT = 10.0
+DRAIN_TIMEOUT = STOP_TIMEOUT / 2
+RESTART_BASE_DELAY = 1.0
+RESTART_MAX_DELAY = 60.0
+REPLICAS = 100
+
+WORKER_STARTED = 'Процесс {name} (pid {pid}) опрашивает {count} польз.'
+WORKER_CRASHED = (
+    'Процесс {name} (pid {pid}) завершился с кодом {code}, '
+    'перезапуск через {delay:.0f} с.'
+)
+WORKER_STOPPING = 'Получен сигнал остановки, сохраняю состояние.'
+WORKERS_RESIZED = 'Число процессов: {count}, перераспределено польз.: {moved}.'
+
+
+def hash_key(key: str) -> int:
+    """Позиция ключа на кольце."""
+    return int.from_bytes(
+        hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big'
+    )
+
+
+class HashRing:
+    """Консистентное хеширование ключей по узлам.
+
+    Каждый узел занимает replicas точек на кольце, ключ принадлежит
+    первому узлу по часовой стрелке. При добавлении или удалении узла
+    переезжает лишь около 1/N ключей.
+    """
+
+    def __init__(
+        self, nodes: Iterable[str] = (), replicas: int = REPLICAS
+    ) -> None:
+        self.replicas = replicas
+        self.points = []
+        self.owners = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: str) -> None:
+        """Добавляет узел на кольцо."""
+        for replica in range(self.replicas):
+            point = hash_key(f'{node}#{replica}')
+            index = bisect.bisect(self.points, point)
+            self.points.insert(index, point)
+            self.owners.insert(index, node)
+
+    def remove(self, node: str) -> None:
+        """Убирает узел с кольца."""
+        kept = [
+            (point, owner)
+            for point, owner in zip(self.points, self.owners)
+            if owner != node
+        ]
+        self.points = [point for point, _ in kept]
+        self.owners = [owner for _, owner in kept]
+
+    def node(self, key: str) -> str:
+        """Узел, которому принадлежит key."""
+        index = bisect.bisect(self.points, hash_key(key)) % len(self.points)
+        return self.owners[index]
+
+    def assign(self, items: Iterable, key: Callable = str) -> Dict[str, list]:
+        """Раскладывает items по узлам по ключу key(item)."""
+        shards = {node: [] for node in set(self.owners)}
+        for item in items:
+            shards[self.node(key(item))].append(item)
+        return shards
+
+
+def tenant_key(tenant: dict) -> str:
+    """Ключ шардирования пользователя — его токен."""
+    return tenant['token']
+
+
+async def run_until_stopped(poller) -> None:
+    """Опрашивает API, пока процесс не получит SIGTERM или SIGINT."""
+    task = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, task.cancel)
+    try:
+        await poller.run()
+    except asyncio.CancelledError:
+        logging.info(WORKER_STOPPING)
+
+
+def poll_shard(tenants: List[dict]) -> None:
+    """Опрашивает API для части пользователей в процессе-обработчике.
+
+    По SIGTERM опрос останавливается, состояние сохраняется, а очередь
+    отправки получает DRAIN_TIMEOUT секунд, что укладывается в
+    STOP_TIMEOUT супервизора.
+    """
+    from telebot import TeleBot
+
+    from homework import STATE_DB_PATH, TELEGRAM_TOKEN, start_leases
+    from multitenant import MultiTenantPoller, Tenant
+    from send_queue import SendQueue
+    from state import StateStore
+
+    handler = logging.StreamHandler(stream=sys.stdout)
+    handler.setFormatter(make_formatter(os.getenv('LOG_FORMAT', 'text')))
+    logging.basicConfig(level=logging.INFO, handlers=[handler])
+    send_queue = SendQueue(TeleBot(token=TELEGRAM_TOKEN)).start()
+    poller = MultiTenantPoller(
+        [Tenant(**tenant) for tenant in tenants],
+        send_queue,
+        store=StateStore(STATE_DB_PATH),
+        leases=start_leases()
+    )
+    try:
+        asyncio.run(run_until_stopped(poller))
+    finally:
+        poller.close(timeout=DRAIN_TIMEOUT)
+
+
+class Supervisor:
+    """Распределяет пользователей по процессам-обработчикам.
+
+    Пользователи раскладываются по процессам консистентным хешированием
+    токена, каждый процесс выполняет target над своей частью. При
+    изменении числа процессов перезапускаются только процессы, чья часть
+    изменилась, а завершившиеся процессы перезапускаются с той же частью.
+    Пауза перед перезапуском растёт вдвое с каждым падением подряд от
+    RESTART_BASE_DELAY до RESTART_MAX_DELAY и сбрасывается, если процесс
+    проработал дольше RESTART_MAX_DELAY.
+    """
+
+    def __init__(
+        self,
+        tenants: Iterable[dict],
+        workers: int = SUPERVISOR_WORKERS,
+        target: Callable = poll_shard,
+        args: tuple = (),
+        context: Optional[multiprocessing.context.BaseContext] = None,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.tenants = list(tenants)
+        self.target = target
+        self.args = args
+        self.context = context or multiprocessing.get_context('spawn')
+        self.ring = HashRing()
+        self.shards = {}
+        self.processes = {}
+        self.clock = clock
+        self.started = {}
+        self.failures = {}
+        self.restart_at = {}
+        self.restarts = 0
+        self.pending = workers
+        self.running = True
+
+    @staticmethod
+    def name(index: int) -> str:
+        """Имя процесса-обработчика по номеру."""
+        return f'worker-{index}'
+
+    def start_worker(self, name: str) -> None:
+        """Запускает процесс для части пользователей name."""
+        process = self.context.Process(
+            target=self.target,
+            args=(self.shards[name],) + self.args,
+            name=name,
+            daemon=True
+        )
+        process.start()
+        self.processes[name] = process
+        self.started[name] = self.clock()
+        self.restart_at.pop(name, None)
+        logging.info(WORKER_STARTED.format(
+            name=name, pid=process.pid, count=len(self.shards[name])
+        ))
+
+    def stop_worker(self, name: str) -> None:
+        """Останавливает процесс name по SIGTERM, а если не вышло — SIGKILL."""
+        process = self.processes.pop(name)
+        process.terminate()
+        process.join(STOP_TIMEOUT)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def resize(self, workers: int) -> int:
+        """Меняет число процессов и возвращает число переехавших польз."""
+        workers = max(workers, 1)
+        names = [self.name(index) for index in range(workers)]
+        self.ring = HashRing(names)
+        shards = self.ring.assign(self.tenants, tenant_key)
+        owner = {
+            tenant_key(tenant): name
+            for name, shard in self.shards.items() for tenant in shard
+        }
+        moved = sum(
+            owner.get(tenant_key(tenant)) not in (None, name)
+            for name, shard in shards.items() for tenant in shard
+        )
+        for name in list(self.processes):
+            if shards.get(name) != self.shards.get(name):
+                self.stop_worker(name)
+        for name in list(self.restart_at):
+            if name not in shards:
+                del self.restart_at[name]
+        self.shards = shards
+        for name in names:
+            if name not in self.processes:
+                self.start_worker(name)
+        logging.info(WORKERS_RESIZED.format(count=workers, moved=moved))
+        return moved
+
+    def restart_delay(self, name: str) -> float:
+        """Пауза перед перезапуском упавшего процесса name."""
+        if self.clock() - self.started[name] > RESTART_MAX_DELAY:
+            self.failures[name] = 0
+        self.failures[name] = self.failures.get(name, 0) + 1
+        return min(
+            RESTART_BASE_DELAY * 2 ** (self.failures[name] - 1),
+            RESTART_MAX_DELAY
+        )
+
+    def check(self) -> None:
+        """Перезапускает завершившиеся процессы, когда подошла пауза."""
+        for name, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del self.processes[name]
+            delay = self.restart_delay(name)
+            self.restart_at[name] = self.clock() + delay
+            logging.error(LazyMessage(
+                WORKER_CRASHED,
+                name=name,
+                pid=process.pid,
+                code=process.exitcode,
+                delay=delay
+            ))
+        for name, at in list(self.restart_at.items()):
+            if at <= self.clock():
+                self.restarts += 1
+                self.start_worker(name)
+
+    def install(self) -> 'Supervisor':
+        """Устанавливает обработчики сигналов.
+
+        SIGTTIN добавляет процесс, SIGTTOU убирает, SIGTERM и SIGINT
+        останавливают все процессы.
+        """
+        signal.signal(signal.SIGTTIN, lambda *args: self.scale(1))
+        signal.signal(signal.SIGTTOU, lambda *args: self.scale(-1))
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *args: self.stop())
+        return self
+
+    def scale(self, delta: int) -> None:
+        """Запрашивает изменение числа процессов на delta."""
+        self.pending = max((self.pending or len(self.shards)) + delta, 1)
+
+    def stop(self) -> None:
+        """Запрашивает остановку всех процессов."""
+        self.running = False
+
+    def step(self) -> None:
+        """Применяет запрошенное число процессов и проверяет процессы."""
+        if self.pending is not None:
+            workers, self.pending = self.pending, None
+            self.resize(workers)
+        self.check()
+
+    def run(self, interval: float = CHECK_INTERVAL) -> None:
+        """Следит за процессами до вызова stop."""
+        try:
+            while self.running:
+                self.step()
+                time.sleep(interval)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Останавливает все процессы."""
+        for name in list(self.processes):
+            self.stop_worker(name)
+
+
+def main() -> None:
+    """Запускает опрос пользователей из TENANTS_FILE в нескольких процессах."""
+    from multitenant import TENANTS_FILE, TENANTS_LOADED, load_tenants
+
+    tenants = [
+        {
+            'token': tenant.token,
+            'chat_id': tenant.chat_id,
+            'from_date': tenant.from_date
+        }
+        for tenant in load_tenants(TENANTS_FILE)
+    ]
+    logging.info(TENANTS_LOADED.format(count=len(tenants)))
+    Supervisor(tenants).install().run()
+
+
+if __name__ == '__main__':
+    queue_handler, listener = start_listener(
+        handlers=[logging.StreamHandler(stream=sys.stdout)],
+        formatter=make_formatter(os.getenv('LOG_FORMAT', 'text'))
+    )
+    logging.basicConfig(level=logging.DEBUG, handlers=[queue_handler])
+    try:
+        main()
+    finally:
+        listener.stop()
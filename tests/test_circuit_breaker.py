@@ -0,0 +1,130 @@
+import pytest
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from exceptions import (
+    CircuitOpenError, ErrorKeyInResponseError, StatusCodeIsNot200Error
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Api:
+    def __init__(self):
+        self.calls = 0
+        self.error = StatusCodeIsNot200Error('Код ответа: 500')
+
+    def __call__(self):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return {'homeworks': []}
+
+
+def make_breaker():
+    clock = Clock()
+    return CircuitBreaker(3, 60, clock=clock), clock, Api()
+
+
+def fail(breaker, api, times):
+    for _ in range(times):
+        with pytest.raises(StatusCodeIsNot200Error):
+            breaker.call(api)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker, clock, api = make_breaker()
+        fail(breaker, api, 3)
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpenError) as info:
+            breaker.call(api)
+        assert api.calls == 3
+        assert breaker.avoided == 1
+        assert 'через 60 с' in str(info.value)
+
+    def test_success_resets_failure_count(self):
+        breaker, clock, api = make_breaker()
+        fail(breaker, api, 2)
+        api.error = None
+        breaker.call(api)
+        api.error = StatusCodeIsNot200Error('Код ответа: 500')
+        fail(breaker, api, 2)
+        assert breaker.state == CLOSED
+
+    def test_single_probe_closes_circuit(self):
+        breaker, clock, api = make_breaker()
+        fail(breaker, api, 3)
+        clock.now = 60
+        api.error = None
+        assert breaker.call(api) == {'homeworks': []}
+        assert breaker.state == CLOSED
+        assert breaker.open_seconds == 60
+
+    def test_failed_probe_reopens_circuit(self):
+        breaker, clock, api = make_breaker()
+        fail(breaker, api, 3)
+        clock.now = 60
+        fail(breaker, api, 1)
+        assert breaker.state == OPEN
+        clock.now = 90
+        with pytest.raises(CircuitOpenError):
+            breaker.call(api)
+        assert api.calls == 4
+        assert breaker.open_seconds == 90
+
+    def test_only_one_probe_in_half_open(self):
+        breaker, clock, api = make_breaker()
+        fail(breaker, api, 3)
+        clock.now = 60
+        breaker.before_call()
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_response_errors_do_not_trip(self):
+        breaker, clock, api = make_breaker()
+        api.error = ErrorKeyInResponseError('Ответ API содержит ошибку.')
+        for _ in range(5):
+            with pytest.raises(ErrorKeyInResponseError):
+                breaker.call(api)
+        assert breaker.state == CLOSED
+
+
+class TestPollingLoopBreaker:
+    def test_breaker_counts_cycles_and_probes_once(self, homework_module):
+        from clock import SimulatedClock
+        from exceptions import RequestFailedError
+        from state import StateStore
+
+        requests = []
+
+        def api(timestamp):
+            requests.append(timestamp)
+            raise RequestFailedError('Сбой соединения.')
+
+        clock = SimulatedClock(1000)
+        loop = homework_module.PollingLoop(
+            object(), StateStore(), clock=clock, api=api
+        )
+        loop.step()
+        assert len(requests) == homework_module.API_RETRY_ATTEMPTS
+        assert loop.breaker.state == CLOSED, (
+            'Размыкатель должен считать циклы опроса, а не повторы внутри '
+            'цикла.'
+        )
+        for _ in range(homework_module.CIRCUIT_FAILURE_THRESHOLD - 1):
+            loop.step()
+        assert loop.breaker.state == OPEN
+        clock.advance(homework_module.CIRCUIT_RESET_TIMEOUT)
+        requests.clear()
+        loop.step()
+        assert len(requests) == 1, (
+            'В полуоткрытом состоянии должен быть один пробный запрос.'
+        )
+        assert loop.breaker.state == OPEN
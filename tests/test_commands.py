@@ -0,0 +1,169 @@
+import threading
+import time
+from http import HTTPStatus
+from types import SimpleNamespace
+
+from clock import SimulatedClock
+from commands import CommandHandlers, HomeworkCache
+from records import HomeworkRecord
+
+
+class Response:
+    status_code = HTTPStatus.OK
+    headers = {}
+    content = (
+        b'{"homeworks": [{"id": 1, "homework_name": "hw1", '
+        b'"status": "approved"}], "current_date": 1000}'
+    )
+
+    def json(self):
+        return {
+            'homeworks': [
+                {'id': 1, 'homework_name': 'hw1', 'status': 'approved'}
+            ],
+            'current_date': 1000
+        }
+
+
+VERDICTS = {'approved': 'Принято.', 'reviewing': 'На проверке.'}
+
+
+class Fetch:
+    def __init__(self, *homeworks, delay=0.0, error=None):
+        self.homeworks = list(homeworks)
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.homeworks
+
+
+class Bot:
+    def __init__(self):
+        self.handlers = {}
+        self.sent = []
+
+    def register_message_handler(self, callback, commands, func):
+        self.handlers[commands[0]] = (callback, func)
+
+    def send_message(self, chat_id, text):
+        self.sent.append((chat_id, text))
+
+    def command(self, name, chat_id=1):
+        callback, allowed = self.handlers[name]
+        message = SimpleNamespace(chat=SimpleNamespace(id=chat_id))
+        if allowed(message):
+            callback(message)
+
+
+def make_cache(fetch, ttl=60):
+    clock = SimulatedClock(1000)
+    return HomeworkCache(fetch, ttl=ttl, clock=clock.time), clock
+
+
+class TestHomeworkCache:
+    def test_stale_cache_is_refreshed(self):
+        fetch = Fetch(HomeworkRecord(1, 'hw1', 'approved'))
+        cache, clock = make_cache(fetch)
+        cache.update([HomeworkRecord(2, 'hw2', 'reviewing')])
+        assert not cache.fresh(), 'Неполный список работ считается свежим.'
+        assert len(cache.snapshot()) == 2
+        cache.snapshot()
+        assert fetch.calls == 1
+        clock.advance(61)
+        cache.snapshot()
+        assert fetch.calls == 2
+
+    def test_failed_refresh_keeps_cached_statuses(self):
+        homework = HomeworkRecord(1, 'hw1', 'approved')
+        cache, _ = make_cache(Fetch(error=ConnectionError('Сбой.')))
+        cache.update([homework])
+        assert cache.snapshot() == [homework]
+
+    def test_history_records_status_changes(self):
+        cache, clock = make_cache(
+            Fetch(HomeworkRecord(1, 'hw1', 'reviewing'))
+        )
+        cache.refresh()
+        assert cache.changes() == []
+        clock.advance(600)
+        cache.update([HomeworkRecord(1, 'hw1', 'approved')])
+        assert cache.changes() == [
+            (1600, HomeworkRecord(1, 'hw1', 'approved'))
+        ]
+
+
+class TestCommandHandlers:
+    def test_commands_answer_only_owner(self):
+        cache, _ = make_cache(Fetch(HomeworkRecord(1, 'hw1', 'approved')))
+        bot = Bot()
+        CommandHandlers(bot, cache, 1, VERDICTS).register(bot)
+        bot.command('ping')
+        bot.command('status')
+        bot.command('history')
+        bot.command('status', chat_id=2)
+        assert bot.sent == [
+            (1, 'Бот работает. Данные о работах ещё не загружались.'),
+            (1, 'hw1: Принято.'),
+            (1, 'Изменений статусов пока не было.'),
+        ]
+
+    def test_poll_loop_updates_cache(self, homework_module):
+        from state import StateStore
+
+        requests = []
+
+        def api(timestamp):
+            requests.append(timestamp)
+            return {
+                'homeworks': [
+                    {'id': 1, 'homework_name': 'hw1', 'status': 'approved'}
+                ],
+                'current_date': 1000
+            }
+
+        loop = homework_module.PollingLoop(
+            Bot(), StateStore(), clock=SimulatedClock(1000), api=api
+        )
+        loop.step()
+        assert [homework.name for homework in loop.cache.snapshot()] == [
+            'hw1'
+        ]
+        assert requests == [1000, 0], (
+            'Полный список работ запрашивается один раз.'
+        )
+        loop.cache.snapshot()
+        assert requests == [1000, 0]
+
+    def test_concurrent_commands_make_one_request(
+            self, homework_module, monkeypatch
+    ):
+        from state import StateStore
+
+        requests = []
+
+        def http_get(**kwargs):
+            requests.append(kwargs['params'])
+            time.sleep(0.1)
+            return Response()
+        monkeypatch.setattr(homework_module.HTTP_CLIENT, 'get', http_get)
+        homework_module.RESPONSE_CACHE.clear()
+        loop = homework_module.PollingLoop(Bot(), StateStore())
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(loop.cache.snapshot())
+            )
+            for _ in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert requests == [{'from_date': 0}]
+        assert all(len(result) == 1 for result in results)
@@ -0,0 +1,103 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from conditional import ConditionalRequests
+
+HEADERS = {'Authorization': 'OAuth token'}
+
+
+class RawResponse:
+    def __init__(self, data=None, status_code=HTTPStatus.OK, headers=None):
+        self.status_code = status_code
+        self.content = json.dumps(data).encode() if data is not None else b''
+        self.headers = headers or {}
+        self.decoded = 0
+
+    def json(self):
+        return json.loads(self.content)
+
+
+@pytest.fixture(autouse=True)
+def count_decoding(monkeypatch, homework_module):
+    decode_json = homework_module.decode_json
+
+    def counting_decode_json(response):
+        response.decoded += 1
+        return decode_json(response)
+
+    monkeypatch.setattr(homework_module, 'decode_json', counting_decode_json)
+
+
+class Api:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    def __call__(self, url=None, headers=None, params=None, **kwargs):
+        self.sent_headers.append(headers)
+        return self.responses.pop(0)
+
+
+def poll(homework_module, conditional, api, timestamps):
+    for timestamp in timestamps:
+        result = homework_module.request_api_answer(
+            timestamp, HEADERS, http_get=api, conditional=conditional
+        )
+        if conditional.records(HEADERS) is None:
+            conditional.validated(
+                HEADERS, result, homework_module.check_response(result)
+            )
+    return result
+
+
+class TestConditionalRequests:
+    def test_unchanged_body_is_not_decoded(self, homework_module):
+        conditional = ConditionalRequests()
+        first = RawResponse({'homeworks': [], 'current_date': 1})
+        second = RawResponse({'homeworks': [], 'current_date': 2})
+        api = Api(first, second)
+        result = poll(homework_module, conditional, api, (0, 1))
+        assert second.decoded == 0
+        assert result == {'homeworks': [], 'current_date': 2}
+        assert conditional.records(HEADERS) == []
+        assert conditional.ratio == 0.5
+
+    def test_changed_body_is_decoded(self, homework_module):
+        conditional = ConditionalRequests()
+        homework = {'id': 1, 'homework_name': 'hw', 'status': 'approved'}
+        changed = RawResponse({'homeworks': [homework], 'current_date': 2})
+        api = Api(RawResponse({'homeworks': [], 'current_date': 1}), changed)
+        result = poll(homework_module, conditional, api, (0, 1))
+        assert changed.decoded == 1
+        assert result['homeworks'] == [homework]
+        assert conditional.records(HEADERS) is None
+
+    def test_etag_and_not_modified(self, homework_module):
+        conditional = ConditionalRequests()
+        api = Api(
+            RawResponse(
+                {'homeworks': [], 'current_date': 1},
+                headers={'ETag': '"v1"'}
+            ),
+            RawResponse(status_code=HTTPStatus.NOT_MODIFIED)
+        )
+        result = poll(homework_module, conditional, api, (0, 1))
+        assert 'If-None-Match' not in api.sent_headers[0]
+        assert api.sent_headers[1]['If-None-Match'] == '"v1"'
+        assert api.sent_headers[1]['Authorization'] == 'OAuth token'
+        assert result == {'homeworks': [], 'current_date': 1}
+
+    def test_invalid_response_is_never_short_circuited(
+            self, homework_module
+    ):
+        conditional = ConditionalRequests()
+        invalid = {'homeworks': [{'homework_name': 'hw'}], 'current_date': 1}
+        api = Api(RawResponse(invalid), RawResponse(invalid))
+        for timestamp in (0, 1):
+            result = homework_module.request_api_answer(
+                timestamp, HEADERS, http_get=api, conditional=conditional
+            )
+            assert conditional.records(HEADERS) is None
+        assert result == invalid
@@ -0,0 +1,82 @@
+from error_aggregator import ErrorAggregator, fingerprint
+from exceptions import StatusCodeIsNot200Error
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def status_error(status_code, timestamp=0):
+    return StatusCodeIsNot200Error(
+        'Код ответа: {status_code}, params: {params}',
+        status_code=status_code,
+        headers={'Authorization': 'OAuth token'},
+        params={'from_date': timestamp}
+    )
+
+
+class TestFingerprint:
+    def test_changing_params_do_not_change_fingerprint(self):
+        assert fingerprint(status_error(500, 1)) == fingerprint(
+            status_error(500, 2)
+        )
+        assert fingerprint(status_error(500)) != fingerprint(
+            status_error(503)
+        )
+
+    def test_plain_exception_uses_text(self):
+        assert fingerprint(KeyError('homeworks')) == "KeyError: 'homeworks'"
+
+
+class TestErrorAggregator:
+    def test_repeats_are_suppressed_until_window_ends(self):
+        clock = Clock()
+        errors = ErrorAggregator(
+            window=60, clock=clock, new_error_message='Сбой: {error}'
+        )
+        assert errors.record(status_error(500, 1)).startswith('Сбой: ')
+        for timestamp in range(2, 5):
+            clock.now += 10
+            assert errors.record(status_error(500, timestamp)) is None
+        clock.now = 60
+        summary = errors.record(status_error(500, 5))
+        assert 'повторилась 4 раз' in summary
+        assert 'всего 5 раз' in summary
+        assert errors.record(status_error(500, 6)) is None
+
+    def test_different_error_is_announced(self):
+        errors = ErrorAggregator(clock=Clock())
+        assert errors.record(status_error(500)) is not None
+        assert errors.record(status_error(503)) is not None
+
+    def test_recovery_notice(self):
+        clock = Clock()
+        errors = ErrorAggregator(clock=clock)
+        assert errors.recover() is None
+        errors.record(status_error(500))
+        errors.record(status_error(500))
+        clock.now = 600
+        notice = errors.recover()
+        assert 'Сбой длился 10 мин' in notice
+        assert 'ошибок за это время: 2' in notice
+        assert errors.recover() is None
+        assert errors.record(status_error(500)) is not None
+
+    def test_memory_is_bounded(self):
+        errors = ErrorAggregator(max_fingerprints=3, clock=Clock())
+        for status_code in range(10):
+            errors.record(status_error(status_code))
+        assert len(errors.active) == 3
+
+    def test_state_survives_restart(self):
+        clock = Clock()
+        errors = ErrorAggregator(clock=clock)
+        errors.record(status_error(500))
+        restored = ErrorAggregator.load(errors.dump(), clock=clock)
+        assert restored.record(status_error(500)) is None
+        assert ErrorAggregator.load('Сбой в работе программы').total == 0
+        assert ErrorAggregator().dump() == ''
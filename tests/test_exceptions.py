@@ -0,0 +1,88 @@
+import logging
+from http import HTTPStatus
+
+import pytest
+import requests
+
+from exceptions import (
+    ErrorKeyInResponseError, RequestFailedError, StatusCodeIsNot200Error,
+    redact_headers
+)
+from log_pipeline import LazyMessage
+
+HEADERS = {'Authorization': 'OAuth secret-token'}
+
+
+class Rendered:
+    def __init__(self):
+        self.calls = 0
+
+    def __format__(self, spec):
+        self.calls += 1
+        return 'rendered'
+
+
+class Response:
+    def __init__(self, status_code=HTTPStatus.OK, data=None):
+        self.status_code = status_code
+        self.content = None
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class TestLazyMessageError:
+    def test_message_is_rendered_only_on_str(self):
+        field = Rendered()
+        error = StatusCodeIsNot200Error('{field}', field=field)
+        assert field.calls == 0
+        assert str(error) == 'rendered'
+        assert field.calls == 1
+
+    def test_authorization_is_redacted(self):
+        assert redact_headers(HEADERS) == {'Authorization': 'OAuth ***'}
+        error = StatusCodeIsNot200Error(
+            '{headers}', headers=HEADERS, status_code=500
+        )
+        assert 'secret-token' not in str(error)
+        assert error.fields['status_code'] == 500
+
+    @pytest.mark.parametrize('http_get, expected', [
+        (
+            lambda **kwargs: Response(HTTPStatus.INTERNAL_SERVER_ERROR),
+            StatusCodeIsNot200Error
+        ),
+        (
+            lambda **kwargs: Response(data={'code': 'not_authenticated'}),
+            ErrorKeyInResponseError
+        ),
+    ])
+    def test_api_errors_do_not_leak_token(
+            self, homework_module, http_get, expected
+    ):
+        with pytest.raises(expected) as info:
+            homework_module.request_api_answer(0, HEADERS, http_get=http_get)
+        assert 'secret-token' not in str(info.value)
+        assert 'OAuth ***' in str(info.value)
+
+    def test_request_exception_is_wrapped(self, homework_module):
+        def http_get(**kwargs):
+            raise requests.ConnectionError('нет сети')
+
+        with pytest.raises(ConnectionError) as info:
+            homework_module.request_api_answer(0, HEADERS, http_get=http_get)
+        assert isinstance(info.value, RequestFailedError)
+        assert 'нет сети' in str(info.value)
+        assert 'secret-token' not in str(info.value)
+
+
+class TestLazyMessage:
+    def test_disabled_level_is_not_rendered(self, caplog):
+        field = Rendered()
+        with caplog.at_level(logging.INFO):
+            logging.debug(LazyMessage('{field}', field=field))
+        assert field.calls == 0
+        with caplog.at_level(logging.DEBUG):
+            logging.debug(LazyMessage('{field}', field=field))
+        assert caplog.records[-1].getMessage() == 'rendered'
@@ -0,0 +1,130 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from clock import SimulatedClock
+from deadline import budget
+from http_client import Hedger, HttpClient
+
+
+class SlowGet:
+    def __init__(self, *delays):
+        self.delays = list(delays)
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def __call__(self, **kwargs):
+        with self.lock:
+            index = len(self.calls)
+            self.calls.append(kwargs)
+        time.sleep(self.delays[index] if index < len(self.delays) else 0)
+        return index
+
+
+def make_hedger(latency, samples=20):
+    hedger = Hedger(min_samples=samples)
+    hedger.latencies.extend([latency] * samples)
+    return hedger
+
+
+class TestHttpClient:
+    def test_get_without_pool_uses_requests_get_with_timeout(
+            self, monkeypatch
+    ):
+        calls = []
+        monkeypatch.setattr(
+            requests, 'get', lambda **kwargs: calls.append(kwargs)
+        )
+        HttpClient(connect_timeout=1, read_timeout=2).get('http://x/')
+        assert calls == [{'url': 'http://x/', 'timeout': (1, 2)}], (
+            'Без открытого пула запрос должен идти через `requests.get` '
+            'с таймаутами клиента.'
+        )
+
+    def test_open_reuses_single_session(self):
+        with HttpClient(pool_size=3) as client:
+            session = client.session
+            assert isinstance(session, requests.Session)
+            assert client.open().session is session
+            adapter = session.get_adapter('https://practicum.yandex.ru/')
+            assert adapter._pool_maxsize == 3
+        assert client.session is None
+
+    def test_timeouts_are_limited_by_cycle_budget(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            requests, 'get', lambda **kwargs: calls.append(kwargs)
+        )
+        clock = SimulatedClock(0)
+        client = HttpClient(connect_timeout=3, read_timeout=10)
+        with budget(5, clock.monotonic):
+            client.get('http://x/')
+            clock.advance(5)
+            with pytest.raises(requests.Timeout):
+                client.get('http://x/')
+        assert [call['timeout'] for call in calls] == [(3, 5)], (
+            'Таймауты запроса должны укладываться в бюджет цикла, а после '
+            'его исчерпания запрос не должен отправляться.'
+        )
+
+
+class TestHedger:
+    def test_fast_request_is_not_hedged(self):
+        get = SlowGet(0.01)
+        hedger = make_hedger(0.2)
+        assert hedger.call(get, limit=1, url='http://x/') == 0
+        assert len(get.calls) == 1
+        assert hedger.hedged == 0
+        hedger.close()
+
+    def test_slow_request_is_hedged(self):
+        get = SlowGet(1.0, 0.01)
+        hedger = make_hedger(0.05)
+        start = time.monotonic()
+        assert hedger.call(get, limit=1.5, url='http://x/') == 1
+        assert time.monotonic() - start < 0.5
+        assert (hedger.hedged, hedger.hedge_wins) == (1, 1)
+        assert get.calls[0] == get.calls[1]
+        hedger.close()
+
+    def test_no_hedging_without_enough_samples(self):
+        get = SlowGet(0.1)
+        hedger = Hedger(min_samples=20)
+        assert hedger.call(get, limit=1, url='http://x/') == 0
+        assert len(get.calls) == 1
+        assert len(hedger.latencies) == 1
+        hedger.close()
+
+    def test_client_hedges_through_session(self, monkeypatch):
+        get = SlowGet(1.0, 0.01)
+        client = HttpClient(hedger=make_hedger(0.05)).open()
+        monkeypatch.setattr(client.session, 'get', get)
+        assert client.get('http://x/') == 1
+        assert get.calls[0]['timeout'] == client.timeout
+        client.close()
+
+    def test_stalled_request_times_out_as_requests_timeout(self):
+        get = SlowGet(0.5)
+        hedger = Hedger(min_samples=20)
+        with pytest.raises(requests.Timeout):
+            hedger.call(get, limit=0.05, url='http://x/')
+        hedger.close()
+
+    def test_stalled_request_fails_as_request_error(self, homework_module):
+        from exceptions import RequestFailedError
+        from retry import is_retryable
+
+        get = SlowGet(0.5)
+        client = HttpClient(connect_timeout=0.02, read_timeout=0.03,
+                            hedger=Hedger())
+        client.send = get
+        with pytest.raises(RequestFailedError) as error:
+            homework_module.request_api_answer(
+                0, {'Authorization': 'OAuth token'}, 'http://x/', client.get
+            )
+        assert is_retryable(error.value), (
+            'Зависший запрос должен повторяться и учитываться размыкателем.'
+        )
+        client.close()
@@ -0,0 +1,130 @@
+import pytest
+
+from clock import SimulatedClock
+from leases import LeaseStore
+from state import StateStore
+
+HOMEWORK = {'id': 1, 'homework_name': 'hw1.zip', 'status': 'approved'}
+
+
+class Bot:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+class Api:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, timestamp):
+        self.calls += 1
+        return {'homeworks': [HOMEWORK], 'current_date': 1000 + self.calls}
+
+
+@pytest.fixture
+def clock():
+    return SimulatedClock(1000)
+
+
+@pytest.fixture
+def make_leases(tmp_path, clock):
+    stores = []
+
+    def make_leases(owner):
+        store = LeaseStore(
+            str(tmp_path / 'leases.sqlite3'),
+            owner=owner,
+            ttl=30,
+            clock=clock.time
+        )
+        stores.append(store)
+        return store
+    yield make_leases
+    for store in stores:
+        store.connection.close()
+
+
+class TestLeaseStore:
+    def test_lease_is_exclusive_until_expired(self, make_leases, clock):
+        first, second = make_leases('first'), make_leases('second')
+        assert first.acquire('tenant')
+        assert not second.acquire('tenant')
+        clock.advance(20)
+        assert first.renew() == 1
+        clock.advance(20)
+        assert not second.acquire('tenant')
+        clock.advance(11)
+        assert second.acquire('tenant')
+        assert not first.acquire('tenant')
+        assert first.held() == set()
+        assert second.held() == {'tenant'}
+
+    def test_release_hands_lease_over(self, make_leases):
+        first, second = make_leases('first'), make_leases('second')
+        assert first.acquire('tenant')
+        first.release()
+        assert second.acquire('tenant')
+
+
+class TestPollingLoopLeases:
+    def test_standby_takes_over_without_duplicates(
+            self, tmp_path, make_leases, clock, homework_module
+    ):
+        path = str(tmp_path / 'state.sqlite3')
+        bot, api = Bot(), Api()
+        loops = [
+            homework_module.PollingLoop(
+                bot, StateStore(path), clock=clock, api=api,
+                leases=make_leases(owner)
+            )
+            for owner in ('first', 'second')
+        ]
+        first, second = loops
+        assert first.step() == homework_module.RETRY_PERIOD
+        assert second.step() == homework_module.LEASE_TTL
+        assert api.calls == 1
+        assert len(bot.sent) == 1
+        clock.advance(homework_module.LEASE_TTL + 1)
+        second.step()
+        assert second.leading
+        assert second.timestamp == 1002
+        assert api.calls == 2
+        assert len(bot.sent) == 1, 'Статус отправлен повторно.'
+        assert first.step() == homework_module.LEASE_TTL
+        assert api.calls == 2
+
+
+class TestMultiTenantLeases:
+    def test_each_tenant_is_polled_by_one_poller(
+            self, make_leases, homework_module
+    ):
+        import asyncio
+
+        import multitenant
+
+        polled = []
+        pollers = []
+        for owner in ('first', 'second'):
+            poller = multitenant.MultiTenantPoller(
+                [
+                    multitenant.Tenant(token=f'token-{i}', chat_id=i)
+                    for i in range(4)
+                ],
+                Bot(),
+                concurrency=2,
+                leases=make_leases(owner)
+            )
+            poller.http_client.get = lambda **kwargs: polled.append(
+                kwargs['headers']['Authorization']
+            )
+            pollers.append(poller)
+        for poller in pollers:
+            asyncio.run(poller.poll_round())
+            poller.executor.shutdown()
+            poller.http_client.close()
+        assert sorted(polled) == [f'OAuth token-{i}' for i in range(4)]
+        assert len(pollers[0].owned) == 4
+        assert pollers[1].owned == set()
@@ -0,0 +1,83 @@
+import gzip
+import json
+import logging
+import sys
+
+import pytest
+
+from log_pipeline import (
+    JsonFormatter, make_file_handler, make_formatter, start_listener
+)
+
+
+def make_record(message, exc_info=None):
+    return logging.LogRecord(
+        'bot', logging.ERROR, __file__, 1, message, None, exc_info,
+        func='main'
+    )
+
+
+class TestFormatters:
+    def test_json_line_contains_exception_field(self):
+        try:
+            raise RuntimeError('сбой')
+        except RuntimeError:
+            record = make_record('Сбой в работе программы', sys.exc_info())
+        data = json.loads(JsonFormatter().format(record))
+        assert data['level'] == 'ERROR'
+        assert data['function'] == 'main'
+        assert data['message'] == 'Сбой в работе программы'
+        assert 'RuntimeError: сбой' in data['exception']
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            make_formatter('xml')
+
+
+class TestFileHandler:
+    def test_rotated_files_are_compressed(self, tmp_path):
+        path = str(tmp_path / 'homework.py.log')
+        handler = make_file_handler(path, max_bytes=100, backup_count=2)
+        handler.setFormatter(make_formatter())
+        for index in range(10):
+            handler.emit(make_record(f'сообщение {index}'))
+        handler.close()
+        with gzip.open(path + '.1.gz', 'rt', encoding='utf-8') as archive:
+            assert 'сообщение' in archive.read()
+        assert not (tmp_path / 'homework.py.log.3.gz').exists()
+
+    def test_history_survives_restart(self, tmp_path):
+        path = str(tmp_path / 'homework.py.log')
+        for message in ('до перезапуска', 'после перезапуска'):
+            handler = make_file_handler(path)
+            handler.setFormatter(make_formatter())
+            handler.emit(make_record(message))
+            handler.close()
+        with open(path, encoding='utf-8') as file:
+            text = file.read()
+        assert 'до перезапуска' in text and 'после перезапуска' in text
+
+
+class TestListener:
+    def test_records_are_written_by_listener(self, tmp_path):
+        path = str(tmp_path / 'homework.py.log')
+        queue_handler, listener = start_listener(
+            [make_file_handler(path)], make_formatter('json')
+        )
+        logger = logging.getLogger('test_log_pipeline')
+        logger.propagate = False
+        logger.addHandler(queue_handler)
+        try:
+            logger.error('Ошибка %s', 42)
+            try:
+                raise ValueError('плохой ответ')
+            except ValueError:
+                logger.exception('Сбой')
+        finally:
+            logger.removeHandler(queue_handler)
+            listener.stop()
+        with open(path, encoding='utf-8') as file:
+            lines = [json.loads(line) for line in file]
+        assert lines[0]['message'] == 'Ошибка 42'
+        assert lines[1]['message'] == 'Сбой'
+        assert 'ValueError: плохой ответ' in lines[1]['exception']
@@ -0,0 +1,112 @@
+import urllib.error
+import urllib.request
+from http import HTTPStatus
+
+import pytest
+
+from metrics import MetricsServer, Registry
+
+
+class Response:
+    status_code = HTTPStatus.OK
+    content = None
+
+    def json(self):
+        return {'homeworks': [], 'current_date': 1}
+
+
+class TestRegistry:
+    def test_counter_with_labels(self):
+        registry = Registry()
+        errors = registry.counter('errors_total', 'Ошибки.')
+        errors.inc(error='A')
+        errors.inc(2, error='A')
+        errors.inc(error='B "x"')
+        assert errors.value(error='A') == 3
+        text = registry.render()
+        assert '# TYPE errors_total counter' in text
+        assert 'errors_total{error="A"} 3' in text
+        assert 'errors_total{error="B \\"x\\""} 1' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        latency = registry.histogram('latency_seconds', 'Время.', (0.1, 1))
+        for value in (0.05, 0.5, 0.5, 5):
+            latency.observe(value)
+        lines = registry.render().splitlines()
+        assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{le="1"} 3' in lines
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+        assert 'latency_seconds_sum 6.05' in lines
+        assert 'latency_seconds_count 4' in lines
+
+    def test_gauge_function_is_evaluated_on_read(self):
+        registry = Registry()
+        depth = [0]
+        registry.gauge('depth', 'Глубина.', lambda: depth[0])
+        depth[0] = 7
+        assert 'depth 7' in registry.render().splitlines()
+
+    def test_reregistration_returns_existing_metric(self):
+        registry = Registry()
+        counter = registry.counter('cycles_total', 'Циклы.')
+        assert registry.counter('cycles_total', 'Циклы.') is counter
+        with pytest.raises(ValueError):
+            registry.gauge('cycles_total', 'Циклы.')
+
+    def test_gauge_function_must_be_callable(self):
+        gauge = Registry().gauge('depth', 'Глубина.')
+        with pytest.raises(TypeError):
+            gauge.set_function(7)
+
+
+class TestMetricsServer:
+    def test_metrics_endpoint(self):
+        registry = Registry()
+        registry.counter('cycles_total', 'Циклы.').inc()
+        server = MetricsServer(0, registry=registry).start()
+        try:
+            url = 'http://127.0.0.1:{}'.format(server.server_address[1])
+            with urllib.request.urlopen(url + '/metrics') as response:
+                assert response.headers['Content-Type'].startswith(
+                    'text/plain'
+                )
+                assert b'cycles_total 1' in response.read()
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(url + '/other')
+        finally:
+            server.close()
+
+
+class TestInstrumentation:
+    def test_api_request_is_timed(self, homework_module):
+        before = homework_module.API_REQUEST_SECONDS.count()
+        homework_module.request_api_answer(
+            0, {'Authorization': 'OAuth metrics'},
+            http_get=lambda **kwargs: Response()
+        )
+        assert homework_module.API_REQUEST_SECONDS.count() == before + 1
+
+    def test_send_message_result_is_counted(self, homework_module):
+        class FailingBot:
+            def send_message(self, chat_id=None, text=None):
+                raise RuntimeError('Telegram недоступен')
+
+        before = homework_module.SENT_MESSAGES.value(result='error')
+        assert homework_module.send_message(FailingBot(), 'text') is False
+        assert homework_module.SENT_MESSAGES.value(result='error') == (
+            before + 1
+        )
+
+    def test_send_queue_depth_is_rendered(self, homework_module):
+        from send_queue import SendQueue
+        from state import StateStore
+
+        send_queue = SendQueue(object())
+        send_queue.send_message(chat_id=1, text='text')
+        loop = homework_module.PollingLoop(send_queue, StateStore())
+        loop.register_metrics()
+        lines = homework_module.REGISTRY.render().splitlines()
+        assert 'homework_send_queue_depth 1' in lines, (
+            'Глубина очереди отправки должна вычисляться при чтении метрик.'
+        )
@@ -0,0 +1,101 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+
+import tests.check_utils as check_utils
+
+
+class RecordingBot:
+    def __init__(self):
+        self.messages = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.messages.append((chat_id, text))
+
+
+@pytest.fixture
+def multitenant_module():
+    import multitenant
+    return multitenant
+
+
+def make_poller(multitenant_module, data, http_status=HTTPStatus.OK):
+    def http_get(*args, **kwargs):
+        return check_utils.MockResponseGET(
+            *args, random_timestamp=1000198991, http_status=http_status,
+            data=data, **kwargs
+        )
+
+    bot = RecordingBot()
+    tenants = [
+        multitenant_module.Tenant(token='token-1', chat_id=1, from_date=0),
+        multitenant_module.Tenant(token='token-2', chat_id=2, from_date=0),
+    ]
+    poller = multitenant_module.MultiTenantPoller(tenants, bot, concurrency=2)
+    poller.http_client.get = http_get
+    return poller, bot
+
+
+class TestMultiTenantPoller:
+    def test_poll_round_notifies_each_tenant(
+            self, multitenant_module, data_with_new_hw_status
+    ):
+        poller, bot = make_poller(multitenant_module, data_with_new_hw_status)
+        asyncio.run(poller.poll_round())
+        poller.close()
+        assert poller.polls == 2
+        assert sorted(chat_id for chat_id, _ in bot.messages) == [1, 2]
+        assert all(
+            tenant.from_date == data_with_new_hw_status['current_date']
+            for tenant in poller.tenants
+        )
+        assert poller.throughput() > 0
+
+    def test_same_error_is_sent_once(self, multitenant_module):
+        poller, bot = make_poller(
+            multitenant_module, {}, HTTPStatus.INTERNAL_SERVER_ERROR
+        )
+        tenant = poller.tenants[0]
+        poller.poll_tenant(tenant)
+        poller.poll_tenant(tenant)
+        poller.close()
+        assert len(bot.messages) == 1
+        assert tenant.from_date == 0
+
+    def test_messages_go_through_outbox_with_store(
+            self, multitenant_module, data_with_new_hw_status
+    ):
+        from state import StateStore
+
+        poller, bot = make_poller(multitenant_module, data_with_new_hw_status)
+        poller.store = StateStore()
+        poller.outbox = multitenant_module.Outbox(poller.store)
+        poller.poll_tenant(poller.tenants[0])
+        assert bot.messages == []
+        poller.flush()
+        assert [chat_id for chat_id, _ in bot.messages] == [1]
+        poller.close()
+
+    def test_tenants_sharing_chat_keep_separate_state(
+            self, multitenant_module, data_with_new_hw_status
+    ):
+        from state import StateStore
+
+        poller, bot = make_poller(multitenant_module, data_with_new_hw_status)
+        for tenant in poller.tenants:
+            tenant.chat_id = 1
+        first, second = poller.tenants
+        assert first.key != second.key
+        poller.store = StateStore()
+        poller.outbox = multitenant_module.Outbox(poller.store)
+        poller.poll_tenant(first)
+        poller.flush()
+        assert poller.store.load(first.key).from_date == (
+            data_with_new_hw_status['current_date']
+        )
+        assert poller.store.load(second.key).from_date is None, (
+            'Пользователи с общим чатом не должны перезаписывать состояние '
+            'друг друга.'
+        )
+        poller.close()
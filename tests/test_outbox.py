@@ -0,0 +1,153 @@
+from concurrent.futures import Future
+
+from telebot.apihelper import ApiTelegramException
+
+from outbox import Outbox
+from send_queue import SendQueue
+from state import StateStore
+
+
+class Sender:
+    def __init__(self, fail_chats=()):
+        self.fail_chats = set(fail_chats)
+        self.sent = []
+
+    def __call__(self, chat_id, text):
+        if chat_id in self.fail_chats:
+            return False
+        self.sent.append((chat_id, text))
+        return True
+
+
+class BrokenBot:
+    def __init__(self, *broken_chats):
+        self.broken_chats = set(broken_chats)
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None):
+        if chat_id in self.broken_chats:
+            raise ConnectionError('Сбой.')
+        self.sent.append(text)
+
+
+def make_outbox(messages):
+    store = StateStore()
+    outbox = Outbox(store, base_delay=10, max_delay=40)
+    for chat_id, text in messages:
+        outbox.put(chat_id, text)
+    store.flush()
+    return outbox
+
+
+class TestOutbox:
+    def test_delivered_messages_are_removed(self):
+        outbox = make_outbox([(1, 'a'), (2, 'b')])
+        sender = Sender()
+        assert outbox.deliver(sender, now=0) == 2
+        assert sender.sent == [(1, 'a'), (2, 'b')]
+        assert len(outbox) == 0
+
+    def test_failed_chat_keeps_order_and_backs_off(self):
+        outbox = make_outbox([(1, 'a1'), (2, 'b'), (1, 'a2')])
+        sender = Sender(fail_chats={1})
+        assert outbox.deliver(sender, now=0) == 1
+        assert len(outbox) == 2
+        sender.fail_chats.clear()
+        assert outbox.deliver(sender, now=9) == 0, (
+            'Повтор не должен начинаться раньше паузы.'
+        )
+        assert outbox.deliver(sender, now=10) == 2
+        assert sender.sent == [(2, 'b'), (1, 'a1'), (1, 'a2')]
+
+    def test_backoff_is_exponential_and_capped(self):
+        outbox = make_outbox([])
+        assert [outbox.backoff(n) for n in range(4)] == [10, 20, 40, 40]
+
+    def test_outbox_survives_restart(self, tmp_path):
+        path = str(tmp_path / 'state.sqlite3')
+        store = StateStore(path)
+        Outbox(store).put(1, 'text')
+        store.close()
+        sender = Sender()
+        assert Outbox(StateStore(path)).deliver(sender) == 1
+        assert sender.sent == [(1, 'text')]
+
+    def test_shared_store_delivers_only_own_tenants(self):
+        store = StateStore()
+        Outbox(store).put(1, 'a', 'first')
+        Outbox(store).put(1, 'b', 'second')
+        Outbox(store).put('c', 'c', 'second')
+        store.flush()
+        sender = Sender()
+        own = Outbox(store, tenants=['second'])
+        assert own.deliver(sender, now=0) == 2
+        assert sender.sent == [(1, 'b'), ('c', 'c')], (
+            'Сообщения пользователя с общим чатом должен отправлять только '
+            'его владелец.'
+        )
+        assert len(own) == 1
+
+    def test_queued_message_is_removed_only_after_send(self):
+        outbox = make_outbox([(1, 'a1'), (1, 'a2'), (2, 'b')])
+        bot = BrokenBot(1)
+        send_queue = SendQueue(bot).start()
+
+        def send(chat_id, text):
+            return send_queue.send_message(chat_id=chat_id, text=text)
+        assert outbox.deliver(send, now=0) == 0
+        send_queue.close(timeout=1)
+        assert bot.sent == ['b']
+        assert outbox.store.connection.execute(
+            'SELECT chat_id, text, attempts FROM outbox ORDER BY id'
+        ).fetchall() == [(1, 'a1', 1), (1, 'a2', 1)], (
+            'Сообщение, которое очередь не смогла отправить, должно '
+            'остаться в outbox.'
+        )
+
+    def test_failing_chat_does_not_starve_others(self):
+        outbox = make_outbox(
+            [(1, f'a{number}') for number in range(100)] + [(2, 'b')]
+        )
+        sender = Sender(fail_chats={1})
+        assert outbox.deliver(sender, now=0) == 1
+        assert sender.sent == [(2, 'b')], (
+            'Чат, который не принимает сообщения, не должен задерживать '
+            'сообщения других чатов.'
+        )
+        outbox.put(2, 'b2')
+        outbox.store.flush()
+        assert outbox.deliver(sender, now=1) == 1
+        assert sender.sent[-1] == (2, 'b2')
+
+    def test_message_is_dropped_after_max_attempts(self):
+        store = StateStore()
+        outbox = Outbox(store, base_delay=1, max_delay=1, max_attempts=3)
+        outbox.put(1, 'a')
+        store.flush()
+        sender = Sender(fail_chats={1})
+        for now in range(3):
+            outbox.deliver(sender, now=now)
+        assert len(outbox) == 0
+        assert outbox.dropped == 1
+
+    def test_permanent_telegram_error_drops_message(self):
+        outbox = make_outbox([(1, 'a'), (2, 'b')])
+        futures = []
+
+        def send(chat_id, text):
+            futures.append(Future())
+            return futures[-1]
+        outbox.deliver(send, now=0)
+        futures[0].set_exception(ApiTelegramException(
+            'sendMessage', None, {
+                'error_code': 403,
+                'description': 'Forbidden: bot was blocked by the user'
+            }
+        ))
+        futures[1].set_exception(ConnectionError('Сбой.'))
+        assert outbox.store.connection.execute(
+            'SELECT chat_id, attempts FROM outbox'
+        ).fetchall() == [(2, 1)], (
+            'Сообщение, которое Telegram отклонил навсегда, должно быть '
+            'удалено, а после сетевой ошибки — отложено.'
+        )
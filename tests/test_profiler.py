@@ -0,0 +1,48 @@
+import os
+import pstats
+import signal
+import tracemalloc
+
+from profiler import Profiler
+
+
+ALLOCATED = []
+
+
+def allocate():
+    ALLOCATED.append(bytearray(10000))
+    return len(ALLOCATED)
+
+
+class TestProfiler:
+    def test_disabled_profiler_only_calls_function(self, tmp_path):
+        directory = tmp_path / 'profiles'
+        profiler = Profiler(directory=str(directory))
+        assert profiler.run(allocate) >= 1
+        assert not directory.exists()
+
+    def test_profiles_requested_cycles(self, tmp_path):
+        profiler = Profiler(directory=str(tmp_path), cycles=2)
+        profiler.request()
+        for _ in range(3):
+            profiler.run(allocate)
+        assert not profiler.requested
+        assert not tracemalloc.is_tracing()
+        files = sorted(os.listdir(tmp_path))
+        assert len([name for name in files if name.endswith('.txt')]) == 2
+        stats, = [name for name in files if name.endswith('.pstats')]
+        snapshot, = [name for name in files if name.endswith('.tracemalloc')]
+        assert any(
+            function[2] == 'allocate'
+            for function in pstats.Stats(str(tmp_path / stats)).stats
+        )
+        tracemalloc.Snapshot.load(str(tmp_path / snapshot))
+
+    def test_signal_requests_profiling(self, tmp_path):
+        handler = signal.getsignal(signal.SIGUSR1)
+        profiler = Profiler(directory=str(tmp_path)).install()
+        try:
+            os.kill(os.getpid(), signal.SIGUSR1)
+        finally:
+            signal.signal(signal.SIGUSR1, handler)
+        assert profiler.requested
@@ -0,0 +1,99 @@
+import gzip
+import json
+
+import pytest
+import requests
+
+from exceptions import RequestFailedError
+from recorder import TrafficRecorder, TrafficReplayer, load_traffic
+
+HOMEWORKS = {
+    'homeworks': [
+        {'id': 1, 'homework_name': 'hw1.zip', 'status': 'approved'}
+    ],
+    'current_date': 100
+}
+
+
+class Response:
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self.content = json.dumps(data).encode()
+        self.headers = {'ETag': '"v1"', 'Set-Cookie': 'secret'}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def fake_get(**kwargs):
+    return Response(200, HOMEWORKS)
+
+
+def failing_get(**kwargs):
+    raise requests.ConnectionError('Сеть недоступна.')
+
+
+@pytest.fixture
+def recording(tmp_path):
+    path = str(tmp_path / 'traffic.jsonl.gz')
+    recorder = TrafficRecorder(path)
+    recorder.wrap(fake_get)(
+        url='https://example.com',
+        headers={'Authorization': 'OAuth secret-token'},
+        params={'from_date': 0}
+    )
+    with pytest.raises(requests.ConnectionError):
+        recorder.wrap(failing_get)(url='https://example.com', params={})
+    return path
+
+
+class TestTrafficRecorder:
+    def test_records_are_compressed_and_redacted(self, recording):
+        with gzip.open(recording, 'rt', encoding='utf-8') as file:
+            content = file.read()
+        assert 'secret' not in content
+        ok, failed = load_traffic(recording)
+        assert ok['params'] == {'from_date': 0}
+        assert ok['status'] == 200
+        assert ok['headers'] == {'ETag': '"v1"'}
+        assert ok['latency'] >= 0
+        assert json.loads(ok['body']) == HOMEWORKS
+        assert failed['status'] is None
+        assert failed['error'] == 'ConnectionError'
+
+
+class TestTrafficReplayer:
+    def test_replays_through_request_and_check_response(
+            self, recording, homework_module
+    ):
+        replayer = TrafficReplayer(load_traffic(recording), speed=0)
+        data = homework_module.request_api_answer(
+            0, {'Authorization': 'OAuth replay'}, http_get=replayer
+        )
+        assert data == HOMEWORKS
+        assert homework_module.parse_status(data['homeworks'][0])
+        with pytest.raises(RequestFailedError):
+            homework_module.request_api_answer(
+                0, {'Authorization': 'OAuth replay'}, http_get=replayer
+            )
+        assert replayer.remaining == 0
+
+    def test_accelerated_pacing(self):
+        sleeps = []
+        records = [
+            {'time': 1000.0, 'latency': 0.5, 'status': 200, 'body': '{}'},
+            {'time': 1600.0, 'latency': 0.5, 'status': 200, 'body': '{}'},
+        ]
+        replayer = TrafficReplayer(records, speed=100, sleep=sleeps.append)
+        replayer()
+        replayer()
+        assert sleeps[0] == pytest.approx(0.005, abs=1e-3)
+        assert sleeps[1] == pytest.approx(6, abs=0.05)
+
+    def test_replay_loop_reports_statuses_and_errors(
+            self, recording, homework_module
+    ):
+        import replay
+
+        result = replay.replay_loop(list(load_traffic(recording)))
+        assert result == dict(result, requests=2, cycles=2, messages=2)
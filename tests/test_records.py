@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+import records
+from records import HomeworkRecord, decode_json
+
+
+class BodyResponse:
+    def __init__(self, data):
+        self.content = json.dumps(data).encode()
+
+    def json(self):
+        raise AssertionError('Тело должно декодироваться через orjson.')
+
+
+class TestRecords:
+    def test_decode_json_uses_raw_body(self):
+        if records.orjson is None:
+            pytest.skip('orjson не установлен.')
+        assert decode_json(BodyResponse({'homeworks': []})) == {
+            'homeworks': []
+        }
+
+    def test_decode_json_falls_back_to_stdlib(self, monkeypatch):
+        monkeypatch.setattr(records, 'orjson', None)
+        response = BodyResponse({})
+        response.json = lambda: {'homeworks': []}
+        assert decode_json(response) == {'homeworks': []}
+
+    def test_check_response_returns_records(self, homework_module):
+        result = homework_module.check_response({
+            'homeworks': [
+                {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+                {'homework_name': 'hw2', 'status': 'reviewing'},
+            ],
+            'current_date': 1
+        })
+        assert result == [
+            HomeworkRecord(1, 'hw1', 'approved'),
+            HomeworkRecord(None, 'hw2', 'reviewing'),
+        ]
+        assert result[1].key == 'hw2'
+
+    @pytest.mark.parametrize('homework, error, template, value', [
+        (
+            {'status': 'approved'}, KeyError,
+            'KEYS_IS_NOT_IN_HOMEWORK_ERROR', {'keys': ['homework_name']}
+        ),
+        (
+            'homework', KeyError, 'KEYS_IS_NOT_IN_HOMEWORK_ERROR',
+            {'keys': ['homework_name', 'status']}
+        ),
+        (
+            ['homework'], KeyError, 'KEYS_IS_NOT_IN_HOMEWORK_ERROR',
+            {'keys': ['homework_name', 'status']}
+        ),
+        (
+            {'homework_name': 'hw', 'status': 'unknown'}, ValueError,
+            'UNKNOWN_STATUS_ERROR', {'status': 'unknown'}
+        ),
+    ])
+    def test_invalid_homework_in_response(
+            self, homework_module, homework, error, template, value
+    ):
+        with pytest.raises(error) as info:
+            homework_module.check_response({'homeworks': [homework]})
+        message = getattr(homework_module, template).format(**value)
+        assert info.value.args == (message,), (
+            'Сообщение об ошибке должно совпадать с parse_status.'
+        )
@@ -0,0 +1,153 @@
+import threading
+import time
+from http import HTTPStatus
+
+import pytest
+
+from clock import SimulatedClock
+from response_cache import ResponseCache
+
+
+class Function:
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def __call__(self, value):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return value
+
+
+class Response:
+    status_code = HTTPStatus.OK
+    headers = {}
+
+    def __init__(self, timestamp):
+        self.timestamp = timestamp
+
+    def json(self):
+        return {'homeworks': [], 'current_date': self.timestamp}
+
+
+def make_cache(**kwargs):
+    clock = SimulatedClock(1000)
+    return ResponseCache(clock=clock.monotonic, **kwargs), clock
+
+
+def run_concurrently(target, count=20):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class TestResponseCache:
+    def test_repeated_call_is_served_from_cache(self):
+        cache, _ = make_cache()
+        function = Function()
+        assert cache.call('key', function, 1) == 1
+        assert cache.call('key', function, 2) == 1
+        assert cache.call('other', function, 3) == 3
+        assert function.calls == 2
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_expired_response_is_requested_again(self):
+        cache, clock = make_cache(ttl=30)
+        function = Function()
+        cache.call('key', function, 1)
+        clock.advance(29)
+        assert cache.call('key', function, 2) == 1
+        clock.advance(1)
+        assert cache.call('key', function, 2) == 2
+        assert function.calls == 2
+
+    def test_least_recently_used_response_is_evicted(self):
+        cache, _ = make_cache(max_entries=2)
+        function = Function()
+        cache.call('a', function, 1)
+        cache.call('b', function, 2)
+        cache.call('a', function, 1)
+        cache.call('c', function, 3)
+        assert list(cache.entries) == ['a', 'c']
+
+    def test_concurrent_calls_are_coalesced(self):
+        cache, _ = make_cache()
+        function = Function(delay=0.1)
+        results = []
+        run_concurrently(
+            lambda: results.append(cache.call('key', function, 1))
+        )
+        assert function.calls == 1
+        assert results == [1] * 20
+        assert cache.misses == 1
+        assert cache.coalesced + cache.hits == 19
+        assert cache.coalesced > 0
+
+    def test_error_is_shared_and_not_cached(self):
+        cache, _ = make_cache()
+        function = Function(delay=0.1, error=ConnectionError('Сбой.'))
+        errors = []
+
+        def call():
+            try:
+                cache.call('key', function, 1)
+            except ConnectionError as error:
+                errors.append(error)
+        run_concurrently(call, count=5)
+        assert len(errors) == 5
+        assert function.calls == 1
+        function.error = None
+        assert cache.call('key', function, 1) == 1
+        assert function.calls == 2
+
+
+class TestCachedApiAnswer:
+    @pytest.fixture
+    def requests_made(self, homework_module):
+        made = []
+
+        def http_get(url, headers, params):
+            made.append((headers['Authorization'], params['from_date']))
+            return Response(params['from_date'])
+        homework_module.RESPONSE_CACHE.clear()
+        return made, http_get
+
+    def test_requests_are_keyed_by_token_and_date(
+            self, homework_module, requests_made
+    ):
+        made, http_get = requests_made
+        first = {'Authorization': 'OAuth first'}
+        second = {'Authorization': 'OAuth second'}
+        for headers, timestamp in (
+            (first, 0), (first, 0), (second, 0), (first, 100), (first, 0)
+        ):
+            answer = homework_module.cached_api_answer(
+                timestamp, headers, http_get=http_get
+            )
+            assert answer['current_date'] == timestamp
+        assert made == [
+            ('OAuth first', 0), ('OAuth second', 0), ('OAuth first', 100)
+        ]
+
+    def test_cache_counters_are_exported(
+            self, homework_module, requests_made
+    ):
+        _, http_get = requests_made
+        cache = homework_module.RESPONSE_CACHE
+        hits, misses = cache.hits, cache.misses
+        headers = {'Authorization': 'OAuth counters'}
+        for _ in range(3):
+            homework_module.cached_api_answer(0, headers, http_get=http_get)
+        assert (cache.hits - hits, cache.misses - misses) == (2, 1)
+        lines = homework_module.REGISTRY.render().splitlines()
+        for name, value in (
+            ('hits', cache.hits),
+            ('misses', cache.misses),
+            ('coalesced', cache.coalesced),
+        ):
+            assert f'homework_response_cache_{name}_total {value}' in lines
@@ -0,0 +1,120 @@
+import random
+from email.utils import formatdate
+
+import pytest
+
+from deadline import budget
+from exceptions import (
+    ErrorKeyInResponseError, RequestFailedError, StatusCodeIsNot200Error
+)
+from retry import RetryPolicy, is_retryable, parse_retry_after
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FlakyApi:
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {'homeworks': []}
+
+
+def status_error(status_code, retry_after=None):
+    return StatusCodeIsNot200Error(
+        'Код ответа: {status_code}',
+        status_code=status_code,
+        retry_after=retry_after
+    )
+
+
+def make_policy(**kwargs):
+    clock = Clock()
+    options = dict(
+        attempts=4, base_delay=1, max_delay=8, deadline=60,
+        rng=random.Random(0), clock=clock, sleep=clock.sleep
+    )
+    options.update(kwargs)
+    return RetryPolicy(**options), clock
+
+
+class TestClassification:
+    @pytest.mark.parametrize('error, expected', [
+        (RequestFailedError('Сбой соединения.'), True),
+        (status_error(503), True),
+        (status_error(429), True),
+        (status_error(401), False),
+        (ErrorKeyInResponseError('Ответ API содержит ошибку.'), False),
+        (TypeError('Ответ API не является словарем.'), False),
+    ])
+    def test_is_retryable(self, error, expected):
+        assert is_retryable(error) is expected
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after('5') == 5
+        assert parse_retry_after(None) == 0
+        assert parse_retry_after('soon') == 0
+        assert parse_retry_after(formatdate(100), now=90) == 10
+
+
+class TestRetryPolicy:
+    def test_recovers_from_transient_errors(self):
+        policy, clock = make_policy()
+        api = FlakyApi(status_error(503), RequestFailedError('Сбой.'))
+        assert policy.call(api) == {'homeworks': []}
+        assert api.calls == 3
+        assert policy.retries == 2
+        assert all(0 <= delay <= 2 ** n for n, delay in enumerate(
+            clock.sleeps
+        ))
+
+    def test_permanent_error_is_not_retried(self):
+        policy, clock = make_policy()
+        api = FlakyApi(ErrorKeyInResponseError('Ответ API содержит ошибку.'))
+        with pytest.raises(ErrorKeyInResponseError):
+            policy.call(api)
+        assert api.calls == 1
+
+    def test_attempts_are_limited(self):
+        policy, clock = make_policy(attempts=2)
+        api = FlakyApi(*[status_error(500)] * 5)
+        with pytest.raises(StatusCodeIsNot200Error):
+            policy.call(api)
+        assert api.calls == 2
+
+    def test_retry_after_is_honored(self):
+        policy, clock = make_policy()
+        api = FlakyApi(status_error(429, retry_after='7'))
+        policy.call(api)
+        assert clock.sleeps == [7]
+
+    def test_deadline_budget(self):
+        policy, clock = make_policy(deadline=10)
+        api = FlakyApi(status_error(503, retry_after='30'))
+        with pytest.raises(StatusCodeIsNot200Error):
+            policy.call(api)
+        assert api.calls == 1
+        assert clock.sleeps == []
+
+    def test_cycle_budget_limits_retries(self):
+        policy, clock = make_policy(deadline=60)
+        api = FlakyApi(status_error(503, retry_after='7'))
+        with budget(5, clock), pytest.raises(StatusCodeIsNot200Error):
+            policy.call(api)
+        assert api.calls == 1
+        assert clock.sleeps == []
@@ -0,0 +1,69 @@
+import pytest
+
+from records import HomeworkRecord
+from scheduler import AdaptiveScheduler, FixedScheduler, make_scheduler
+
+
+def adaptive(**kwargs):
+    params = dict(
+        period=600, reviewing_period=60, min_period=30, max_period=3600,
+        jitter=0, rng=lambda: 0.5
+    )
+    params.update(kwargs)
+    return AdaptiveScheduler(**params)
+
+
+class TestScheduler:
+    def test_fixed_scheduler_saves_nothing(self):
+        scheduler = FixedScheduler(600)
+        for _ in range(5):
+            assert scheduler.next_delay() == 600
+        assert scheduler.saved_calls == 0
+
+    def test_reviewing_homework_speeds_up_polling(self):
+        scheduler = adaptive()
+        homework = HomeworkRecord(1, 'hw', 'reviewing')
+        assert scheduler.next_delay([homework]) == 60
+        assert scheduler.next_delay() == 60
+        assert scheduler.saved_calls < 0
+        homework = HomeworkRecord(1, 'hw', 'approved')
+        assert scheduler.next_delay([homework]) == 600
+
+    def test_idle_backoff_is_capped(self):
+        scheduler = adaptive()
+        delays = [scheduler.next_delay() for _ in range(6)]
+        assert delays == [1200, 2400, 3600, 3600, 3600, 3600]
+        assert scheduler.saved_calls > 0
+        assert scheduler.next_delay(failed=True) == 600
+
+    def test_jitter_respects_min_period(self):
+        scheduler = adaptive(reviewing_period=30, jitter=0.5, rng=lambda: 0)
+        assert scheduler.next_delay(
+            [HomeworkRecord(1, 'hw', 'reviewing')]
+        ) == 30
+
+    def test_restored_reviewing_homework_keeps_polling_fast(self):
+        scheduler = adaptive()
+        scheduler.restore({1: 'reviewing', 2: 'approved'})
+        assert scheduler.next_delay() == 60
+        assert scheduler.next_delay(
+            [HomeworkRecord(1, 'hw', 'approved')]
+        ) == 600
+
+    def test_poll_loop_restores_reviewing_homeworks(
+            self, homework_module, monkeypatch
+    ):
+        from state import StateStore
+
+        monkeypatch.setattr(homework_module, 'POLLING_SCHEDULER', 'adaptive')
+        store = StateStore()
+        store.stage(from_date=1000, statuses={1: 'reviewing'})
+        store.flush()
+        loop = homework_module.PollingLoop(object(), store)
+        assert loop.scheduler.reviewing == {1}, (
+            'После перезапуска планировщик должен знать о работах на ревью.'
+        )
+
+    def test_unknown_scheduler(self):
+        with pytest.raises(ValueError):
+            make_scheduler('cron', 600, 60, 30, 3600)
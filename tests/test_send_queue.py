@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+from telebot.apihelper import ApiTelegramException
+
+from send_queue import SendQueue, TokenBucket
+
+
+class FloodBot:
+    def __init__(self, floods=0):
+        self.floods = floods
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        if self.floods:
+            self.floods -= 1
+            raise ApiTelegramException('send_message', None, {
+                'error_code': 429,
+                'description': 'Too Many Requests: retry after 0.05',
+                'parameters': {'retry_after': 0.05}
+            })
+        self.sent.append((chat_id, text, time.monotonic()))
+
+
+class BrokenBot:
+    def __init__(self, *broken_chats):
+        self.broken_chats = set(broken_chats)
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        if chat_id in self.broken_chats:
+            raise ConnectionError('Сбой.')
+        self.sent.append(text)
+        return text
+
+
+class TestTokenBucket:
+    def test_wait_time(self):
+        bucket = TokenBucket(rate=2, capacity=1, now=0)
+        assert bucket.wait_time(0) == 0
+        bucket.take(0)
+        assert bucket.wait_time(0) == 0.5
+        assert bucket.wait_time(0.5) == 0
+
+
+class TestSendQueue:
+    def test_send_message_does_not_block(self):
+        bot = FloodBot()
+        send_queue = SendQueue(bot)
+        send_queue.send_message(chat_id=1, text='text')
+        assert bot.sent == []
+        assert send_queue.depth == 1
+        send_queue.start().close(timeout=1)
+        assert [text for _, text, _ in bot.sent] == ['text']
+        assert send_queue.depth == 0
+
+    def test_chat_rate_limit_does_not_block_other_chats(self):
+        bot = FloodBot()
+        send_queue = SendQueue(bot, chat_rate=20, chat_burst=1)
+        for text in ('a1', 'a2', 'a3'):
+            send_queue.send_message(chat_id='a', text=text)
+        send_queue.send_message(chat_id='b', text='b1')
+        send_queue.start().close(timeout=1)
+        order = [text for _, text, _ in bot.sent]
+        assert order.index('b1') < order.index('a2')
+        times = [at for chat_id, _, at in bot.sent if chat_id == 'a']
+        assert times[2] - times[0] >= 2 / 20 * 0.9
+
+    def test_retry_after_is_respected(self):
+        bot = FloodBot(floods=1)
+        send_queue = SendQueue(bot)
+        started = time.monotonic()
+        send_queue.send_message(chat_id=1, text='text')
+        send_queue.start().close(timeout=1)
+        assert [text for _, text, _ in bot.sent] == ['text']
+        assert bot.sent[0][2] - started >= 0.05
+        assert send_queue.failed == 0
+
+    def test_future_reports_delivery_result(self):
+        send_queue = SendQueue(BrokenBot('a'))
+        failed = [send_queue.send_message(chat_id='a', text=text)
+                  for text in ('a1', 'a2')]
+        sent = send_queue.send_message(chat_id='b', text='b1')
+        send_queue.start().close(timeout=1)
+        assert sent.result() == 'b1'
+        for future in failed:
+            with pytest.raises(ConnectionError):
+                future.result(0)
+        assert send_queue.failed == 2
+        assert send_queue.depth == 0
+
+    def test_close_cancels_unsent_messages(self):
+        release = threading.Event()
+        bot = BrokenBot()
+        bot.send_message = lambda **kwargs: release.wait(1)
+        send_queue = SendQueue(bot).start()
+        first = send_queue.send_message(chat_id=1, text='first')
+        second = send_queue.send_message(chat_id=1, text='second')
+        send_queue.close(timeout=0.1)
+        release.set()
+        assert first.result(1) is True
+        assert second.cancelled(), (
+            'Сообщение, не отправленное до close, не должно считаться '
+            'отправленным.'
+        )
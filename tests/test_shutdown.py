@@ -0,0 +1,137 @@
+import os
+import signal
+import threading
+import time
+from http import HTTPStatus
+
+import pytest
+
+from exceptions import ShutdownRequested, StatusCodeIsNot200Error
+from outbox import Outbox
+from shutdown import GracefulShutdown
+from state import StateStore
+
+
+class Bot:
+    def __init__(self, *args, **kwargs):
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None):
+        self.sent.append(text)
+
+
+@pytest.fixture
+def shutdown(monkeypatch, homework_module):
+    handlers = {
+        signum: signal.getsignal(signum)
+        for signum in (signal.SIGTERM, signal.SIGINT)
+    }
+    shutdown = GracefulShutdown().install()
+    monkeypatch.setattr(homework_module, 'SHUTDOWN', shutdown)
+    yield shutdown
+    for signum, handler in handlers.items():
+        signal.signal(signum, handler)
+
+
+class TestGracefulShutdown:
+    def test_signal_outside_sleep_does_not_interrupt(self):
+        shutdown = GracefulShutdown()
+        shutdown.handle(signal.SIGTERM, None)
+        assert shutdown.requested
+        with pytest.raises(ShutdownRequested):
+            with shutdown.interruptible():
+                raise AssertionError('Пауза не должна начинаться.')
+
+    def test_main_stops_within_bounded_time(
+            self, monkeypatch, homework_module, shutdown
+    ):
+        for token in homework_module.TOKENS:
+            monkeypatch.setattr(homework_module, token, '1:token')
+        monkeypatch.setattr(homework_module, 'TeleBot', Bot)
+        monkeypatch.setattr(
+            homework_module,
+            'get_api_answer',
+            lambda timestamp: {'homeworks': [], 'current_date': timestamp}
+        )
+        signalled = []
+
+        def terminate():
+            signalled.append(time.monotonic())
+            os.kill(os.getpid(), signal.SIGTERM)
+
+        threading.Timer(0.2, terminate).start()
+        with pytest.raises(ShutdownRequested):
+            homework_module.main()
+        stopped = time.monotonic()
+        shutdown.finish()
+        latency = stopped - signalled[0]
+        assert latency < 0.5, (
+            f'main() остановилась через {latency:.2f} с после SIGTERM.'
+        )
+
+    def test_signal_interrupts_retry_backoff(
+            self, monkeypatch, homework_module, shutdown
+    ):
+        for token in homework_module.TOKENS:
+            monkeypatch.setattr(homework_module, token, '1:token')
+        monkeypatch.setattr(homework_module, 'TeleBot', Bot)
+        requests = []
+
+        def get_api_answer(timestamp):
+            requests.append(time.monotonic())
+            raise StatusCodeIsNot200Error(
+                'Код ответа: {status_code}',
+                status_code=HTTPStatus.TOO_MANY_REQUESTS,
+                retry_after='30'
+            )
+        monkeypatch.setattr(homework_module, 'get_api_answer', get_api_answer)
+        signalled = []
+
+        def terminate():
+            signalled.append(time.monotonic())
+            os.kill(os.getpid(), signal.SIGTERM)
+
+        threading.Timer(0.2, terminate).start()
+        with pytest.raises(ShutdownRequested):
+            homework_module.main()
+        stopped = time.monotonic()
+        shutdown.finish()
+        assert len(requests) == 1
+        latency = stopped - signalled[0]
+        assert latency < 0.5, (
+            f'Пауза перед повтором прервалась через {latency:.2f} с '
+            'после SIGTERM.'
+        )
+
+    def test_pending_messages_are_sent_on_shutdown(self, homework_module):
+        store = StateStore()
+        outbox = Outbox(store)
+        outbox.put(1, 'Последнее сообщение')
+        bot = Bot()
+        homework_module.shutdown_gracefully(bot, store, outbox, timeout=1)
+        assert bot.sent == ['Последнее сообщение']
+
+    def test_unsent_queued_messages_stay_in_outbox(
+            self, tmp_path, homework_module
+    ):
+        from send_queue import SendQueue
+
+        path = str(tmp_path / 'state.sqlite3')
+        store = StateStore(path)
+        outbox = Outbox(store)
+        for text in ('Первое', 'Второе'):
+            outbox.put(1, text)
+        store.flush()
+        release = threading.Event()
+        bot = Bot()
+        bot.send_message = lambda **kwargs: release.wait(1)
+        send_queue = SendQueue(bot).start()
+        homework_module.shutdown_gracefully(
+            send_queue, store, outbox, timeout=0.2
+        )
+        release.set()
+        send_queue.thread.join(1)
+        assert len(Outbox(StateStore(path))) == 2, (
+            'Сообщения, не отправленные до остановки, должны остаться в '
+            'outbox.'
+        )
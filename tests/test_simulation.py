@@ -0,0 +1,104 @@
+import time
+from http import HTTPStatus
+
+import pytest
+
+from clock import SimulatedClock
+
+
+@pytest.fixture
+def simulation(homework_module):
+    import simulation
+    return simulation
+
+
+def messages(result, prefix):
+    return [
+        moment for moment, text in result.bot.sent if text.startswith(prefix)
+    ]
+
+
+class TestSimulatedClock:
+    def test_sleep_advances_time(self):
+        clock = SimulatedClock(100)
+        clock.sleep(600)
+        clock.advance(-5)
+        assert clock.time() == clock.monotonic() == 700
+
+
+class TestSimulation:
+    def test_week_of_polling_runs_fast(self, simulation):
+        start = time.perf_counter()
+        result = simulation.simulate(duration=simulation.WEEK)
+        elapsed = time.perf_counter() - start
+        assert result.cycles >= simulation.WEEK // 600
+        assert elapsed < 1, (
+            f'Неделя опроса смоделирована за {elapsed:.2f} с.'
+        )
+
+    def test_cursor_follows_simulated_time(self, simulation):
+        result = simulation.simulate(duration=simulation.DAY)
+        assert result.clock.time() - result.loop.timestamp <= 600
+        state = result.loop.store.load()
+        assert state.from_date == result.loop.timestamp
+
+    def test_status_changes_are_sent_once_per_poll_period(
+            self, simulation, homework_module
+    ):
+        result = simulation.simulate()
+        changes = messages(result, 'Изменился статус')
+        assert len(changes) == 4
+        events = [
+            simulation.START + at
+            for at, event in simulation.DEFAULT_TIMELINE
+            if isinstance(event, dict)
+        ]
+        for sent, happened in zip(changes, events):
+            assert 0 <= sent - happened <= homework_module.RETRY_PERIOD
+
+    def test_outage_is_reported_with_suppression_and_backoff(
+            self, simulation, homework_module
+    ):
+        timeline = (
+            (simulation.HOUR, HTTPStatus.SERVICE_UNAVAILABLE),
+            (4 * simulation.HOUR, HTTPStatus.OK),
+        )
+        result = simulation.simulate(timeline, duration=simulation.DAY)
+        outage_cycles = 3 * simulation.HOUR // 600
+        retries = result.api.calls - result.cycles
+        assert retries <= homework_module.CIRCUIT_FAILURE_THRESHOLD * (
+            homework_module.API_RETRY_ATTEMPTS - 1
+        ), 'Пока цепь разомкнута, пробный запрос не должен повторяться.'
+        assert len(messages(result, 'Сбой в работе')) == 1
+        assert len(messages(result, 'Сбой продолжается')) <= 3
+        assert len(messages(result, 'Работа восстановлена')) == 1
+        assert len(result.bot.sent) < outage_cycles
+
+    def test_short_outage_delays_next_poll_by_one_period(
+            self, simulation, homework_module
+    ):
+        minute = 60
+        timeline = (
+            (120 * minute, HTTPStatus.SERVICE_UNAVAILABLE),
+            (120 * minute + 20, HTTPStatus.OK),
+            (121 * minute, simulation.make_homework(1, 'approved')),
+        )
+        result = simulation.simulate(timeline, duration=4 * simulation.HOUR)
+        changes = messages(result, 'Изменился статус')
+        assert len(changes) == 1
+        delay = changes[0] - (simulation.START + 121 * minute)
+        assert 0 <= delay <= homework_module.RETRY_PERIOD, (
+            'Короткий сбой не должен откладывать следующий опрос дольше '
+            f'RETRY_PERIOD, сообщение отправлено через {delay / 60:.0f} мин.'
+        )
+        assert homework_module.CIRCUIT_RESET_TIMEOUT <= (
+            homework_module.RETRY_PERIOD
+        )
+
+    def test_adaptive_scheduler_backs_off_when_idle(
+            self, monkeypatch, simulation, homework_module
+    ):
+        monkeypatch.setattr(homework_module, 'POLLING_SCHEDULER', 'adaptive')
+        result = simulation.simulate(timeline=(), duration=simulation.DAY)
+        assert result.cycles < simulation.DAY // 600
+        assert max(result.delays) >= 0.9 * homework_module.MAX_RETRY_PERIOD
@@ -0,0 +1,41 @@
+from records import HomeworkRecord
+from state import StateStore
+from tracker import StatusTracker
+
+
+class TestStateStore:
+    def test_state_survives_restart(self, tmp_path):
+        path = str(tmp_path / 'state.sqlite3')
+        store = StateStore(path)
+        tracker = StatusTracker(store.load().statuses)
+        tracker.commit(HomeworkRecord(7, 'hw', 'approved'))
+        store.stage(
+            from_date=1000, last_error='error',
+            statuses=tracker.pop_committed()
+        )
+        assert store.flush() == 3
+        store.close()
+
+        state = StateStore(path).load()
+        assert state.from_date == 1000
+        assert state.last_error == 'error'
+        assert state.statuses == {7: 'approved'}, (
+            'Ключи работ должны сохранять тип после перезапуска.'
+        )
+
+    def test_unchanged_values_are_not_rewritten(self):
+        store = StateStore()
+        store.load()
+        store.stage(from_date=1000, last_error='')
+        assert store.flush() == 1
+        store.stage(from_date=1000, last_error='')
+        assert store.flush() == 0
+
+    def test_tenants_are_isolated(self):
+        store = StateStore()
+        store.stage('1', from_date=10)
+        store.stage('2', from_date=20)
+        store.flush()
+        assert store.load('1').from_date == 10
+        assert store.load('2').from_date == 20
+        assert store.load('3').from_date is None
@@ -0,0 +1,175 @@
+import multiprocessing
+import os
+import signal
+import time
+from collections import Counter
+
+import pytest
+
+from clock import SimulatedClock
+from supervisor import HashRing, Supervisor
+
+
+def sleep_forever(shard):
+    time.sleep(60)
+
+
+def crash(shard):
+    os._exit(1)
+
+
+def make_tenants(count):
+    return [
+        {'token': f'token-{index}', 'chat_id': index, 'from_date': 0}
+        for index in range(count)
+    ]
+
+
+@pytest.fixture
+def clock():
+    return SimulatedClock(0)
+
+
+@pytest.fixture
+def supervisor(clock):
+    supervisor = Supervisor(
+        make_tenants(100),
+        workers=2,
+        target=sleep_forever,
+        context=multiprocessing.get_context('fork'),
+        clock=clock.monotonic
+    )
+    yield supervisor
+    supervisor.close()
+
+
+class TestHashRing:
+    def test_keys_are_spread_evenly(self):
+        ring = HashRing(['a', 'b', 'c', 'd'])
+        counts = Counter(ring.node(f'token-{i}') for i in range(4000))
+        assert set(counts) == {'a', 'b', 'c', 'd'}
+        assert all(600 < count < 1400 for count in counts.values())
+
+    def test_adding_node_moves_only_its_share(self):
+        ring = HashRing(['a', 'b', 'c', 'd'])
+        keys = [f'token-{i}' for i in range(4000)]
+        before = {key: ring.node(key) for key in keys}
+        ring.add('e')
+        moved = [key for key in keys if ring.node(key) != before[key]]
+        assert all(ring.node(key) == 'e' for key in moved)
+        assert len(moved) < len(keys) * 0.3
+        ring.remove('e')
+        assert {key: ring.node(key) for key in keys} == before
+
+
+class TestSupervisor:
+    def test_tenants_are_sharded_across_workers(self, supervisor):
+        supervisor.step()
+        assert len(supervisor.processes) == 2
+        assert all(
+            process.is_alive() for process in supervisor.processes.values()
+        )
+        tokens = sorted(
+            tenant['token']
+            for shard in supervisor.shards.values() for tenant in shard
+        )
+        assert tokens == sorted(t['token'] for t in supervisor.tenants)
+
+    def test_rebalance_on_resize(self, supervisor):
+        supervisor.step()
+        supervisor.scale(1)
+        supervisor.step()
+        assert len(supervisor.processes) == 3
+        assert 0 < sum(map(len, supervisor.shards.values())) == 100
+        assert supervisor.resize(2) < 50
+        assert sorted(supervisor.processes) == ['worker-0', 'worker-1']
+
+    def test_crashed_worker_is_restarted(self, supervisor, clock):
+        supervisor.step()
+        process = supervisor.processes['worker-0']
+        shard = supervisor.shards['worker-0']
+        os.kill(process.pid, signal.SIGKILL)
+        process.join()
+        supervisor.check()
+        assert 'worker-0' not in supervisor.processes
+        clock.advance(1)
+        supervisor.check()
+        assert supervisor.restarts == 1
+        assert supervisor.processes['worker-0'].is_alive()
+        assert supervisor.processes['worker-0'].pid != process.pid
+        assert supervisor.shards['worker-0'] == shard
+
+    def test_restart_backoff_grows_for_crash_loop(self, clock):
+        supervisor = Supervisor(
+            make_tenants(10),
+            workers=1,
+            target=crash,
+            context=multiprocessing.get_context('fork'),
+            clock=clock.monotonic
+        )
+        supervisor.step()
+        delays = []
+        for _ in range(4):
+            if 'worker-0' in supervisor.processes:
+                supervisor.processes['worker-0'].join()
+                supervisor.check()
+            delays.append(supervisor.restart_at['worker-0'] - clock.now)
+            clock.advance(delays[-1])
+            supervisor.check()
+        supervisor.close()
+        assert delays == [1, 2, 4, 8]
+        assert supervisor.restarts == 4
+
+
+class Response:
+    status_code = 200
+    headers = {}
+    content = b'{"homeworks": [], "current_date": 5000}'
+
+    def json(self):
+        return {'homeworks': [], 'current_date': 5000}
+
+
+def poll_until_stopped(path, polled):
+    import asyncio
+
+    import multitenant
+    from state import StateStore
+    from supervisor import run_until_stopped
+
+    poller = multitenant.MultiTenantPoller(
+        [multitenant.Tenant(token='token', chat_id=1, from_date=0)],
+        object(),
+        store=StateStore(path)
+    )
+
+    def http_get(**kwargs):
+        polled.set()
+        return Response()
+    poller.http_client.get = http_get
+    try:
+        asyncio.run(run_until_stopped(poller))
+    finally:
+        poller.close(timeout=1)
+
+
+class TestWorkerShutdown:
+    def test_sigterm_saves_state_before_exit(self, tmp_path):
+        from multitenant import Tenant
+        from state import StateStore
+
+        context = multiprocessing.get_context('fork')
+        path = str(tmp_path / 'state.sqlite3')
+        polled = context.Event()
+        process = context.Process(
+            target=poll_until_stopped, args=(path, polled)
+        )
+        process.start()
+        assert polled.wait(1)
+        process.terminate()
+        process.join(1)
+        assert process.exitcode == 0
+        state = StateStore(path).load(Tenant(token='token', chat_id=1).key)
+        assert state.from_date == 5000, (
+            'Курсор, полученный до SIGTERM, должен сохраниться.'
+        )
@@ -0,0 +1,49 @@
+from records import HomeworkRecord
+from tracker import StatusTracker
+
+
+class TestStatusTracker:
+    def test_reports_only_transitions(self):
+        tracker = StatusTracker()
+        homeworks = [
+            HomeworkRecord(1, 'hw1', 'reviewing'),
+            HomeworkRecord(2, 'hw2', 'approved'),
+        ]
+        assert tracker.changes(homeworks) == homeworks
+        for homework in homeworks:
+            tracker.commit(homework)
+        assert tracker.changes(homeworks) == []
+        changed = HomeworkRecord(1, 'hw1', 'approved')
+        assert tracker.changes([changed, homeworks[1]]) == [changed]
+
+    def test_uncommitted_change_is_reported_again(self):
+        tracker = StatusTracker()
+        homework = HomeworkRecord(None, 'hw1', 'rejected')
+        assert tracker.changes([homework]) == [homework]
+        assert tracker.changes([homework]) == [homework]
+        tracker.commit(homework)
+        assert tracker.changes([homework]) == []
+
+    def test_large_list(self):
+        tracker = StatusTracker()
+        homeworks = [
+            HomeworkRecord(i, f'hw{i}', 'approved') for i in range(10000)
+        ]
+        assert len(tracker.changes(homeworks)) == 10000
+
+    def test_queue_status_changes_queues_every_homework(
+            self, homework_module
+    ):
+        from outbox import Outbox
+        from state import StateStore
+
+        store = StateStore()
+        outbox = Outbox(store)
+        tracker = StatusTracker()
+        homeworks = [
+            HomeworkRecord(i, f'hw{i}', 'approved') for i in range(3)
+        ]
+        homework_module.queue_status_changes(outbox, tracker, homeworks)
+        store.flush()
+        assert len(outbox) == 3
+        assert tracker.changes(homeworks) == []
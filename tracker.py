@@ -0,0 +1,36 @@
+from typing import Iterable, Optional
+
+from records import HomeworkRecord
+
+
+class StatusTracker:
+    """Хранит последний известный статус каждой домашней работы.
+
+    Работы различаются по ключу id, а при его отсутствии — по имени.
+    Новый статус запоминается только после commit, поэтому работу,
+    сообщение о которой не удалось отправить, tracker вернёт снова.
+    Статусы, запомненные с прошлого вызова pop_committed, копятся в
+    committed для сохранения в StateStore.
+    """
+
+    def __init__(self, statuses: Optional[dict] = None) -> None:
+        self.statuses = dict(statuses or {})
+        self.committed = {}
+
+    def changes(self, homeworks: Iterable[HomeworkRecord]) -> list:
+        """Возвращает работы, статус которых изменился, за один проход."""
+        statuses = self.statuses
+        return [
+            homework for homework in homeworks
+            if statuses.get(homework.key) != homework.status
+        ]
+
+    def commit(self, homework: HomeworkRecord) -> None:
+        """Запоминает статус работы как отправленный."""
+        key = homework.key
+        self.statuses[key] = self.committed[key] = homework.status
+
+    def pop_committed(self) -> dict:
+        """Возвращает статусы, запомненные после прошлого вызова."""
+        committed, self.committed = self.committed, {}
+        return committed